@@ -0,0 +1,47 @@
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from vbcore.crypto import CryptoFactory
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+def benchmark(name: str, count: int, func, *args):
+    start = time.perf_counter()
+    for _ in func(*args):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {count / elapsed:>14,.0f} ops/s")
+
+
+def by_name(records):
+    """as BuiltinHash did before: the algorithm is looked up on every call"""
+    for record in records:
+        yield hashlib.new("sha256", data=record).hexdigest()
+
+
+def run():
+    records = [f"record-{i}".encode() for i in range(RECORDS)]
+    hasher = CryptoFactory.instance("SHA256")
+    benchmark("hashlib.new per value", RECORDS, by_name, records)
+    benchmark("hash per value", RECORDS, map, hasher.hash, records)
+    benchmark("hash_many", RECORDS, hasher.hash_many, records)
+
+    with tempfile.NamedTemporaryFile() as file:
+        file.write(os.urandom(256 * 1024 * 1024))
+        file.flush()
+        start = time.perf_counter()
+        hasher.hash_file(file.name)
+        print(f"{'hash_file 256MB':<32} {256 / (time.perf_counter() - start):>14,.0f} MB/s")
+
+    bcrypt = CryptoFactory.instance("BCRYPT", rounds=8)
+    passwords = [f"password-{i}" for i in range(64)]
+    benchmark("bcrypt hash per value", len(passwords), map, bcrypt.hash, passwords)
+    benchmark("bcrypt hash_many (processes)", len(passwords), bcrypt.hash_many, passwords)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base, Session
+
+from vbcore.base import BaseDTO
+from vbcore.db.repo import MutatorRepo
+from vbcore.db.support import SQLASupport
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+class Sample(declarative_base()):  # type: ignore
+    __tablename__ = "sample"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String(50))
+
+
+@dataclass(frozen=True, kw_only=True)
+class SampleDTO(BaseDTO):
+    id: int
+    name: str
+
+
+def records(suffix: str = ""):
+    return (SampleDTO(id=i, name=f"name-{i}{suffix}") for i in range(ROWS))
+
+
+def benchmark(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+    except sa.exc.SQLAlchemyError as exc:
+        print(f"{name:<24} failed: {getattr(exc, 'orig', None) or exc}")
+        return
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {ROWS / elapsed:>12,.0f} rows/s")
+
+
+def single_execute(connection: sa.Connection):
+    connection.execute(sa.insert(Sample), [r.to_dict() for r in records()])
+
+
+def legacy_upsert(support: SQLASupport):
+    support.bulk_upsert(Sample(id=r.id, name=r.name) for r in records("-legacy"))
+
+
+def native_upsert(support: SQLASupport):
+    support.native_upsert(Sample(id=r.id, name=r.name) for r in records("-native"))
+
+
+def run(filename: str):
+    engine = sa.create_engine(f"sqlite:///{filename}")
+    Sample.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        benchmark("insert single execute", single_execute, connection)
+        connection.execute(sa.delete(Sample))
+
+    with engine.begin() as connection:
+        repo = MutatorRepo(connection, Sample)
+        benchmark("insert_many chunked", repo.insert_many, records())
+        benchmark("upsert_many", repo.upsert_many, records("-updated"))
+
+    with Session(engine) as session:
+        support = SQLASupport(Sample, session)
+        benchmark("native_upsert", native_upsert, support)
+        benchmark("bulk_upsert delete+add", legacy_upsert, support)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run(os.path.join(tmpdir, "bulk_load.db"))
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from vbcore.csvfile import CSVHandler, CSVParams
+
+RECORDS = 500_000
+DTYPES = {"id": "q", "amount": "d", "quantity": "q"}
+
+
+def make_file(filename: str):
+    handler = CSVHandler(fields=["id", "code", "amount", "quantity"], params=CSVParams())
+    handler.write_all(
+        (
+            {"id": i, "code": f"code-{i}", "amount": i / 100, "quantity": i % 10}
+            for i in range(RECORDS)
+        ),
+        filename=filename,
+    )
+
+
+def consume_dicts(handler: CSVHandler, filename: str):
+    return list(handler.readlines(filename))
+
+
+def consume_tuples(handler: CSVHandler, filename: str):
+    return list(handler.readtuples(filename))
+
+
+def consume_columns(handler: CSVHandler, filename: str):
+    return list(handler.read_columns(dtypes=DTYPES, filename=filename))
+
+
+def benchmark(name: str, func, handler: CSVHandler, filename: str):
+    start = time.perf_counter()
+    func(handler, filename)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(handler, filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<8} {RECORDS / elapsed:>12,.0f} rows/s {peak / 1024 / 1024:>10,.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = os.path.join(tmpdir, "sample.csv")
+        make_file(csv_file)
+        csv_handler = CSVHandler(params=CSVParams())
+        benchmark("dicts", consume_dicts, csv_handler, csv_file)
+        benchmark("tuples", consume_tuples, csv_handler, csv_file)
+        benchmark("columns", consume_columns, csv_handler, csv_file)
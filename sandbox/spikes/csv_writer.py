@@ -0,0 +1,50 @@
+import os
+import tempfile
+import time
+
+from vbcore.csvfile import CSVHandler, CSVParams
+
+RECORDS = 500_000
+FIELDS = ["id", "code", "amount", "quantity"]
+
+
+def records():
+    for i in range(RECORDS):
+        yield {"id": i, "code": f"code-{i}", "amount": i / 100, "quantity": i % 10}
+
+
+def coroutine_writer(handler: CSVHandler, filename: str):
+    with handler.open_writer(filename) as writer:
+        for record in records():
+            writer.send(record)
+
+
+def batch_writer(handler: CSVHandler, filename: str, **kwargs):
+    with handler.batch_writer(filename, **kwargs) as writer:
+        for record in records():
+            writer.write(record)
+
+
+def benchmark(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<20} {RECORDS / elapsed:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    csv_handler = CSVHandler(fields=FIELDS, params=CSVParams())
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = os.path.join(tmpdir, "sample.csv")
+        benchmark("coroutine", coroutine_writer, csv_handler, csv_file)
+        benchmark("batch", batch_writer, csv_handler, csv_file)
+        benchmark("batch background", batch_writer, csv_handler, csv_file, background=True)
+        benchmark("batch gzip", batch_writer, csv_handler, csv_file, compression="gzip")
+        benchmark(
+            "batch gzip thread",
+            batch_writer,
+            csv_handler,
+            csv_file,
+            compression="gzip",
+            background=True,
+        )
@@ -0,0 +1,31 @@
+import dataclasses
+import timeit
+
+from vbcore.base import BaseDTO
+
+NUMBER = 100_000
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class SampleDTO(BaseDTO):
+    id: int
+    code: str
+    amount: float
+    quantity: int
+    description: str = ""
+    enabled: bool = True
+
+
+def benchmark(name: str, func):
+    elapsed = timeit.timeit(func, number=NUMBER)
+    print(f"{name:<20} {NUMBER / elapsed:>12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    dto = SampleDTO(id=1, code="code", amount=1.5, quantity=3)
+    data = {**dto.to_dict(), "extra": "ignored"}
+
+    benchmark("to_dict", dto.to_dict)
+    benchmark("to_dict shallow", lambda: dto.to_dict(deep=False))
+    benchmark("from_dict", lambda: SampleDTO.from_dict(**data))
+    benchmark("prototype", lambda: dto(quantity=4))
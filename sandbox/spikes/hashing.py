@@ -0,0 +1,64 @@
+import asyncio
+import sys
+import time
+
+from vbcore.crypto import CryptoFactory
+
+LOGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+
+def benchmark(name: str, count: int, elapsed: float, extra: str = ""):
+    print(f"{name:<32} {count / elapsed:>10,.1f} ops/s {extra}".rstrip())
+
+
+def instance_creation():
+    """as UserMixin did before: a new hasher for every loaded user"""
+    count = 10_000
+    start = time.perf_counter()
+    for _ in range(count):
+        CryptoFactory.instance("ARGON2").hasher  # pylint: disable=expression-not-assigned
+    benchmark("new hasher per user", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        CryptoFactory.shared("ARGON2").hasher  # pylint: disable=expression-not-assigned
+    benchmark("shared hasher", count, time.perf_counter() - start)
+
+
+async def ticker(stop: asyncio.Event, delays: list):
+    """measures how late the event loop wakes up while the logins run"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        delays.append(time.perf_counter() - start - 0.01)
+
+
+async def logins(hashed: str, use_async: bool):
+    hasher = CryptoFactory.shared("ARGON2")
+    stop, delays = asyncio.Event(), []
+    task = asyncio.create_task(ticker(stop, delays))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    if use_async:
+        await asyncio.gather(*(hasher.verify_async(hashed, "password") for _ in range(LOGINS)))
+    else:
+        for _ in range(LOGINS):
+            hasher.verify(hashed, "password")
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await task
+    name = "verify_async" if use_async else "verify (blocking)"
+    benchmark(name, LOGINS, elapsed, f"max loop delay {max(delays, default=elapsed):.3f}s")
+
+
+def run():
+    instance_creation()
+    hashed = CryptoFactory.shared("ARGON2").hash("password")
+    asyncio.run(logins(hashed, use_async=False))
+    asyncio.run(logins(hashed, use_async=True))
+
+
+if __name__ == "__main__":
+    run()
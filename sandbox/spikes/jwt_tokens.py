@@ -0,0 +1,82 @@
+import sys
+import time
+from typing import Callable
+
+import jwt
+
+from vbcore.crypto.keys import ECCKey, RSAKey, SecretKey
+from vbcore.crypto.tokens import (
+    JwtECDSA,
+    JwtHandler,
+    JwtHMAC,
+    JwtKey,
+    JwtKeySet,
+    JwtRSA,
+)
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+HOT_TOKENS = 100
+
+
+def benchmark(name: str, count: int, elapsed: float):
+    print(f"{name:<28} {count / elapsed:>12,.1f} ops/s")
+
+
+def run_handler(name: str, factory: Callable[..., JwtHandler]):
+    handler = factory()
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        jwt.encode({"sub": "user"}, handler.encode_key, algorithm=handler.algorithm)
+    benchmark(f"{name} encode pem", COUNT, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tokens = [handler.encode({"sub": f"user-{i}"}, expire_after=60) for i in range(COUNT)]
+    benchmark(f"{name} encode", COUNT, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for token in tokens:
+        jwt.decode(token, handler.decode_key, algorithms=[handler.algorithm])
+    benchmark(f"{name} decode pem", COUNT, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for token in tokens:
+        handler.decode(token)
+    benchmark(f"{name} decode", COUNT, time.perf_counter() - start)
+
+    cached = factory(token_cache_size=HOT_TOKENS)
+    hot_tokens = tokens[:HOT_TOKENS]
+    for token in hot_tokens:
+        cached.decode(token)
+    start = time.perf_counter()
+    for index in range(COUNT):
+        cached.decode(hot_tokens[index % HOT_TOKENS])
+    benchmark(f"{name} decode cached", COUNT, time.perf_counter() - start)
+
+
+def run_key_set(rsa_key: RSAKey):
+    """the decode key is looked up by the kid of the token, among 11 keys"""
+    keys = [JwtKey.from_key("rsa", rsa_key)]
+    keys.extend(JwtKey.from_key(f"rsa-{i}", RSAKey()) for i in range(10))
+    keyset = JwtKeySet(lambda: keys)
+
+    start = time.perf_counter()
+    tokens = [keyset.encode({"sub": f"user-{i}"}, expire_after=60) for i in range(COUNT)]
+    benchmark("RS256 key set encode", COUNT, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for token in tokens:
+        keyset.decode(token)
+    benchmark("RS256 key set decode", COUNT, time.perf_counter() - start)
+
+
+def run():
+    secret, rsa_key, ecc_key = SecretKey(), RSAKey(), ECCKey(curve="P-256")
+    run_handler("HS256", lambda **kw: JwtHMAC(secret, audience=None, **kw))
+    run_handler("RS256", lambda **kw: JwtRSA(rsa_key, **kw))
+    run_handler("ES256", lambda **kw: JwtECDSA(ecc_key, **kw))
+
+    run_key_set(rsa_key)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,14 +1,14 @@
 from vbcore.date_helper import DateFmt
-from vbcore.db.mysql_dumper import MySQLDumper, MysqlBackup
+from vbcore.db.mysql_dumper import MysqlBackup, MySQLDumper
 from vbcore.loggers import Loggers
 
 
 def backup_as_archive(_dumper: MySQLDumper, **kwargs):
-    MysqlBackup(_dumper, **kwargs).backup_as_archive(file_prefix="backup")
+    MysqlBackup(_dumper, workers=4, **kwargs).backup_as_archive(file_prefix="backup")
 
 
 def backup_single_files(_dumper: MySQLDumper, **kwargs):
-    MysqlBackup(_dumper, **kwargs).backup_single_files(file_prefix="database")
+    MysqlBackup(_dumper, workers=4, **kwargs).backup_single_files(file_prefix="database")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import time
+
+import sqlalchemy as sa
+from sqlalchemy.sql import text as text_sql
+
+from vbcore.db.support import SQLASupport
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+def write_script(filename: str):
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write("CREATE TABLE sample (id INTEGER PRIMARY KEY, name TEXT);\n")
+        for index in range(ROWS):
+            file.write(f"INSERT INTO sample (id, name) VALUES ({index}, 'name-{index}');\n")
+
+
+def legacy_exec(url: str, filename: str):
+    """as exec_from_file did before: whole file in memory, split on the separator"""
+    engine = sa.create_engine(url)
+    with engine.connect() as conn, open(filename, encoding="utf-8") as f:
+        for statement in f.read().split(";\n"):
+            if not statement.startswith("--"):
+                conn.execute(text_sql(statement))
+        conn.commit()
+
+
+def benchmark(name: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {ROWS / elapsed:>12,.0f} statements/s")
+
+
+def run():
+    with tempfile.TemporaryDirectory() as folder:
+        script = os.path.join(folder, "seed.sql")
+        write_script(script)
+        for name, func, kwargs in (
+            ("legacy", legacy_exec, {}),
+            ("streaming", SQLASupport.exec_from_file, {"progress": lambda _: None}),
+            ("streaming merged", SQLASupport.exec_from_file, {"insert_rows": 500}),
+        ):
+            url = f"sqlite:///{folder}/{name.replace(' ', '_')}.db"
+            benchmark(name, func, url, script, **kwargs)
+
+
+if __name__ == "__main__":
+    run()
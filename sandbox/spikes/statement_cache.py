@@ -0,0 +1,80 @@
+import sys
+import time
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+from vbcore.base import BaseDTO
+from vbcore.db.repo import CrudRepo
+from vbcore.db.sqla import SQLAConnector
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+class Sample(declarative_base()):  # type: ignore
+    __tablename__ = "sample"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String(50))
+
+
+@dataclass(frozen=True, kw_only=True)
+class SampleInput(BaseDTO):
+    name: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class SampleDTO(BaseDTO):
+    id: int
+    name: str
+
+
+def benchmark(name: str, func, *args):
+    start = time.perf_counter()
+    for index in range(1, ROWS + 1):
+        func(index, *args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {ROWS / elapsed:>12,.0f} ops/s")
+
+
+def inline_insert(index: int, connection: sa.Connection):
+    """as the repo did before: a new statement with inline values every time"""
+    stm = sa.insert(Sample).values(**SampleInput(name=f"name-{index}").to_dict())
+    connection.execute(stm)
+
+
+def inline_lookup(index: int, connection: sa.Connection):
+    stm = sa.select(Sample).select_from(Sample).filter_by(id=index)
+    connection.execute(stm).one()
+
+
+def repo_insert(index: int, repo: CrudRepo):
+    repo.create(SampleInput(name=f"name-{index}"))
+
+
+def repo_lookup(index: int, repo: CrudRepo):
+    repo.get(id=index)
+
+
+def run():
+    for label, insert, lookup in (
+        ("inline", inline_insert, inline_lookup),
+        ("repo cached", repo_insert, repo_lookup),
+    ):
+        connector = SQLAConnector("sqlite://", cache_stats=True)
+        Sample.metadata.create_all(connector.engine)
+        with connector.engine.begin() as connection:
+            target = connection if label == "inline" else CrudRepo(connection, SampleDTO, Sample)
+            benchmark(f"{label} insert", insert, target)
+            benchmark(f"{label} lookup", lookup, target)
+
+        stats = connector.compiled_cache.stats()
+        print(f"{label:<24} compiled cache hit ratio: {stats.ratio:.4f}")
+        if label != "inline":
+            stats = target.querier.statements.stats()
+            print(f"{label:<24} statement cache hit ratio: {stats.ratio:.4f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,8 +1,13 @@
+import asyncio
 import string
+from concurrent.futures import ThreadPoolExecutor
 
+import pytest
 from hypothesis import given, settings, strategies as st
 
+from vbcore.crypto import CryptoFactory
 from vbcore.crypto.argon import Argon2Options
+from vbcore.crypto.exceptions import VBInvalidHashError
 from vbcore.tester.asserter import Asserter
 
 
@@ -36,3 +41,27 @@ def test_argon2_ok_text(argon2_instance, password):
 def test_argon2_ok_binary(argon2_instance, password):
     hasher = argon2_instance
     Asserter.assert_true(hasher.verify(hasher.hash(password), password))
+
+
+def test_shared_instance():
+    hasher = CryptoFactory.shared("ARGON2")
+    Asserter.assert_is(CryptoFactory.shared("ARGON2"), hasher)
+    Asserter.assert_different(CryptoFactory.shared("BCRYPT"), hasher)
+
+
+@pytest.mark.asyncio
+async def test_argon2_async(argon2_instance):
+    hashes = await asyncio.gather(*(argon2_instance.hash_async(f"pwd-{i}") for i in range(4)))
+    results = await asyncio.gather(
+        *(argon2_instance.verify_async(h, f"pwd-{i}") for i, h in enumerate(hashes)),
+        argon2_instance.verify_async(hashes[0], "wrong"),
+    )
+    Asserter.assert_equals(results, [True, True, True, True, False])
+
+
+@pytest.mark.asyncio
+async def test_argon2_async_executor(argon2_instance):
+    with ThreadPoolExecutor(1) as executor:
+        hashed = await argon2_instance.hash_async("password", executor=executor)
+        with pytest.raises(VBInvalidHashError):
+            await argon2_instance.verify_async(hashed, "wrong", True, executor=executor)
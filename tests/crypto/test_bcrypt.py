@@ -2,6 +2,7 @@ import string
 
 from hypothesis import given, settings, strategies as st
 
+from vbcore.crypto import CryptoFactory
 from vbcore.crypto.bcrypt import BcryptOptions
 from vbcore.tester.asserter import Asserter
 
@@ -30,3 +31,14 @@ def test_bcrypt_ok_text(bcrypt_instance, password):
 def test_bcrypt_ok_binary(bcrypt_instance, password):
     hasher = bcrypt_instance
     Asserter.assert_true(hasher.verify(hasher.hash(password), password))
+
+
+def test_bcrypt_many():
+    hasher = CryptoFactory.instance("BCRYPT", rounds=4)
+    items = ["text", b"bytes", memoryview(b"view")]
+    hashes = list(hasher.hash_many(items, workers=2, chunk_size=1))
+    Asserter.assert_equals(len(hashes), 3)
+
+    pairs = [*zip(hashes, items), (hashes[0], "other")]
+    results = list(hasher.verify_many(pairs, workers=2, chunk_size=1))
+    Asserter.assert_equals(results, [True, True, True, False])
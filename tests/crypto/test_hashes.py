@@ -36,3 +36,27 @@ def test_hash_ok_text(hash_class, password):
 def test_hash_ok_binary(hash_class, password):
     hasher = hash_class(HashOptions())
     Asserter.assert_true(hasher.verify(hasher.hash(password), password))
+
+
+@pytest.mark.parametrize("hash_class", HashClassLoader.load())
+def test_hash_many(hash_class):
+    hasher = hash_class(HashOptions())
+    items = ["text", b"bytes", memoryview(b"view"), bytearray(b"array")]
+    hashes = list(hasher.hash_many(items))
+    Asserter.assert_equals(hashes, [hasher.hash(item) for item in items])
+
+    pairs = [*zip(hashes, items), (hashes[0], "other")]
+    Asserter.assert_equals(list(hasher.verify_many(pairs)), [True, True, True, True, False])
+
+
+@pytest.mark.parametrize("hash_class", HashClassLoader.load())
+def test_hash_file(hash_class, tmp_path):
+    hasher = hash_class(HashOptions())
+    content = bytes(range(256)) * 1000
+    filename = tmp_path / "data.bin"
+    filename.write_bytes(content)
+
+    digest = hasher.hash_file(filename, chunk_size=1000)
+    Asserter.assert_equals(digest, hasher.hash(content))
+    Asserter.assert_true(hasher.verify_file(digest, filename))
+    Asserter.assert_false(hasher.verify_file(hasher.hash(b"other"), filename))
@@ -1,9 +1,29 @@
-from unittest.mock import ANY
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import List
+from unittest.mock import ANY, patch
 
+import jwt
 import pytest
 
+from vbcore.crypto.exceptions import VBCryptoError, VBMissingKey
 from vbcore.crypto.keys import ECCKey, RSAKey, SecretKey
-from vbcore.crypto.tokens import JwtECDSA, JwtHandler, JwtHMAC, JwtRSA
+from vbcore.crypto.tokens import (
+    ec_algorithm,
+    JwtECDSA,
+    JwtHandler,
+    JwtHMAC,
+    JwtKey,
+    JwtKeySet,
+    JwtRSA,
+    keys_from_files,
+    keys_from_jwks,
+    keys_from_jwks_file,
+    UnknownKeyIdError,
+)
 
 sample_issuer = "issuer"
 sample_audience = ["aud-1", "aud-2"]
@@ -60,3 +80,216 @@ def test_encoder_with_audience() -> None:
         "typ": "JWT",
         "sub": "user-id",
     }
+
+
+@pytest.mark.parametrize(
+    "token_handler",
+    [JwtRSA(RSAKey()), JwtECDSA(ECCKey()), JwtHMAC(SecretKey(), audience=None)],
+    ids=["RSA", "ECDSA", "HMAC"],
+)
+def test_keys_parsed_once(token_handler: JwtHandler) -> None:
+    signing_key, verifying_key = token_handler.signing_key, token_handler.verifying_key
+    assert token_handler.decode(token_handler.encode({"sub": "user-id"}))["sub"] == "user-id"
+    assert token_handler.signing_key is signing_key
+    assert token_handler.verifying_key is verifying_key
+    assert not isinstance(verifying_key, str)
+
+
+def test_missing_key() -> None:
+    with pytest.raises(VBMissingKey):
+        JwtHandler(algorithm="RS256", encode_key=RSAKey().private_key).decode("token")
+
+
+def test_token_cache() -> None:
+    handler = JwtRSA(RSAKey(), issuer=sample_issuer, token_cache_size=2)
+    token = handler.encode({"sub": "user-id"}, expire_after=5)
+
+    with patch.object(handler, "verify", wraps=handler.verify) as verify:
+        payload = handler.decode(token)
+        payload["sub"] = "changed"
+        assert handler.decode(token)["sub"] == "user-id"
+        handler.decode(token, verify_exp=False)
+    assert verify.call_count == 2
+    assert len(handler.token_cache) == 1
+
+    for index in range(3):
+        handler.decode(handler.encode({"sub": f"user-{index}"}, expire_after=5))
+    assert len(handler.token_cache) == 2
+
+
+def test_token_cache_expiration() -> None:
+    handler = JwtHMAC(SecretKey(), audience=None, token_cache_size=10)
+    token = handler.encode({"sub": "user-id"}, expire_after=1)
+    assert handler.decode(token)["sub"] == "user-id"
+
+    with patch("vbcore.crypto.tokens.time.time", return_value=time.time() + 2):
+        assert handler.token_cache.get(token) is None
+    assert len(handler.token_cache) == 0
+
+    with patch("jwt.api_jwt.datetime") as mock_datetime:
+        mock_datetime.now.return_value = datetime.now(tz=timezone.utc) + timedelta(seconds=2)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            handler.decode(token)
+
+
+def test_token_cache_invalid_token() -> None:
+    handler = JwtHMAC(SecretKey(), audience=None, token_cache_size=10)
+    other = JwtHMAC(SecretKey(), audience=None, token_cache_size=10)
+    token = other.encode({"sub": "user-id"})
+
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidSignatureError):
+            handler.decode(token)
+    assert len(handler.token_cache) == 0
+
+
+@pytest.mark.parametrize(
+    "curve, algorithm",
+    [("P-256", "ES256"), ("NIST P-384", "ES384"), ("p521", "ES512")],
+)
+def test_ec_algorithm(curve: str, algorithm: str) -> None:
+    assert ec_algorithm(curve) == algorithm
+
+
+def test_key_set_rotation() -> None:
+    old_key, new_key = JwtKey.from_key("old", RSAKey()), JwtKey.from_key("new", ECCKey())
+    keys = [old_key]
+    keyset = JwtKeySet(lambda: list(keys), issuer=sample_issuer, token_cache_size=10)
+    old_token = keyset.encode({"sub": "user-id"}, expire_after=5)
+    assert jwt.get_unverified_header(old_token)["kid"] == "old"
+
+    keys.insert(0, new_key)
+    assert keyset.reload() is True
+    new_token = keyset.encode({"sub": "user-id"})
+    assert jwt.get_unverified_header(new_token) == {"alg": "ES512", "kid": "new", "typ": "JWT"}
+    assert keyset.decode(old_token)["sub"] == "user-id"
+    assert keyset.decode(new_token)["iss"] == sample_issuer
+
+    keys.remove(old_key)
+    keyset.reload()
+    assert len(keyset.token_cache) == 0
+    with pytest.raises(UnknownKeyIdError):
+        keyset.decode(old_token)
+    assert keyset.decode_error(UnknownKeyIdError()) == "Invalid token key id"
+
+
+@pytest.mark.parametrize("key_class", [RSAKey, SecretKey])
+def test_key_set_reload_changed_key(key_class) -> None:
+    key = key_class()
+    keys = [JwtKey.from_key("one", key)]
+    keyset = JwtKeySet(lambda: list(keys), issuer=sample_issuer, token_cache_size=10)
+    cache = keyset.token_cache
+    assert cache is not None
+    token = keyset.encode({"sub": "user-id"})
+    keyset.decode(token)
+
+    keys[0] = JwtKey.from_key("one", key)
+    assert keyset.reload() is True
+    assert len(cache) == 1
+
+    keys[0] = JwtKey.from_key("one", key_class())
+    assert keyset.reload() is True
+    assert len(cache) == 0
+    with pytest.raises(jwt.InvalidSignatureError):
+        keyset.decode(token)
+
+
+def test_key_set_tokens_without_kid() -> None:
+    key = RSAKey()
+    token = JwtRSA(key).encode({"sub": "user-id"})
+    keyset = JwtKeySet(lambda: [JwtKey.from_key("rsa", key)])
+    assert keyset.decode(token)["sub"] == "user-id"
+
+
+def test_key_set_algorithm_of_the_key() -> None:
+    rsa_key = RSAKey()
+    keyset = JwtKeySet(lambda: [JwtKey.from_key("rsa", rsa_key)])
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        keyset.decode(jwt.encode({"sub": "user-id"}, "secret", headers={"kid": "rsa"}))
+
+
+def test_key_set_active_key() -> None:
+    keys = [JwtKey.from_key("one", SecretKey()), JwtKey.from_key("two", SecretKey())]
+    keyset = JwtKeySet(lambda: keys, active_kid="two")
+    assert keyset.active_key.kid == "two"
+    assert keyset.algorithm == "HS256"
+    assert keyset.to_jwks() == {"keys": []}
+
+    with pytest.raises(VBMissingKey):
+        JwtKeySet(lambda: keys, active_kid="three")
+
+
+def test_key_set_from_files(tmp_path) -> None:
+    signer, other = RSAKey(), RSAKey()
+    signer.dump_keys(path=tmp_path, prefix="signer")
+    other.dump_keys(path=tmp_path, prefix="other")
+
+    issuer = JwtKeySet(lambda: keys_from_files({"signer": tmp_path / "signer-private.pem"}))
+    verifier = JwtKeySet(
+        lambda: keys_from_files(
+            {"signer": tmp_path / "signer-public.pem", "other": tmp_path / "other-public.pem"}
+        )
+    )
+    assert verifier.keys.keys() == {"signer", "other"}
+    assert verifier.decode(issuer.encode({"sub": "user-id"}))["sub"] == "user-id"
+    with pytest.raises(VBMissingKey):
+        verifier.encode({"sub": "user-id"})
+    with pytest.raises(UnknownKeyIdError):
+        verifier.decode(JwtRSA(other).encode({"sub": "user-id"}))
+
+
+def test_key_set_jwks(tmp_path) -> None:
+    keys = [JwtKey.from_key("rsa", RSAKey()), JwtKey.from_key("ec", ECCKey(curve="P-256"))]
+    issuer = JwtKeySet(lambda: keys, active_kid="ec")
+    jwks = issuer.to_jwks()
+    assert [(jwk["kid"], jwk["alg"]) for jwk in jwks["keys"]] == [("rsa", "RS256"), ("ec", "ES256")]
+
+    verifier = JwtKeySet(lambda: keys_from_jwks(jwks))
+    assert verifier.keys["ec"].signing_key is None
+    assert verifier.decode(issuer.encode({"sub": "user-id"}))["sub"] == "user-id"
+
+    secret = {"kty": "oct", "kid": "hmac", "k": "c2VjcmV0"}
+    rsa_key = JwtKey.from_key("rsa", RSAKey()).signing_key
+    private = jwt.algorithms.RSAAlgorithm.to_jwk(rsa_key, as_dict=True)
+    (tmp_path / "jwks.json").write_text(json.dumps({"keys": [secret, {**private, "kid": "rsa"}]}))
+    keyset = JwtKeySet(partial(keys_from_jwks_file, tmp_path / "jwks.json"))
+    assert keyset.active_key.kid == "hmac"
+    assert keyset.keys["rsa"].signing_key is not None
+    assert keyset.decode(keyset.encode({"sub": "user-id"}))["sub"] == "user-id"
+
+    with pytest.raises(VBMissingKey):
+        keys_from_jwks({"keys": [{"kty": "oct", "k": "c2VjcmV0"}]})
+
+
+def test_key_set_reloader() -> None:
+    keys = [JwtKey.from_key("one", SecretKey())]
+    loaded = threading.Event()
+
+    def loader():
+        if len(keys) > 1:
+            loaded.set()
+        return list(keys)
+
+    keyset = JwtKeySet(loader)
+    thread = keyset.start_reloader(interval=0.01)
+    assert keyset.start_reloader() is thread
+
+    keys.append(JwtKey.from_key("two", SecretKey()))
+    assert loaded.wait(5)
+    keyset.stop_reloader(timeout=5)
+    assert not thread.is_alive()
+    assert keyset.keys.keys() == {"one", "two"}
+
+
+def test_key_set_reload_error() -> None:
+    keys = [JwtKey.from_key("one", SecretKey())]
+
+    def loader() -> List[JwtKey]:
+        if not keys:
+            raise VBCryptoError("no keys")
+        return keys
+
+    keyset = JwtKeySet(loader)
+    keys.clear()
+    assert keyset.reload() is False
+    assert keyset.active_key.kid == "one"
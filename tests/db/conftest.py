@@ -1,8 +1,12 @@
 import pytest
+import pytest_asyncio
 import sqlalchemy as sa
 
+from vbcore.db.aiosqla import AsyncSQLAConnector
 from vbcore.db.base import Model, SQLAConnector
+from vbcore.db.retry import RetryParams, TransactionRetry
 from vbcore.db.support import SQLASupport
+from vbcore.db.views import DDLCreateMaterializedView
 
 
 class SampleUser(Model):
@@ -13,6 +17,17 @@ class SampleUser(Model):
     description = sa.Column(sa.Text())
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
 def db_session(conn):
     with conn.connection() as session:
         conn.create_all()
@@ -29,6 +44,14 @@ def connector():
     return SQLAConnector("sqlite://", echo=True)
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_connector(tmp_path):
+    _connector = AsyncSQLAConnector(f"sqlite+aiosqlite:///{tmp_path}/async.db")
+    await _connector.create_all()
+    yield _connector
+    await _connector.dispose()
+
+
 @pytest.fixture(scope="function")
 def local_session(connector):  # pylint: disable=redefined-outer-name
     return db_session(connector)
@@ -47,3 +70,45 @@ def session_save(local_session):  # pylint: disable=redefined-outer-name
 @pytest.fixture(scope="function")
 def support(sample_model, local_session):  # pylint: disable=redefined-outer-name
     return SQLASupport(model=sample_model, session=local_session)
+
+
+@pytest.fixture(scope="function")
+def retry_factory(connector):  # pylint: disable=redefined-outer-name
+    connector.create_all()
+
+    def _factory(**kwargs):
+        events = []
+        clock = FakeClock()
+        kwargs.setdefault("params", RetryParams(jitter=False))
+        retry = TransactionRetry(
+            connector.transaction,
+            hook=events.append,
+            sleep=clock.sleep,
+            clock=clock,
+            **kwargs,
+        )
+        return retry, events
+
+    return _factory
+
+
+@pytest.fixture(scope="function")
+def pooled_connector(tmp_path):
+    return SQLAConnector(
+        f"sqlite:///{tmp_path}/pool.db",
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.1,
+        pool_use_lifo=True,
+        pool_metrics=True,
+        slow_query_threshold=0,
+    )
+
+
+@pytest.fixture(scope="function")
+def views_metadata():
+    """the views of a test are not created by the other create_all"""
+    registered = dict(DDLCreateMaterializedView.registry)
+    yield sa.MetaData()
+    DDLCreateMaterializedView.registry.clear()
+    DDLCreateMaterializedView.registry.update(registered)
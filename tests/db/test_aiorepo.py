@@ -0,0 +1,96 @@
+from unittest.mock import ANY
+
+import pytest
+import sqlalchemy as sa
+
+from tests.db.test_repo import User, UserInput, UserOrm, UserUpsert
+from vbcore.db.aiorepo import AsyncCrudRepo
+from vbcore.db.exceptions import DBNonExistentTable
+from vbcore.tester.asserter import Asserter
+
+
+class AsyncUserRepo(AsyncCrudRepo[UserInput, User]):
+    pass
+
+
+async def collect(generator) -> list:
+    return [item async for item in generator]
+
+
+@pytest.mark.asyncio
+async def test_async_crud_perform(async_connector):
+    async with async_connector.connect() as connection:
+        repo = AsyncUserRepo(connection, User, UserOrm)
+        count = await repo.mutator.insert_many(
+            (UserInput(name=name) for name in ("pippo", "pluto", "paperino")), batch_size=2
+        )
+        Asserter.assert_equals(count, 3)
+
+        await repo.create(UserInput(name="who"))
+        Asserter.assert_equals(await repo.get(id=4), User(id=4, name="who", created_at=ANY))
+
+        await repo.update(UserOrm.id == 4, name="what")
+        records = await collect(repo.get_all(id=4))
+        Asserter.assert_equals(records, [User(id=4, name="what", created_at=ANY)])
+
+        Asserter.assert_equals(await repo.delete(UserOrm.id == 4), 1)
+        records = await collect(repo.get_all(columns=(UserOrm.id, UserOrm.name)))
+        Asserter.assert_equals(
+            records,
+            [User(id=1, name="pippo"), User(id=2, name="pluto"), User(id=3, name="paperino")],
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_querier_streaming(async_connector):
+    async with async_connector.connect() as connection:
+        repo = AsyncUserRepo(connection, User, UserOrm)
+        await repo.mutator.insert_many([UserInput(name=f"user-{i}") for i in range(5)])
+
+        query = repo.querier.query_builder(UserOrm, (UserOrm.id, UserOrm.name))
+        records = await collect(repo.querier.query(query, yield_per=2))
+        Asserter.assert_equals(records, [User(id=i + 1, name=f"user-{i}") for i in range(5)])
+
+        batches = await collect(repo.get_batches(columns=(UserOrm.id, UserOrm.name), batch_size=2))
+        Asserter.assert_equals([len(batch) for batch in batches], [2, 2, 1])
+        Asserter.assert_equals([r for batch in batches for r in batch], records)
+
+
+@pytest.mark.asyncio
+async def test_async_upsert(async_connector):
+    async with async_connector.connect() as connection:
+        repo = AsyncUserRepo(connection, User, UserOrm)
+        await repo.mutator.insert_many([UserInput(name=f"user-{i}") for i in range(2)])
+        count = await repo.mutator.upsert_many(
+            [UserUpsert(id=1, name="updated"), UserUpsert(id=3, name="created")]
+        )
+        Asserter.assert_equals(count, 2)
+
+        records = await collect(repo.get_all(columns=(UserOrm.id, UserOrm.name)))
+        Asserter.assert_equals(
+            records,
+            [User(id=1, name="updated"), User(id=2, name="user-1"), User(id=3, name="created")],
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_transaction(async_connector):
+    async with async_connector.transaction() as session:
+        session.add(UserOrm(name="committed"))
+
+    with pytest.raises(ValueError):
+        async with async_connector.transaction() as session:
+            session.add(UserOrm(name="rolled-back"))
+            await session.flush()
+            raise ValueError("rollback")
+
+    async with async_connector.connection() as session:
+        result = await session.execute(sa.select(UserOrm.name))
+        Asserter.assert_equals(result.scalars().all(), ["committed"])
+
+
+@pytest.mark.asyncio
+async def test_async_errors_handler(async_connector):
+    async with async_connector.connection() as session:
+        with pytest.raises(DBNonExistentTable):
+            await session.execute(sa.text("SELECT * FROM table_not_found"))
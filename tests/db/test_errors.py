@@ -1,7 +1,11 @@
+import typing as t
+from types import SimpleNamespace
+
 import pytest
 import sqlalchemy as sa
+from sqlalchemy.engine import ExceptionContext
 
-from vbcore.db import exceptions as exc
+from vbcore.db import events, exceptions as exc
 from vbcore.tester.asserter import Asserter
 
 
@@ -147,3 +151,74 @@ def test_register_events(statement, exception, expected, support):
         support.session.execute(statement)
 
     Asserter.assert_equals(error.value.as_dict(), expected)
+
+
+@pytest.mark.parametrize(
+    "regex, message, group",
+    [
+        (r"^.*\b1213\b.*Deadlock found.*", "(1213, 'Deadlock found')", None),
+        (r"(?i).*foreign key (?P<group>\w+) failed", "FOREIGN KEY constraint failed", "constraint"),
+        (r".* no such table: (?P<group>.+)", "x no such table: users", "users"),
+        (r"no such table: (?P<group>.+)", "x no such table: users", False),
+        (r".*", "", None),
+        # a greedy leading wildcard captures the last occurrence
+        (r".* no such table: (?P<group>\w+)", "x no such table: a, y no such table: b", "b"),
+    ],
+)
+def test_compile_matcher(regex, message, group):
+    match = events.compile_matcher(regex)(message)
+    if group is False:
+        Asserter.assert_none(match)
+    else:
+        Asserter.assert_equals(match.groupdict().get("group"), group)
+
+
+def test_errors_handler_cached_dispatch(support, sample_model):
+    support.session.add(sample_model(id=1, name="name"))
+    support.session.commit()
+
+    hits = events.match_cache_info().hits
+    for _ in range(2):
+        support.session.add(sample_model(id=2, name="name"))
+        with pytest.raises(exc.DBDuplicateEntry) as error:
+            support.session.commit()
+        support.session.rollback()
+        Asserter.assert_equals(error.value.columns, ["name"])
+
+    Asserter.assert_equals(events.match_cache_info().hits, hits + 1)
+
+
+def handle_mysql_duplicate(value: str) -> exc.DBError:
+    orig = Exception(1062, f"Duplicate entry '{value}' for key 'name'")
+    context = SimpleNamespace(
+        sqlalchemy_exception=sa.exc.IntegrityError("INSERT INTO users", {}, orig),
+        original_exception=orig,
+        engine=SimpleNamespace(dialect=SimpleNamespace(name="mysql")),
+        connection=None,
+        is_disconnect=False,
+    )
+    return events.ErrorsHandler.handler(t.cast(ExceptionContext, context))
+
+
+def test_errors_handler_cached_by_error_code():
+    events.clear_match_cache()
+    for value in ("value-1", "value-2", "value-3"):
+        Asserter.assert_equals(
+            handle_mysql_duplicate(value).as_dict(),
+            {"error": "DBDuplicateEntry", "message": None, "columns": ["name"], "value": value},
+        )
+
+    info = events.match_cache_info()
+    Asserter.assert_equals((info.misses, info.hits), (1, 2))
+
+
+@pytest.mark.parametrize(
+    "regex, codes",
+    [
+        (r"^.*\b1062\b.*Duplicate entry", {1062}),
+        (r".*\(.*(?:2002|2003|2006)", {2002, 2003, 2006}),
+        (r"DETAIL: {2}Key \((?P<key>.+)\)", set()),
+    ],
+)
+def test_filter_error_codes(regex, codes):
+    Asserter.assert_equals(events.error_codes(regex), codes)
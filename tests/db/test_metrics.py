@@ -0,0 +1,83 @@
+import pytest
+import sqlalchemy as sa
+
+from vbcore.db.exceptions import DBNonExistentTable
+from vbcore.db.metrics import Histogram, QUERY_START_KEY
+from vbcore.tester.asserter import Asserter
+
+
+def test_histogram():
+    histogram = Histogram([1, 10])
+    for value in (0.5, 1, 5, 20):
+        histogram.observe(value)
+
+    Asserter.assert_equals(
+        histogram.as_dict(),
+        {
+            "count": 4,
+            "total": 26.5,
+            "mean": 6.625,
+            "max": 20,
+            "buckets": {"1": 2, "10": 1, "+inf": 1},
+        },
+    )
+
+
+def test_pool_options(pooled_connector):
+    pool = pooled_connector.engine.pool
+    Asserter.assert_equals(pool.size(), 2)
+    Asserter.assert_equals(pool._max_overflow, 1)  # pylint: disable=protected-access
+    Asserter.assert_equals(pool._timeout, 0.1)  # pylint: disable=protected-access
+
+
+def test_pool_metrics(pooled_connector):
+    engine = pooled_connector.engine
+    connections = [engine.connect() for _ in range(3)]
+    with pytest.raises(sa.exc.TimeoutError):
+        engine.connect()
+
+    stats = pooled_connector.pool_metrics.stats()
+    Asserter.assert_equals(stats.checked_out, 3)
+    Asserter.assert_equals(stats.overflow, 1)
+    Asserter.assert_equals(stats.connects, 3)
+    Asserter.assert_equals(stats.checkouts, 3)
+    Asserter.assert_equals(stats.timeouts, 1)
+    Asserter.assert_equals(stats.wait["count"], 4)
+    Asserter.assert_true(stats.wait["max"] >= 0.1)
+
+    connections[0].invalidate()
+    for conn in connections:
+        conn.close()
+
+    stats = pooled_connector.pool_metrics.stats()
+    Asserter.assert_equals(stats.checked_out, 0)
+    Asserter.assert_equals(stats.invalidations, 1)
+    Asserter.assert_equals(stats.lifetime["count"], 2)  # the invalidated and the overflow one
+
+
+def test_pool_metrics_after_dispose(pooled_connector):
+    pooled_connector.engine.dispose()
+    with pooled_connector.engine.connect():
+        pass
+
+    stats = pooled_connector.pool_metrics.stats()
+    Asserter.assert_equals(stats.wait["count"], 1)
+    Asserter.assert_equals(stats.checked_out, 0)
+
+
+def test_slow_query_logger(pooled_connector):
+    with pooled_connector.engine.connect() as conn:
+        conn.execute(sa.text("SELECT 1"))
+        conn.execute(sa.text("SELECT 2"))
+
+    Asserter.assert_equals(pooled_connector.slow_query_logger.slow_queries, 2)
+
+
+def test_slow_query_logger_error(pooled_connector):
+    with pooled_connector.engine.connect() as conn:
+        with pytest.raises(DBNonExistentTable):
+            conn.execute(sa.text("SELECT * FROM missing"))
+        Asserter.assert_equals(conn.info[QUERY_START_KEY], [])
+        conn.execute(sa.text("SELECT 1"))
+
+    Asserter.assert_equals(pooled_connector.slow_query_logger.slow_queries, 1)
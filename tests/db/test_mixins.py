@@ -4,7 +4,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from vbcore.db.base import Model
 from vbcore.db.exceptions import DBDuplicateEntry
-from vbcore.db.mixins import CatalogMixin, ExtraMixin
+from vbcore.db.mixins import CatalogMixin, ExtraMixin, UserMixin
 from vbcore.tester.asserter import Asserter
 
 
@@ -18,6 +18,11 @@ class SampleCatalogModel(Model, CatalogMixin):
     __tablename__ = "sample_catalog_model"
 
 
+class SampleUserModel(Model, UserMixin):
+    __tablename__ = "sample_user_model"
+    _hasher_type = "SHA256"
+
+
 def test_extra_mixin(local_session, session_save):
     extra_info = {"a": 1, "b": 2}
 
@@ -40,3 +45,13 @@ def test_catalog_mixin_constraint(support):
     Asserter.assert_equals(error.value.error_type, "DBDuplicateEntry")
     Asserter.assert_equals(error.value.columns, ["code", "type_id"])
     Asserter.assert_equals(error.value.value, None)
+
+
+@pytest.mark.asyncio
+async def test_user_mixin_password():
+    users = [SampleUserModel(email=f"{i}@mail.com", password=f"pwd-{i}") for i in range(2)]
+    Asserter.assert_is(users[0].hasher_instance, users[1].hasher_instance)
+    Asserter.assert_true(users[0].check_password("pwd-0"))
+    Asserter.assert_false(users[0].check_password("pwd-1"))
+    Asserter.assert_true(await users[1].check_password_async("pwd-1"))
+    Asserter.assert_false(await users[1].check_password_async("pwd-0"))
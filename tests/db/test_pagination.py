@@ -0,0 +1,63 @@
+import typing as t
+
+import pytest
+
+from tests.db.test_repo import User, UserInput, UserOrm, UserRepo
+from vbcore.db.base import SQLAConnector
+from vbcore.db.pagination import decode_cursor, encode_cursor, InvalidCursorError
+from vbcore.tester.asserter import Asserter
+
+
+def prepare_repo(connector: SQLAConnector, count: int) -> UserRepo:
+    connector.create_all()
+    repo = UserRepo(connector.engine.connect(), User, UserOrm)
+    repo.mutator.insert_many([UserInput(name=f"user-{i:02d}") for i in range(count)])
+    return repo
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([10, "name"])
+    Asserter.assert_equals(decode_cursor(cursor), [10, "name"])
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([])[:-1], "eyJhIjogMX0="])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_fetch_pages(connector: SQLAConnector) -> None:
+    repo = prepare_repo(connector, 7)
+
+    ids: t.List[int] = []
+    cursor: t.Optional[str] = None
+    pages = 0
+    while True:
+        page = repo.get_page((UserOrm.id,), cursor=cursor, page_size=3)
+        ids.extend(record.id for record in page.items)
+        pages += 1
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    Asserter.assert_equals(pages, 3)
+    Asserter.assert_equals(ids, list(range(1, 8)))
+
+
+def test_fetch_page_reverse_multiple_keys(connector: SQLAConnector) -> None:
+    repo = prepare_repo(connector, 5)
+    keys = (UserOrm.name, UserOrm.id)
+
+    page = repo.querier.fetch_page(UserOrm, keys, page_size=2, reverse=True)
+    Asserter.assert_equals([r.name for r in page.items], ["user-04", "user-03"])
+    Asserter.assert_equals(decode_cursor(t.cast(str, page.next_cursor)), ["user-03", 4])
+
+    page = repo.querier.fetch_page(UserOrm, keys, cursor=page.next_cursor, reverse=True)
+    Asserter.assert_equals([r.name for r in page.items], ["user-02", "user-01", "user-00"])
+    Asserter.assert_false(page.has_next)
+
+
+def test_fetch_page_cursor_mismatch(connector: SQLAConnector) -> None:
+    repo = prepare_repo(connector, 1)
+    with pytest.raises(InvalidCursorError):
+        repo.get_page((UserOrm.id,), cursor=encode_cursor([1, 2]))
@@ -24,6 +24,11 @@ class User(BaseDTO):
     created_at: Optional[datetime] = field(repr=False, default=None)
 
 
+@dataclass(frozen=True, kw_only=True)
+class UserUpsert(UserInput):
+    id: int
+
+
 class UserOrm(Model):
     __tablename__ = "user"
 
@@ -108,3 +113,41 @@ def test_crud_perform(connector: SQLAConnector) -> None:
             User(id=3, name="paperino", created_at=ANY),
         ],
     )
+
+
+def test_querier_streaming(connector: SQLAConnector) -> None:
+    connector.create_all()
+
+    connection = connector.engine.connect()
+    repo = UserRepo(connection, User, UserOrm)
+    repo.mutator.insert_many([UserInput(name=f"user-{i}") for i in range(5)])
+
+    query = repo.querier.query_builder(UserOrm, (UserOrm.id, UserOrm.name))
+    records = list(repo.querier.query(query, yield_per=2))
+    Asserter.assert_equals(
+        records, [User(id=i + 1, name=f"user-{i}", created_at=None) for i in range(5)]
+    )
+
+    batches = list(repo.get_batches(columns=(UserOrm.id, UserOrm.name), batch_size=2))
+    Asserter.assert_equals([len(batch) for batch in batches], [2, 2, 1])
+    Asserter.assert_equals([r for batch in batches for r in batch], records)
+
+
+def test_mutator_chunked_insert_and_upsert(connector: SQLAConnector) -> None:
+    connector.create_all()
+
+    connection = connector.engine.connect()
+    repo = UserRepo(connection, User, UserOrm)
+    count = repo.mutator.insert_many((UserInput(name=f"user-{i}") for i in range(5)), batch_size=2)
+    Asserter.assert_equals(count, 5)
+
+    count = repo.mutator.upsert_many(
+        [UserUpsert(id=1, name="updated"), UserUpsert(id=6, name="created")],
+        batch_size=1,
+    )
+    Asserter.assert_equals(count, 2)
+
+    records = list(repo.get_all(columns=(UserOrm.id, UserOrm.name)))
+    Asserter.assert_equals(len(records), 6)
+    Asserter.assert_equals(records[0], User(id=1, name="updated"))
+    Asserter.assert_equals(records[-1], User(id=6, name="created"))
@@ -0,0 +1,116 @@
+import pytest
+
+from vbcore.db.exceptions import DBConnectionError, DBDeadlock, DBDuplicateEntry
+from vbcore.db.retry import RetryOutcome, RetryParams, TransactionRetry
+from vbcore.tester.asserter import Asserter
+
+
+def count_users(connector, sample_model) -> int:
+    with connector.connection() as session:
+        return session.query(sample_model).count()
+
+
+def test_retry_decorator(connector, sample_model, retry_factory):
+    retry, events = retry_factory()
+    failures = iter([DBDeadlock(), DBConnectionError()])
+
+    @retry
+    def save(session, name):
+        session.add(sample_model(name=name))
+        session.flush()
+        if exc := next(failures, None):
+            raise exc
+        return name
+
+    Asserter.assert_equals(save("user"), "user")  # pylint: disable=no-value-for-parameter
+    Asserter.assert_equals(count_users(connector, sample_model), 1)
+    Asserter.assert_equals(
+        [(e.outcome, e.attempt, e.reason) for e in events],
+        [
+            (RetryOutcome.RETRY, 1, "DBDeadlock"),
+            (RetryOutcome.RETRY, 2, "DBConnectionError"),
+            (RetryOutcome.SUCCESS, 3, None),
+        ],
+    )
+    Asserter.assert_equals([e.delay for e in events], [0.05, 0.1, 0.0])
+
+
+def test_retry_context_manager(connector, sample_model, retry_factory):
+    retry, events = retry_factory()
+
+    for attempt in retry:
+        with attempt as session:
+            session.add(sample_model(name=f"user-{attempt.attempt}"))
+            session.flush()
+            if attempt.attempt < 3:
+                raise DBDeadlock()
+
+    Asserter.assert_equals(count_users(connector, sample_model), 1)
+    Asserter.assert_equals(len(events), 3)
+
+
+def test_retry_not_retryable(connector, sample_model, retry_factory):
+    retry, events = retry_factory()
+
+    @retry
+    def save(_):
+        raise DBDuplicateEntry(["name"])
+
+    with pytest.raises(DBDuplicateEntry):
+        save()  # pylint: disable=no-value-for-parameter
+
+    Asserter.assert_equals(count_users(connector, sample_model), 0)
+    Asserter.assert_equals([(e.outcome, e.attempt) for e in events], [(RetryOutcome.FAILURE, 1)])
+
+
+def test_retry_max_attempts(retry_factory):
+    retry, events = retry_factory(params=RetryParams(max_attempts=3, jitter=False))
+
+    @retry
+    def save(_):
+        raise DBDeadlock()
+
+    with pytest.raises(DBDeadlock):
+        save()  # pylint: disable=no-value-for-parameter
+
+    Asserter.assert_equals(
+        [e.outcome for e in events],
+        [RetryOutcome.RETRY, RetryOutcome.RETRY, RetryOutcome.FAILURE],
+    )
+
+
+def test_retry_max_elapsed(retry_factory):
+    params = RetryParams(initial_delay=1, multiplier=10, max_delay=100, max_elapsed=5, jitter=False)
+    retry, events = retry_factory(params=params)
+
+    @retry
+    def save(_):
+        raise DBDeadlock()
+
+    with pytest.raises(DBDeadlock):
+        save()  # pylint: disable=no-value-for-parameter
+
+    Asserter.assert_equals([e.outcome for e in events], [RetryOutcome.RETRY, RetryOutcome.FAILURE])
+    Asserter.assert_equals(events[-1].elapsed, 1.0)
+
+
+def test_retry_backoff_jitter(connector):
+    retry = TransactionRetry(connector.transaction, params=RetryParams(max_delay=0.3))
+    for attempt in range(1, 10):
+        delay = retry.backoff(attempt)
+        Asserter.assert_true(0 <= delay <= min(0.05 * 2 ** (attempt - 1), 0.3))
+
+
+def test_connector_retrying(connector, sample_model):
+    connector.create_all()
+    retrying = connector.retrying(params=RetryParams(initial_delay=0, jitter=False))
+    failures = iter([DBDeadlock()])
+
+    @retrying
+    def save(session):
+        session.add(sample_model(name="user"))
+        if exc := next(failures, None):
+            raise exc
+
+    save()  # pylint: disable=no-value-for-parameter
+    Asserter.assert_equals(count_users(connector, sample_model), 1)
@@ -0,0 +1,128 @@
+import pytest
+import sqlalchemy as sa
+
+from tests.db.conftest import SampleUser
+from vbcore.db.routing import (
+    RoutingConnector,
+    RoutingSession,
+    RoutingStrategy,
+    ShardedConnector,
+)
+from vbcore.tester.asserter import Asserter
+
+
+def prepare_routing(tmp_path, **kwargs) -> RoutingConnector:
+    connector = RoutingConnector(
+        f"sqlite:///{tmp_path}/primary.db",
+        replicas=[f"sqlite:///{tmp_path}/replica-{i}.db" for i in range(2)],
+        **kwargs,
+    )
+    connector.create_all()
+    for replica in connector.replica_connectors:
+        replica.create_all()
+    return connector
+
+
+def database_names(connector: RoutingConnector, engines) -> list:
+    names = {connector.engine: "primary"}
+    names.update({e: f"replica-{i}" for i, e in enumerate(connector.replicas.engines)})
+    return [names[e] for e in engines]
+
+
+def test_round_robin(tmp_path):
+    connector = prepare_routing(tmp_path)
+    engines = [connector.reader_engine() for _ in range(4)]
+    Asserter.assert_equals(
+        database_names(connector, engines),
+        ["replica-0", "replica-1", "replica-0", "replica-1"],
+    )
+
+
+def test_least_connections(tmp_path):
+    connector = prepare_routing(tmp_path, strategy=RoutingStrategy.LEAST_CONNECTIONS)
+    with connector.connect(readonly=True):
+        Asserter.assert_equals(connector.replicas.checked_out, [1, 0])
+        engine = connector.reader_engine()
+    Asserter.assert_equals(database_names(connector, [engine]), ["replica-1"])
+    Asserter.assert_equals(connector.replicas.checked_out, [0, 0])
+
+
+def test_core_connections(tmp_path):
+    connector = prepare_routing(tmp_path)
+    with connector.connect() as conn:
+        Asserter.assert_is(conn.engine, connector.engine)
+    with connector.connect(readonly=True) as conn:
+        Asserter.assert_in(conn.engine, connector.replicas.engines)
+
+
+def test_session_routing(tmp_path):
+    connector = prepare_routing(tmp_path)
+    with connector.transaction() as session:
+        session.add(SampleUser(id=1, name="user"))
+
+    with connector.connection() as session:
+        # replicas are not really replicated, so the record is found only on primary
+        Asserter.assert_none(session.get(SampleUser, 1))
+        Asserter.assert_none(session.execute(sa.select(SampleUser)).first())
+        locked = session.execute(sa.select(SampleUser).with_for_update()).scalar_one()
+        Asserter.assert_equals(locked.name, "user")
+
+
+def test_session_reads_own_writes_in_transaction(tmp_path):
+    connector = prepare_routing(tmp_path)
+    with connector.transaction() as session:
+        session.add(SampleUser(id=1, name="user"))
+        session.flush()
+        Asserter.assert_equals(session.execute(sa.select(SampleUser.name)).scalar(), "user")
+
+    with connector.connection() as session:
+        Asserter.assert_none(session.execute(sa.select(SampleUser.name)).scalar())
+
+
+@pytest.mark.parametrize("sticky_window, expected", [(0, None), (60, "user")])
+def test_session_sticky_window(tmp_path, sticky_window, expected):
+    connector = prepare_routing(tmp_path, sticky_window=sticky_window)
+    with connector.connection() as session:
+        session.add(SampleUser(id=1, name="user"))
+        session.commit()
+        Asserter.assert_equals(session.execute(sa.select(SampleUser.name)).scalar(), expected)
+
+
+def test_session_options_not_shared(tmp_path):
+    session_options = {"expire_on_commit": False, "info": {"name": "app"}}
+    connector = prepare_routing(tmp_path, session_options=session_options)
+    Asserter.assert_equals(session_options, {"expire_on_commit": False, "info": {"name": "app"}})
+
+    with connector.connection() as session:
+        Asserter.assert_true(isinstance(session(), RoutingSession))
+        Asserter.assert_is(session().connector, connector)
+        Asserter.assert_false(session().expire_on_commit)
+
+    for replica in connector.replica_connectors:
+        with replica.connection() as session:
+            Asserter.assert_false(isinstance(session(), RoutingSession))
+            Asserter.assert_false(session().expire_on_commit)
+            session().info["name"] = "replica"
+
+    with connector.connection() as session:
+        Asserter.assert_equals(session().info, {"name": "app"})
+
+
+def test_sharding(tmp_path):
+    sharded = ShardedConnector.from_urls([f"sqlite:///{tmp_path}/shard-{i}.db" for i in range(3)])
+    sharded.create_all()
+
+    for key in range(30):
+        with sharded.transaction(key) as session:
+            session.add(SampleUser(id=key, name=f"user-{key}"))
+
+    counts = []
+    for index, shard in enumerate(sharded):
+        with shard.connection() as session:
+            ids = session.execute(sa.select(SampleUser.id)).scalars().all()
+        Asserter.assert_true(all(sharded.shard_index(i) == index for i in ids))
+        counts.append(len(ids))
+
+    Asserter.assert_equals(sum(counts), 30)
+    Asserter.assert_true(all(counts))
+    Asserter.assert_equals(sharded.shard_index("key"), sharded.shard_index("key"))
@@ -0,0 +1,66 @@
+# pylint: disable=redefined-outer-name
+from unittest.mock import MagicMock
+
+import pytest
+import sqlalchemy as sa
+
+from tests.db.test_repo import User, UserInput, UserOrm
+from vbcore.batch import LinearExecutor, PCTask
+from vbcore.db.base import SQLAConnector
+from vbcore.db.exceptions import DBError
+from vbcore.db.scan import KeyRange, RangeScanner, RangeScanTask
+from vbcore.tester.asserter import Asserter
+
+
+@pytest.fixture(scope="function")
+def scanner(tmp_path) -> RangeScanner:
+    connector = SQLAConnector(f"sqlite:///{tmp_path}/scan.db")
+    connector.create_all()
+    with connector.engine.begin() as conn:
+        conn.execute(sa.insert(UserOrm), [UserInput(name=f"{i}").to_dict() for i in range(100)])
+    return RangeScanner(connector.engine, User, UserOrm, workers=3, batch_size=7)
+
+
+def test_partitions(scanner):
+    Asserter.assert_equals(scanner.key_bounds(), KeyRange(1, 101))
+    Asserter.assert_equals(
+        scanner.partitions(),
+        [KeyRange(1, 35), KeyRange(35, 68), KeyRange(68, 101)],
+    )
+
+
+def test_partitions_empty_table(scanner):
+    scanner.clauses = (UserOrm.id > 1000,)
+    Asserter.assert_none(scanner.key_bounds())
+    Asserter.assert_equals(scanner.partitions(), [])
+    Asserter.assert_equals(list(scanner.scan()), [])
+
+
+def test_scan(scanner):
+    batches = list(scanner.scan())
+    ids = sorted(record.id for batch in batches for record in batch)
+    Asserter.assert_equals(ids, list(range(1, 101)))
+    Asserter.assert_true(all(len(batch) <= 7 for batch in batches))
+
+
+def test_scan_early_close(scanner):
+    scanner.queue_size = 1
+    generator = scanner.scan()
+    Asserter.assert_equals(len(next(generator)), 7)
+    generator.close()
+
+
+def test_scan_error(scanner):
+    scanner.columns = (sa.literal_column("missing"),)
+    with pytest.raises(DBError):
+        list(scanner.scan())
+
+
+def test_range_scan_task(scanner):
+    consumer = MagicMock(spec=PCTask)
+    executor = LinearExecutor(RangeScanTask(scanner), consumer)
+    executor.run_on(scanner.partitions(2))
+
+    records = [r for call in consumer.perform.call_args_list for r in call.args[0]]
+    Asserter.assert_equals(len(records), 100)
+    Asserter.assert_equals(consumer.perform.call_count, 2)
@@ -1,8 +1,35 @@
+import pytest
 import sqlalchemy as sa
 
-from vbcore.db.base import LoaderModel
+from vbcore.db.base import LoaderModel, LoadStrategy, SQLAConnector
 from vbcore.tester.asserter import Asserter
 
+LOADER_ROWS = 2000
+# the loaders are only for these tests, so they are not created by the other create_all
+LOADERS_METADATA = sa.MetaData()
+
+
+class OrmLoader(LoaderModel):
+    __tablename__ = "orm_loader"
+    metadata = LOADERS_METADATA
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String(200))
+
+    values = tuple({"id": i, "name": f"name-{i}"} for i in range(LOADER_ROWS))
+
+
+class CoreLoader(LoaderModel):
+    __tablename__ = "core_loader"
+    metadata = LOADERS_METADATA
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String(200))
+
+    load_strategy = LoadStrategy.CORE
+    load_batch_size = 500
+    values = tuple({"id": i, "name": f"name-{i}"} for i in range(LOADER_ROWS))
+
 
 def test_connection(local_session):
     cursor = local_session.execute(sa.text("SELECT 1"))
@@ -36,3 +63,23 @@ def test_loaders(connector):
     connector.create_all(loaders=(SampleLoader,))
     with connector.connection() as session:
         Asserter.assert_equals(len(session.query(SampleLoader).all()), 3)
+
+
+@pytest.mark.parametrize("loader", [OrmLoader, CoreLoader])
+def test_loaders_bulk_insert(loader):
+    connector = SQLAConnector("sqlite://")
+    connector.metadata = LOADERS_METADATA
+    statements = []
+
+    @sa.event.listens_for(connector.engine, "before_execute")
+    def collect(_, statement, *__):
+        statements.append(statement)
+
+    connector.create_all(loaders=(loader,))
+    Asserter.assert_not_in(loader.__tablename__, SQLAConnector.metadata.tables)
+    if loader.load_strategy == LoadStrategy.CORE:
+        # an executemany for every chunk of load_batch_size
+        inserts = [s for s in statements if isinstance(s, sa.Insert)]
+        Asserter.assert_equals(len(inserts), LOADER_ROWS // loader.load_batch_size)
+    with connector.connection() as session:
+        Asserter.assert_equals(session.scalar(sa.select(sa.func.count(loader.id))), LOADER_ROWS)
@@ -1,10 +1,13 @@
 from dataclasses import dataclass
+from typing import ClassVar
+from unittest.mock import patch
 
 import pytest
 import sqlalchemy as sa
 
 from vbcore.base import BaseDTO
-from vbcore.db.base import Model
+from vbcore.db.aiosqla import AsyncSQLAConnector
+from vbcore.db.base import LoaderModel, Model, SQLAConnector
 from vbcore.tester.asserter import Asserter
 
 
@@ -40,9 +43,51 @@ def test_model_to_dict():
     )
 
 
-@pytest.mark.skip("implement me")
-def test_connector_register_loaders():
-    """TODO implement me"""
+class SampleLoader(LoaderModel):
+    __abstract__ = True
+    __table__ = Sample.__table__
+
+    calls: ClassVar[list] = []
+
+    @classmethod
+    def load_values(cls, session, *_, **__):
+        cls.calls.append(session)
+
+
+def test_connector_register_loaders(connector):
+    with connector.connection() as session:
+        listeners = connector.register_loaders(session, (SampleLoader,))
+    ((table, callback),) = listeners
+    Asserter.assert_is(table, Sample.__table__)
+    Asserter.assert_true(sa.event.contains(table, "after_create", callback))
+
+    connector.unregister_loaders(listeners)
+    Asserter.assert_false(sa.event.contains(table, "after_create", callback))
+
+
+def test_connector_create_all_removes_loaders(connector):
+    SampleLoader.calls.clear()
+    connector.create_all(loaders=(SampleLoader,))
+    SQLAConnector("sqlite://").create_all()
+    Asserter.assert_equals(len(SampleLoader.calls), 1)
+
+
+def test_connector_create_all_without_loaders(connector):
+    with patch.object(connector, "connection") as connection:
+        connector.create_all()
+    connection.assert_not_called()
+    Asserter.assert_true(sa.inspect(connector.engine).has_table(Sample.__tablename__))
+
+
+@pytest.mark.asyncio
+async def test_async_connector_create_all_removes_loaders(tmp_path):
+    SampleLoader.calls.clear()
+    connector = AsyncSQLAConnector(f"sqlite+aiosqlite:///{tmp_path}/loaders.db")
+    await connector.create_all(loaders=(SampleLoader,))
+    await connector.dispose()
+
+    SQLAConnector("sqlite://").create_all()
+    Asserter.assert_equals(len(SampleLoader.calls), 1)
 
 
 @pytest.mark.skip("implement me")
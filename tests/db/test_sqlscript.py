@@ -0,0 +1,84 @@
+import pytest
+
+from vbcore.db.sqlscript import merge_inserts, SqlSplitter
+from vbcore.tester.asserter import Asserter
+
+
+@pytest.mark.parametrize(
+    "script, expected",
+    [
+        ("select 1; select 2;", ["select 1", "select 2"]),
+        ("select 1;\nselect 2", ["select 1", "select 2"]),
+        ("select 'a;b'; select \"c;d\";", ["select 'a;b'", 'select "c;d"']),
+        ("select 'it''s;';", ["select 'it''s;'"]),
+        ("select `a;b` from t;", ["select `a;b` from t"]),
+        ("-- comment; here\nselect 1;", ["select 1"]),
+        ("select 1; -- trailing ;\n", ["select 1"]),
+        ("/* block;\ncomment */ select 1;", ["select 1"]),
+        ("/*!40101 SET NAMES utf8 */;", ["/*!40101 SET NAMES utf8 */"]),
+        ("select 'multi\nline;';", ["select 'multi\nline;'"]),
+        ("create function f() as $$ begin; end; $$;", ["create function f() as $$ begin; end; $$"]),
+        (";;\n;", []),
+    ],
+)
+def test_split(script, expected):
+    statements = list(SqlSplitter().split(script.splitlines(keepends=True)))
+    Asserter.assert_equals(statements, expected)
+
+
+def test_split_delimiter_command():
+    script = """
+DELIMITER //
+CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END//
+DELIMITER ;
+CALL p();
+"""
+    statements = list(SqlSplitter().split(script.splitlines(keepends=True)))
+    Asserter.assert_equals(
+        statements, ["CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END", "CALL p()"]
+    )
+
+
+def test_split_delimiter_only_between_statements():
+    script = "-- comment\n/* block */\nDELIMITER //\nselect\nDELIMITER ;\n1//\n"
+    statements = list(SqlSplitter().split(script.splitlines(keepends=True)))
+    Asserter.assert_equals(statements, ["select\nDELIMITER ;\n1"])
+
+
+def test_split_long_statement():
+    rows = [f"({i}, 'a;b'),\n" for i in range(50_000)]
+    lines = ["INSERT INTO t VALUES\n", *rows, "(0, 'c');\n", "select 1;\n"]
+    statements = list(SqlSplitter().split(lines))
+    Asserter.assert_equals(len(statements), 2)
+    Asserter.assert_true(statements[0].endswith("(49999, 'a;b'),\n(0, 'c')"))
+
+
+def test_split_mysql_options():
+    script = "# comment;\nselect 'a\\';b';\n"
+    splitter = SqlSplitter(backslash_escapes=True, hash_comments=True)
+    statements = list(splitter.split(script.splitlines(keepends=True)))
+    Asserter.assert_equals(statements, ["select 'a\\';b'"])
+
+
+def test_merge_inserts():
+    statements = [
+        "INSERT INTO t (a, b) VALUES (1, 'x')",
+        "INSERT INTO t (a, b) VALUES (2, 'y)')",
+        "INSERT INTO t (a, b) VALUES (3, now())",
+        "INSERT INTO t (a, b) VALUES (4, 'z') ON CONFLICT DO NOTHING",
+        "INSERT INTO t (a, b) VALUES (5, 'w') ON DUPLICATE KEY UPDATE b=VALUES(b)",
+        "INSERT INTO u VALUES (1)",
+        "INSERT INTO u VALUES (2)",
+        "UPDATE u SET a = 1",
+    ]
+    Asserter.assert_equals(
+        list(merge_inserts(statements, max_rows=2)),
+        [
+            "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y)')",
+            "INSERT INTO t (a, b) VALUES (3, now())",
+            "INSERT INTO t (a, b) VALUES (4, 'z') ON CONFLICT DO NOTHING",
+            "INSERT INTO t (a, b) VALUES (5, 'w') ON DUPLICATE KEY UPDATE b=VALUES(b)",
+            "INSERT INTO u VALUES (1), (2)",
+            "UPDATE u SET a = 1",
+        ],
+    )
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from tests.db.test_repo import User, UserInput, UserOrm, UserRepo
+from vbcore.base import BaseDTO
+from vbcore.db.base import Model
+from vbcore.db.repo import CrudRepo
+from vbcore.db.sqla import SQLAConnector
+from vbcore.db.statements import CacheStats, columns_cache_key, StatementCache
+from vbcore.tester.asserter import Asserter
+
+
+@dataclass(frozen=True, kw_only=True)
+class Note(BaseDTO):
+    id: int
+    note: Optional[str] = None
+
+
+class NoteOrm(Model):
+    __tablename__ = "notes"
+
+    id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    text: Mapped[Optional[str]] = mapped_column("note", sa.String(50), nullable=True)
+
+
+def test_statement_cache():
+    cache = StatementCache(maxsize=2)
+    first = cache.get(("select", 1), lambda: sa.select(sa.literal(1)))
+    Asserter.assert_is(cache.get(("select", 1), lambda: sa.select(sa.literal(2))), first)
+    cache.get(("select", 2), lambda: sa.select(sa.literal(2)))
+    cache.get(("select", 3), lambda: sa.select(sa.literal(3)))
+
+    stats = cache.stats()
+    Asserter.assert_equals((stats.hits, stats.misses), (1, 3))
+    Asserter.assert_equals(stats.ratio, 0.25)
+    Asserter.assert_equals(CacheStats(0, 0, 0).ratio, 0.0)
+
+
+def test_repo_cached_statements():
+    connector = SQLAConnector("sqlite://", cache_stats=True)
+    connector.create_all()
+    repo = UserRepo(connector.engine.connect(), User, UserOrm)
+    repo.querier.statements = StatementCache()
+    repo.mutator.statements = repo.querier.statements
+
+    for i in range(10):
+        repo.create(UserInput(name=f"user-{i}"))
+    for i in range(1, 11):
+        Asserter.assert_equals(repo.get((UserOrm.id, UserOrm.name), id=i).name, f"user-{i - 1}")
+
+    Asserter.assert_equals(repo.update_by({"id": 1}, name="updated"), 1)
+    Asserter.assert_equals(repo.update(UserOrm.id == 2, name="updated"), 1)
+    Asserter.assert_equals(repo.delete_by(name="updated"), 2)
+    Asserter.assert_equals(len(list(repo.get_all())), 8)
+
+    stats = repo.querier.statements.stats()
+    Asserter.assert_equals((stats.hits, stats.misses), (18, 5))
+
+    compiled = connector.compiled_cache.stats()
+    Asserter.assert_true(compiled.hits > compiled.misses)
+
+
+def test_repo_expression_columns():
+    connector = SQLAConnector("sqlite://")
+    connector.create_all()
+    repo = UserRepo(connector.engine.connect(), User, UserOrm)
+    repo.querier.statements = StatementCache()
+    repo.create(UserInput(name="user"))
+
+    for _ in range(2):
+        columns = (UserOrm.id, sa.func.upper(UserOrm.name).label("name"))
+        Asserter.assert_equals(repo.get(columns, id=1).name, "USER")
+    Asserter.assert_equals(len(repo.querier.statements), 0)
+
+    table = UserOrm.__table__
+    Asserter.assert_equals(
+        columns_cache_key((UserOrm.id, table.c.name, UserOrm)),
+        ((UserOrm, "id"), (table, "name"), UserOrm),
+    )
+    Asserter.assert_none(columns_cache_key((UserOrm.id, UserOrm.name.label("name"))))
+
+
+def test_repo_not_bindable_filters():
+    connector = SQLAConnector("sqlite://")
+    connector.create_all()
+    repo = CrudRepo[Note, Note](connector.engine.connect(), Note, NoteOrm)
+    repo.querier.statements = StatementCache()
+    repo.mutator.statements = repo.querier.statements
+    repo.mutator.insert_many([Note(id=1, note="a"), Note(id=2, note=None)])
+
+    Asserter.assert_equals(list(repo.get_all(text=None)), [Note(id=2, note=None)])
+    Asserter.assert_equals(repo.get(text="a"), Note(id=1, note="a"))
+    Asserter.assert_equals(len(repo.querier.statements), 1)  # only the insert
+
+    core_repo = CrudRepo[Note, Note](repo.mutator.connection, Note, NoteOrm.__table__)
+    Asserter.assert_equals(list(core_repo.get_all(note=None)), [Note(id=2, note=None)])
+
+    Asserter.assert_equals(repo.update(NoteOrm.id == 1, text=NoteOrm.text + "x"), 1)
+    Asserter.assert_equals(repo.update_by({"id": 1}, text=NoteOrm.text + "y"), 1)
+    Asserter.assert_equals(repo.update_by({"text": None}, text="b"), 1)
+    Asserter.assert_equals(list(repo.get_all()), [Note(id=1, note="axy"), Note(id=2, note="b")])
+
+    Asserter.assert_equals(repo.update_by({"id": 1}, text=None), 1)
+    Asserter.assert_equals(repo.delete_by(text=None), 1)
+    Asserter.assert_equals(list(repo.get_all()), [Note(id=2, note="b")])
@@ -1,5 +1,7 @@
 import pytest
+import sqlalchemy as sa
 
+from vbcore.db.support import SQLASupport
 from vbcore.tester.asserter import Asserter
 
 
@@ -79,3 +81,76 @@ def test_update_or_create(res_id, name, support):
     support.update_or_create({"name": name}, id=res_id)
     record = support.fetch(id=res_id).one()
     Asserter.assert_equals(record.name, name)
+
+
+def test_bulk_upsert_replaces_records(support):
+    support.bulk_upsert([support.model(id=1, name="name-1", description="desc-1")])
+    records = [support.model(id=i, name=f"new-{i}") for i in range(1, 3)]
+    support.bulk_upsert(records)
+
+    for record in records:
+        Asserter.assert_in(record, support.session)
+
+    stored = support.fetch().order_by(support.model.id).all()
+    Asserter.assert_equals([r.name for r in stored], ["new-1", "new-2"])
+    Asserter.assert_none(stored[0].description)
+
+
+def test_native_upsert_updates_values(support):
+    support.bulk_upsert([support.model(id=1, name="name-1", description="desc-1")])
+    records = [support.model(id=i, name=f"new-{i}") for i in range(1, 4)]
+    support.native_upsert(iter(records), batch_size=2)
+
+    for record in records:
+        Asserter.assert_not_in(record, support.session)
+
+    support.session.expire_all()
+    stored = support.fetch().order_by(support.model.id).all()
+    Asserter.assert_equals([r.name for r in stored], ["new-1", "new-2", "new-3"])
+    Asserter.assert_equals(stored[0].description, "desc-1")
+
+
+@pytest.mark.parametrize("insert_rows", [0, 3])
+def test_exec_from_file(insert_rows, tmp_path):
+    script = tmp_path / "seed.sql"
+    script.write_text(
+        "-- seed; data\n"
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);\n"
+        + "".join(f"INSERT INTO items (id, name) VALUES ({i}, 'item;{i}');\n" for i in range(10))
+        + "/* done */ UPDATE items SET name = 'first' WHERE id = 0;\n"
+    )
+
+    progress = []
+    url = f"sqlite:///{tmp_path}/seed.db"
+    result = SQLASupport.exec_from_file(
+        url, str(script), transaction_size=4, insert_rows=insert_rows, progress=progress.append
+    )
+
+    statements = 12 if not insert_rows else 6
+    Asserter.assert_equals(result.statements, statements)
+    Asserter.assert_equals(progress[-1], result)
+    Asserter.assert_equals(len(progress), result.transactions)
+
+    engine = sa.create_engine(url)
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT id, name FROM items ORDER BY id")).all()
+    engine.dispose()
+    Asserter.assert_equals(len(rows), 10)
+    Asserter.assert_equals(tuple(rows[0]), (0, "first"))
+    Asserter.assert_equals(tuple(rows[9]), (9, "item;9"))
+
+
+@pytest.mark.parametrize("skip_line_prefixes", [("--",), ()], ids=["skip-comments", "splitter"])
+def test_exec_from_file_comment_lines(skip_line_prefixes, tmp_path):
+    script = tmp_path / "comments.sql"
+    script.write_text(
+        "-- items; table\n"
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);\n"
+        "-- first; item\n"
+        "INSERT INTO items (id, name) VALUES (1, 'item-1');\n"
+    )
+
+    result = SQLASupport.exec_from_file(
+        f"sqlite:///{tmp_path}/comments.db", str(script), skip_line_prefixes=skip_line_prefixes
+    )
+    Asserter.assert_equals(result.statements, 2)
@@ -0,0 +1,45 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql, mysql, postgresql, sqlite
+
+from vbcore.db.exceptions import DBNotSupportedError
+from vbcore.db.upsert import UpsertBuilder
+from vbcore.tester.asserter import Asserter
+
+SAMPLE_TABLE = sa.Table(
+    "sample",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(50)),
+)
+
+
+@pytest.mark.parametrize(
+    "dialect, expected",
+    [
+        (postgresql.dialect(), "ON CONFLICT (id) DO UPDATE SET name = excluded.name"),
+        (sqlite.dialect(), "ON CONFLICT (id) DO UPDATE SET name = excluded.name"),
+        (mysql.dialect(), "ON DUPLICATE KEY UPDATE name = VALUES(name)"),
+    ],
+)
+def test_upsert_statement(dialect, expected):
+    stm = UpsertBuilder(SAMPLE_TABLE).build(dialect, ("id", "name"))
+    Asserter.assert_in(expected, str(stm.compile(dialect=dialect)))
+
+
+@pytest.mark.parametrize(
+    "dialect, expected",
+    [
+        (postgresql.dialect(), "ON CONFLICT (id) DO NOTHING"),
+        (mysql.dialect(), "INSERT IGNORE INTO"),
+    ],
+)
+def test_upsert_statement_nothing_to_update(dialect, expected):
+    stm = UpsertBuilder(SAMPLE_TABLE).build(dialect, ("id",))
+    Asserter.assert_in(expected, str(stm.compile(dialect=dialect)))
+
+
+def test_upsert_not_supported():
+    Asserter.assert_false(UpsertBuilder.supports(mssql.dialect()))
+    with pytest.raises(DBNotSupportedError):
+        UpsertBuilder(SAMPLE_TABLE).build(mssql.dialect())
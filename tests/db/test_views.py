@@ -2,11 +2,20 @@ from dataclasses import dataclass
 
 import pytest
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
 
+from tests.db.conftest import SampleUser
 from vbcore.base import BaseDTO
 from vbcore.db.base import ViewModel
 from vbcore.db.exceptions import DBNonExistentTable
-from vbcore.db.views import DDLCreateView
+from vbcore.db.views import (
+    DDLCreateMaterializedView,
+    DDLCreateView,
+    DDLDropMaterializedView,
+    DDLRefreshMaterializedView,
+    DDLViewCompiler,
+    refresh_materialized_views,
+)
 from vbcore.tester.asserter import Asserter
 
 
@@ -24,16 +33,23 @@ class SampleModel(ViewModel):
     name = sa.Column(sa.String)
 
 
-def test_create_view(connector):
+class SampleReport(ViewModel):
+    __tablename__ = "sample_report"
+
+    description = sa.Column(sa.Text, primary_key=True)
+    total = sa.Column(sa.Integer)
+
+
+def test_create_view(connector, views_metadata):
     view_name = "sample_view"
 
     select = sa.select(
         sa.literal_column("1").label("id"),
         sa.literal_column("'name'").label("name"),
     )
-    DDLCreateView(name=view_name, metadata=connector.metadata, select=select)
+    DDLCreateView(name=view_name, metadata=views_metadata, select=select)
 
-    connector.create_all()
+    views_metadata.create_all(connector.engine)
     with connector.connection() as session:
         result = session.query(SampleModel).all()
 
@@ -42,9 +58,84 @@ def test_create_view(connector):
         [SampleModel(id=1, name="name").to_dto()],
     )
 
-    connector.drop_all()
+    views_metadata.drop_all(connector.engine)
     with connector.connection() as session:
         with pytest.raises(DBNonExistentTable) as error:
             session.query(SampleModel).all()
 
         Asserter.assert_equals(error.value.table, view_name)
+
+
+def test_materialized_view_snapshot(connector, views_metadata):
+    select = sa.select(
+        SampleUser.description.label("description"),
+        sa.func.count().label("total"),  # pylint: disable=not-callable
+    ).group_by(SampleUser.description)
+    DDLCreateMaterializedView(
+        name="sample_report",
+        select=select,
+        metadata=views_metadata,
+        unique_key=("description",),
+    )
+
+    connector.create_all()
+    views_metadata.create_all(connector.engine)
+    with connector.transaction() as session:
+        for index in range(5):
+            session.add(SampleUser(id=index, name=f"user-{index}", description=f"{index % 2}"))
+
+    with connector.connection() as session:
+        # the snapshot is taken at creation time
+        Asserter.assert_equals(session.query(SampleReport).all(), [])
+
+    refresh_materialized_views(connector.engine, "sample_report")
+    refresh_materialized_views(connector.engine)
+    with connector.connection() as session:
+        records = session.query(SampleReport).order_by(SampleReport.description)
+        Asserter.assert_equals([(r.description, r.total) for r in records], [("0", 3), ("1", 2)])
+
+    views_metadata.drop_all(connector.engine)
+    connector.drop_all()
+
+
+@pytest.mark.parametrize(
+    "element, dialect, expected",
+    [
+        (
+            DDLCreateMaterializedView("report", sa.select(sa.literal_column("1").label("id"))),
+            postgresql.dialect(),
+            "CREATE MATERIALIZED VIEW report AS SELECT 1 AS id",
+        ),
+        (
+            DDLCreateMaterializedView(
+                "report",
+                sa.select(sa.literal_column("1").label("id")),
+                schema="stats",
+                with_data=False,
+            ),
+            postgresql.dialect(),
+            "CREATE MATERIALIZED VIEW stats.report AS SELECT 1 AS id WITH NO DATA",
+        ),
+        (
+            DDLCreateMaterializedView(
+                "report", sa.select(sa.literal_column("1").label("id")), with_data=False
+            ),
+            sqlite.dialect(),
+            "CREATE TABLE report AS SELECT * FROM (SELECT 1 AS id) AS snapshot WHERE 1 = 0",
+        ),
+        (
+            DDLDropMaterializedView("report"),
+            postgresql.dialect(),
+            "DROP MATERIALIZED VIEW IF EXISTS report",
+        ),
+        (DDLDropMaterializedView("report"), sqlite.dialect(), "DROP TABLE IF EXISTS report"),
+        (
+            DDLRefreshMaterializedView("report", concurrently=True),
+            postgresql.dialect(),
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY report",
+        ),
+    ],
+)
+def test_materialized_view_ddl(element, dialect, expected):
+    DDLViewCompiler().register()
+    Asserter.assert_equals(str(element.compile(dialect=dialect)), expected)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import pytest
 
@@ -12,8 +12,16 @@ class SampleDTO(BaseDTO):
     name: str
 
 
+@dataclass(frozen=True)
+class NestedDTO(BaseDTO):
+    sample: SampleDTO
+    tags: list
+
+
 def test_base_dto_fields():
     Asserter.assert_equals(SampleDTO.field_names(), ("id", "name"))
+    Asserter.assert_equals(SampleDTO.field_set(), frozenset(("id", "name")))
+    Asserter.assert_equals(NestedDTO.field_names(), ("sample", "tags"))
     Asserter.assert_equals(SampleDTO.field_types(), {"id": "int", "name": "str"})
 
 
@@ -22,9 +30,52 @@ def test_base_dto_to_dict():
     Asserter.assert_equals(data.to_dict(), {"id": 1, "name": "name"})
 
 
+def test_base_dto_to_dict_deep_and_shallow():
+    sample = SampleDTO(id=1, name="name")
+    data = NestedDTO(sample=sample, tags=["a"])
+
+    Asserter.assert_equals(data.to_dict(), {"sample": {"id": 1, "name": "name"}, "tags": ["a"]})
+    Asserter.assert_is_not(data.to_dict()["tags"], data.tags)
+
+    shallow = data.to_dict(deep=False)
+    Asserter.assert_equals(shallow, {"sample": sample, "tags": ["a"]})
+    Asserter.assert_is(shallow["tags"], data.tags)
+    Asserter.assert_equals(
+        data.to_dict(factory=list, deep=False), [("sample", sample), ("tags", ["a"])]
+    )
+    Asserter.assert_equals(data(tags=["b"]).tags, ["b"])
+
+
 def test_base_dto_from_dict():
     data = {"id": 1, "name": "name"}
     Asserter.assert_equals(SampleDTO.from_dict(**data), SampleDTO(id=1, name="name"))
+    Asserter.assert_equals(
+        SampleDTO.from_dict(**data, extra="ignored"), SampleDTO(id=1, name="name")
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class DefaultsDTO(BaseDTO):
+    id: int
+    name: str = "name"
+    tags: list = field(default_factory=list)
+    computed: int = field(default=0, init=False)
+
+
+def test_base_dto_from_dict_defaults():
+    Asserter.assert_equals(DefaultsDTO.from_dict(id=1), DefaultsDTO(id=1))
+    Asserter.assert_equals(
+        DefaultsDTO.from_dict(id=1, name="other", tags=["a"], computed=1),
+        DefaultsDTO(id=1, name="other", tags=["a"]),
+    )
+    Asserter.assert_is_not(DefaultsDTO.from_dict(id=1).tags, DefaultsDTO.from_dict(id=2).tags)
+
+
+def test_base_dto_from_dict_missing_field():
+    with pytest.raises(TypeError) as error:
+        DefaultsDTO.from_dict(name="name")
+
+    Asserter.assert_in("id", str(error.value))
 
 
 def test_singleton():
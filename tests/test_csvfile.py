@@ -1,4 +1,12 @@
-from vbcore.csvfile import CSVHandler, CSVParams
+import array
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+
+from vbcore.csvfile import CSVHandler, CSVParams, SortKey, SortParams
 from vbcore.tester.asserter import Asserter
 
 SAMPLE_CSV = """code;name
@@ -59,3 +67,277 @@ def test_csv_sort(tmpdir):
 
     handler.sort(columns=["A", "C"])
     Asserter.assert_equals(list(handler.readlines(file.strpath)), SORTED_RECORDS)
+
+
+class UpperCSVHandler(CSVHandler):
+    def after_read_hook(self, record: dict) -> dict:
+        return {k: v.upper() for k, v in record.items()}
+
+
+def test_csv_chunk_ranges(tmpdir):
+    file = tmpdir.join("test_csv_chunk_ranges.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    Asserter.assert_equals(
+        handler.chunk_ranges(chunk_size=10),
+        [(8, 24), (24, 40), (40, 48)],
+    )
+
+
+def test_csv_readlines_parallel(tmpdir):
+    file = tmpdir.join("test_csv_readlines_parallel.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    records = list(handler.readlines_parallel(workers=2, chunk_size=10))
+    Asserter.assert_equals(records, UNSORTED_RECORDS)
+
+    records = list(handler.readlines_parallel(workers=2, chunk_size=10, ordered=False))
+    Asserter.assert_equals(
+        sorted(records, key=lambda r: tuple(r.values())),
+        sorted(UNSORTED_RECORDS, key=lambda r: tuple(r.values())),
+    )
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        CountingExecutor.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_csv_readlines_parallel_bounded(tmpdir, ordered):
+    file = tmpdir.join("test_csv_readlines_parallel_bounded.csv")
+    file.write(("A;B\n" + "".join(f"{i};{i}\n" for i in range(100))).encode())
+
+    CountingExecutor.submitted = 0
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    with patch("vbcore.csvfile.ProcessPoolExecutor", CountingExecutor):
+        records = handler.readlines_parallel(workers=2, chunk_size=1, ordered=ordered)
+        next(records)
+        # 4 ranges in flight, plus the ones completed together that are being consumed
+        Asserter.assert_true(CountingExecutor.submitted <= 8)
+        Asserter.assert_equals(len(list(records)), 99)
+    Asserter.assert_equals(CountingExecutor.submitted, 100)
+
+
+def test_csv_readlines_parallel_hook(tmpdir):
+    file = tmpdir.join("test_csv_readlines_parallel_hook.csv")
+    file.write(SAMPLE_CSV.encode())
+
+    handler = UpperCSVHandler(params=CSVParams(delimiter=";"))
+    Asserter.assert_equals(
+        list(handler.readlines_parallel(file.strpath, workers=2, chunk_size=1)),
+        [{"code": "CODE-1", "name": "NAME-1"}, {"code": "CODE-2", "name": "NAME-2"}],
+    )
+
+
+def test_csv_external_sort(tmpdir):
+    file = tmpdir.join("test_csv_external_sort.csv")
+    file.write(UNSORTED.encode())
+    output = tmpdir.join("test_csv_external_sort_output.csv")
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    handler.sort(
+        columns=["A", "C"],
+        output_file=output.strpath,
+        sort_params=SortParams(memory_budget=1, temp_dir=tmpdir.strpath),
+    )
+    Asserter.assert_equals(list(handler.readlines(output.strpath)), SORTED_RECORDS)
+    Asserter.assert_equals(list(handler.readlines(file.strpath)), UNSORTED_RECORDS)
+
+
+def test_csv_external_sort_parallel(tmpdir):
+    file = tmpdir.join("test_csv_external_sort_parallel.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    handler.sort(columns=["A", "C"], sort_params=SortParams(memory_budget=1, workers=2))
+    Asserter.assert_equals(list(handler.readlines(file.strpath)), SORTED_RECORDS)
+
+
+@pytest.mark.parametrize("memory_budget", [1, 1024 * 1024], ids=["spilled", "in-memory"])
+def test_csv_sort_ragged_rows(tmpdir, memory_budget):
+    file = tmpdir.join("test_csv_sort_ragged_rows.csv")
+    file.write("A;B\n3;c\n1;a;extra;values\n2\n".encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    handler.sort(columns=["A"], sort_params=SortParams(memory_budget=memory_budget))
+    Asserter.assert_equals(file.read_text(encoding="utf-8"), "A;B\n1;a\n2;\n3;c\n")
+
+
+def test_csv_sort_spilled_runs_keep_none(tmpdir):
+    file = tmpdir.join("test_csv_sort_spilled_runs_keep_none.csv")
+    file.write("A;B\n3;c\n1;a;extra\n2\n".encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    runs = handler.spill_sorted_runs(
+        file.strpath, SortKey(["A"]), SortParams(memory_budget=1), tmpdir.strpath
+    )
+    Asserter.assert_equals(
+        [record for run in runs for record in handler.read_run(run)],
+        [{"A": "3", "B": "c"}, {"A": "1", "B": "a", None: ["extra"]}, {"A": "2", "B": None}],
+    )
+
+
+class CountingCSVHandler(CSVHandler):
+    records_read = 0
+
+    @contextmanager
+    def reader(self, filename=None):
+        def counter(reader):
+            for record in reader:
+                self.records_read += 1
+                yield record
+
+        with super().reader(filename) as reader:
+            yield counter(reader)
+
+
+def test_csv_sort_spills_first_run_before_reading(tmpdir):
+    file = tmpdir.join("test_csv_sort_spills_first_run_before_reading.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CountingCSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    records_read = []
+
+    def sort_run(records, *args):
+        records_read.append(handler.records_read)
+        return CSVHandler.sort_run(records, *args)
+
+    with patch.object(handler, "sort_run", side_effect=sort_run):
+        handler.sort(columns=["A", "C"], sort_params=SortParams(memory_budget=1))
+
+    Asserter.assert_equals(records_read, [2, 2, 3, 4, 5])
+    Asserter.assert_equals(list(handler.readlines(file.strpath)), SORTED_RECORDS)
+
+
+def test_csv_sort_stable_with_casts(tmpdir):
+    file = tmpdir.join("test_csv_sort_stable_with_casts.csv")
+    file.write("A;B\n10;a\n9;b\n10;c\n-1;d\n9;e\n".encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    handler.sort(
+        columns=["A"],
+        sort_params=SortParams(memory_budget=1, reverse=True, casts={"A": int}),
+    )
+    Asserter.assert_equals(
+        [r["B"] for r in handler.readlines(file.strpath)],
+        ["a", "c", "b", "e", "d"],
+    )
+
+
+def test_csv_readtuples(tmpdir):
+    file = tmpdir.join("test_csv_readtuples.csv")
+    file.write(SAMPLE_CSV.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    Asserter.assert_equals(
+        list(handler.readtuples()),
+        [("code-1", "name-1"), ("code-2", "name-2")],
+    )
+    Asserter.assert_equals(handler.fields, ["code", "name"])
+
+
+def test_csv_read_columns(tmpdir):
+    file = tmpdir.join("test_csv_read_columns.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    batches = list(handler.read_columns(3, dtypes={"A": "q", "B": "d"}, use_numpy=False))
+
+    Asserter.assert_equals(len(batches), 2)
+    Asserter.assert_equals(batches[0]["A"], array.array("q", [2, 1, 3]))
+    Asserter.assert_equals(batches[1]["B"], array.array("d", [1.0, 2.0]))
+    Asserter.assert_equals(batches[1]["C"], ["1", "3"])
+
+
+def test_csv_read_columns_numpy(tmpdir):
+    numpy = pytest.importorskip("numpy")
+    file = tmpdir.join("test_csv_read_columns_numpy.csv")
+    file.write(UNSORTED.encode())
+
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    (batch,) = list(handler.read_columns(dtypes={"A": "q"}))
+
+    Asserter.assert_isinstance(batch["A"], numpy.ndarray)
+    Asserter.assert_equals(batch["A"].tolist(), [2, 1, 3, 2, 1])
+    Asserter.assert_equals(batch["D"], ["1", "3", "2", "1", "3"])
+
+
+class FilterCSVHandler(CSVHandler):
+    def pre_write_hook(self, record: dict) -> dict:
+        return {**record, "name": record["name"].upper()}
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_csv_batch_writer(tmpdir, background):
+    file = tmpdir.join("test_csv_batch_writer.csv")
+    handler = CSVHandler(fields=["code", "name"], params=CSVParams(delimiter=";"))
+    with handler.batch_writer(file.strpath, batch_size=1, background=background) as writer:
+        writer.write({**SAMPLE_RECORDS[0], "extra": "ignored"})
+        writer.write(r for r in SAMPLE_RECORDS[1:])
+
+    Asserter.assert_equals(file.read_text(encoding="utf-8"), SAMPLE_CSV)
+
+
+def test_csv_batch_writer_hook(tmpdir):
+    file = tmpdir.join("test_csv_batch_writer_hook.csv")
+    handler = FilterCSVHandler(fields=["code", "name"], params=CSVParams(delimiter=";"))
+    with handler.batch_writer(file.strpath) as writer:
+        writer.write(SAMPLE_RECORDS)
+
+    Asserter.assert_equals(
+        list(handler.readlines(file.strpath)),
+        [{"code": "code-1", "name": "NAME-1"}, {"code": "code-2", "name": "NAME-2"}],
+    )
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_csv_batch_writer_compressed(tmpdir, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+
+    file = tmpdir.join(f"test_csv_batch_writer.csv.{compression}")
+    handler = CSVHandler(fields=["code", "name"], params=CSVParams(delimiter=";"))
+    with handler.batch_writer(file.strpath, compression=compression, background=True) as writer:
+        writer.write(SAMPLE_RECORDS)
+
+    with handler.open(file.strpath, compression=compression) as f:
+        Asserter.assert_equals(f.read(), SAMPLE_CSV)
+
+
+def test_csv_batch_writer_compressed_buffer(tmpdir):
+    file = tmpdir.join("test_csv_batch_writer_buffer.csv.gz")
+    handler = CSVHandler(fields=["code", "name"], params=CSVParams(delimiter=";"))
+    records = [{"code": f"code-{i}", "name": f"name-{i}"} for i in range(5000)]
+
+    def codec_writes(buffer_size: int) -> int:
+        with patch.object(
+            gzip.GzipFile, "write", autospec=True, side_effect=gzip.GzipFile.write
+        ) as write:
+            with handler.batch_writer(
+                file.strpath, compression="gzip", buffer_size=buffer_size
+            ) as writer:
+                writer.write(records)
+        Asserter.assert_equals(list(handler.readlines(file.strpath)), records)
+        return sum(1 for call in write.call_args_list if call.args[1])
+
+    Asserter.assert_greater(codec_writes(-1), 10)
+    Asserter.assert_equals(codec_writes(1 << 20), 1)
+
+
+def test_csv_compressed_reader(tmpdir):
+    file = tmpdir.join("test_csv_compressed_reader.csv.gz")
+    handler = CSVHandler(fields=["code", "name"], params=CSVParams(delimiter=";"))
+    handler.write_all(SAMPLE_RECORDS, filename=file.strpath)
+
+    with gzip.open(file.strpath, "rt") as f:
+        Asserter.assert_equals(f.read(), SAMPLE_CSV)
+
+    Asserter.assert_equals(list(handler.readlines(file.strpath)), SAMPLE_RECORDS)
+    Asserter.assert_equals(list(handler.readlines_parallel(file.strpath)), SAMPLE_RECORDS)
+    handler.raise_for_empty(file.strpath)
@@ -0,0 +1,99 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from vbcore.csvfile import CSVHandler, CSVParams
+from vbcore.csvindex import CSVIndex, VBInvalidIndexError
+from vbcore.exceptions import VBEmptyFileError, VBException
+from vbcore.tester.asserter import Asserter
+
+RECORDS = [{"code": f"code-{i}", "group": f"group-{i % 3}"} for i in range(10)]
+
+
+@pytest.fixture(name="csv_file")
+def fixture_csv_file(tmpdir):
+    file = tmpdir.join("test_csv_index.csv")
+    handler = CSVHandler(fields=["code", "group"], params=CSVParams(delimiter=";"))
+    handler.write_all(RECORDS, filename=file.strpath)
+    return file
+
+
+@pytest.mark.parametrize("step", [1, 3, 20])
+def test_csv_index_random_access(csv_file, step):
+    handler = CSVHandler(csv_file.strpath, params=CSVParams(delimiter=";"))
+    with CSVIndex(handler, step=step) as index:
+        Asserter.assert_equals(len(index), len(RECORDS))
+        Asserter.assert_equals(index[0], RECORDS[0])
+        Asserter.assert_equals(index[7], RECORDS[7])
+        Asserter.assert_equals(index[-1], RECORDS[-1])
+        Asserter.assert_equals(list(index.rows(2, 5)), RECORDS[2:5])
+        with pytest.raises(IndexError):
+            _ = index[len(RECORDS)]
+
+    Asserter.assert_true(os.path.isfile(f"{csv_file.strpath}.idx"))
+
+
+def test_csv_index_lookup(csv_file):
+    handler = CSVHandler(csv_file.strpath, params=CSVParams(delimiter=";"))
+    with CSVIndex(handler, step=4) as index:
+        Asserter.assert_equals(index.lookup("code", "code-5"), [RECORDS[5]])
+        Asserter.assert_equals(index.lookup("group", "group-2"), RECORDS[2::3])
+        Asserter.assert_equals(index.lookup("code", "missing"), [])
+
+
+def test_csv_index_invalidation(csv_file):
+    handler = CSVHandler(csv_file.strpath, params=CSVParams(delimiter=";"))
+    index = CSVIndex(handler)
+    with index:
+        Asserter.assert_true(index.is_valid())
+        Asserter.assert_false(index.refresh())
+
+        csv_file.write("code-10;group-1\n", mode="a")
+        Asserter.assert_false(index.is_valid())
+        Asserter.assert_true(index.refresh())
+        Asserter.assert_equals(len(index), len(RECORDS) + 1)
+        Asserter.assert_equals(index[-1], {"code": "code-10", "group": "group-1"})
+
+    Asserter.assert_false(CSVIndex(handler, step=2).is_valid())
+
+
+def test_csv_index_compressed(tmpdir):
+    file = tmpdir.join("test_csv_index_compressed.csv.gz")
+    handler = CSVHandler(fields=["code", "group"], params=CSVParams(delimiter=";"))
+    handler.write_all(RECORDS, filename=file.strpath)
+
+    with pytest.raises(VBException):
+        CSVIndex(handler, file.strpath).open()
+
+
+@pytest.mark.parametrize("step", [1, 2])
+def test_csv_index_blank_lines(tmpdir, step):
+    file = tmpdir.join("test_csv_index_blank_lines.csv")
+    file.write("code;group\n\ncode-0;group-0\n\r\n\ncode-1;group-1\ncode-2;group-2\n\n")
+    handler = CSVHandler(file.strpath, params=CSVParams(delimiter=";"))
+    expected = list(handler.readlines())
+
+    with CSVIndex(handler, step=step) as index:
+        Asserter.assert_equals(len(index), 3)
+        Asserter.assert_equals(list(index.rows()), expected)
+        Asserter.assert_equals(index[-1], expected[-1])
+        Asserter.assert_equals(index.lookup("code", "code-1"), [expected[1]])
+
+
+def test_csv_index_empty_file(tmpdir):
+    file = tmpdir.join("test_csv_index_empty.csv")
+    file.write("")
+    index = CSVIndex(CSVHandler(file.strpath, fields=["code", "group"]))
+    with pytest.raises(VBEmptyFileError):
+        index.open()
+    Asserter.assert_none(index._index)  # pylint: disable=protected-access
+
+
+def test_csv_index_open_error(csv_file):
+    index = CSVIndex(CSVHandler(csv_file.strpath, params=CSVParams(delimiter=";")))
+    with patch("vbcore.csvindex.IndexHeader.unpack", side_effect=VBInvalidIndexError("index")):
+        with pytest.raises(VBInvalidIndexError):
+            index.open()
+    Asserter.assert_none(index._index)  # pylint: disable=protected-access
+    Asserter.assert_none(index._data)  # pylint: disable=protected-access
@@ -1,6 +1,10 @@
+import bz2
+import gzip
+import lzma
+
 import pytest
 
-from vbcore.files import FileHandler, VBEncodingError
+from vbcore.files import Compression, FileHandler, VBEncodingError
 from vbcore.tester.asserter import Asserter
 
 
@@ -10,6 +14,24 @@ def test_count_lines(tmpdir):
     handler = FileHandler(file.strpath)
 
     Asserter.assert_equals(handler.num_lines(), 4)
+    Asserter.assert_equals(handler.num_lines(buffer_size=3), 4)
+    Asserter.assert_equals(handler.num_lines(max_lines=2, buffer_size=4), 2)
+
+
+@pytest.mark.parametrize(
+    "data, lines",
+    [
+        ("", 0),
+        ("AAA", 1),
+        ("AAA\n", 1),
+        ("AAA\r\nBBB\r\n", 2),
+        ("\n\n", 2),
+    ],
+)
+def test_count_lines_endings(tmpdir, data, lines):
+    file = tmpdir.join("test_count_lines_endings.csv")
+    file.write(data.encode())
+    Asserter.assert_equals(FileHandler(file.strpath).num_lines(), lines)
 
 
 def test_detect_encoding_utf_8(tmpdir):
@@ -49,3 +71,84 @@ def test_check_encoding(tmpdir):
     Asserter.assert_greater(error.value.confidence, 0.70)
     Asserter.assert_equals(error.value.language, "")
     Asserter.assert_equals(error.value.supported, ["utf-8"])
+
+
+def test_detect_encoding_spread_samples(tmpdir):
+    file = tmpdir.join("test_detect_encoding_spread_samples.txt")
+    file.write("TEST\n" * 1000 + "\xe0\xe0\n" + "TEST\n" * 1000)
+
+    reader = FileHandler()
+    result = reader.detect_encoding(file.strpath, max_bytes=30)
+    Asserter.assert_equals(result.encoding, "ascii")
+
+    result = reader.detect_encoding(file.strpath, max_bytes=30, spread=True)
+    Asserter.assert_equals(result.encoding, "utf-8")
+
+
+def test_iter_samples(tmpdir):
+    file = tmpdir.join("test_iter_samples.txt")
+    file.write("AAAA\nBBBB\nCCCC\nDDDD\nEEEE\n")
+
+    with FileHandler(file.strpath).open_binary() as f:
+        Asserter.assert_equals(list(FileHandler.iter_samples(f, 7)), [b"AAAA\nBB"])
+        Asserter.assert_equals(
+            list(FileHandler.iter_samples(f, 15, spread=True)),
+            [b"AAAA\n", b"CCCC\n", b"EEEE\n"],
+        )
+
+
+@pytest.mark.parametrize(
+    "extension, opener",
+    [
+        ("gz", gzip.open),
+        ("bz2", bz2.open),
+        ("xz", lzma.open),
+    ],
+)
+def test_compressed_files(tmpdir, extension, opener):
+    file = tmpdir.join(f"test_compressed_files.txt.{extension}")
+    with opener(file.strpath, "wb") as f:
+        f.write("AAA\nBBB\n\xe0\xe0\n".encode())
+
+    handler = FileHandler(file.strpath)
+    Asserter.assert_equals(handler.read_text(), "AAA\nBBB\n\xe0\xe0\n")
+    Asserter.assert_equals(handler.num_lines(), 3)
+    Asserter.assert_equals(handler.detect_encoding(spread=True).encoding, "utf-8")
+
+    with handler.open_binary(compression="none") as f:
+        Asserter.assert_different(f.read(3), b"AAA")
+
+
+def test_detect_compression(tmpdir):
+    file = tmpdir.join("test_detect_compression.csv")
+    with gzip.open(file.strpath, "wb") as f:
+        f.write(b"AAA")
+
+    Asserter.assert_equals(FileHandler.detect_compression(file.strpath), Compression.GZIP)
+    Asserter.assert_none(FileHandler.detect_compression(file.strpath, "w"))
+    Asserter.assert_equals(FileHandler.detect_compression("new.csv.zst", "w"), Compression.ZSTD)
+    Asserter.assert_none(FileHandler.detect_compression(0))
+
+
+def test_detect_compression_bz2(tmpdir):
+    plain = tmpdir.join("plain.csv")
+    plain.write("BZh1;BZh2\n1;2\n")
+    Asserter.assert_none(FileHandler.detect_compression(plain.strpath))
+    with FileHandler(plain.strpath).open() as f:
+        Asserter.assert_equals(f.readline(), "BZh1;BZh2\n")
+
+    for name, data in (("data.bz2", b"AAA"), ("empty.bz2", b"")):
+        file = tmpdir.join(name)
+        with bz2.open(file.strpath, "wb") as f:
+            f.write(data)
+        Asserter.assert_equals(FileHandler.detect_compression(file.strpath), Compression.BZ2)
+
+
+def test_write_compressed_by_extension(tmpdir):
+    file = tmpdir.join("test_write_compressed_by_extension.txt.gz")
+    handler = FileHandler(file.strpath)
+    with handler.open(mode="w") as f:
+        f.write("AAA\n")
+
+    with gzip.open(file.strpath, "rt") as f:
+        Asserter.assert_equals(f.read(), "AAA\n")
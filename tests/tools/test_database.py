@@ -67,4 +67,5 @@ def test_mysql_backup(mock_wrapper, runner):
         db_prefix=None,
         datetime_format=None,
         file_prefix=None,
+        workers=1,
     )
@@ -34,21 +34,68 @@ class BaseDTO:
         return self.__class__.from_dict(**{**self.to_dict(), **kwargs})
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def field_names(cls) -> t.Tuple[str, ...]:
         return tuple(f.name for f in dataclasses.fields(cls))
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def field_set(cls) -> t.FrozenSet[str]:
+        return frozenset(cls.field_names())
+
     @classmethod
     def field_types(cls) -> dict:
         # noinspection PyDataclass
         return {item.name: item.type.__name__ for item in dataclasses.fields(cls)}
 
-    def to_dict(self, *_, factory: CallableDictType = dict, **__) -> dict:
-        return dataclasses.asdict(self, dict_factory=factory)
+    def to_dict(self, *_, factory: CallableDictType = dict, deep: bool = True, **__) -> dict:
+        """
+        deep conversion like dataclasses.asdict, use deep=False for a fast shallow
+        conversion: nested dataclasses and containers are returned as they are
+        """
+        if deep:
+            return dataclasses.asdict(self, dict_factory=factory)
+        if factory is dict:
+            return {name: getattr(self, name) for name in self.field_names()}
+        return factory([(name, getattr(self, name)) for name in self.field_names()])
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _from_dict_function(cls) -> t.Callable[[dict], t.Any]:
+        """
+        generates the constructor call with the init fields of the class, like dataclasses
+        does for __init__, if a required field is missing kwargs are only filtered
+        so that the constructor raises the usual TypeError
+        """
+        namespace: t.Dict[str, t.Any] = {"cls": cls, "names": cls.field_set()}
+        required: t.List[str] = []
+        arguments: t.List[str] = []
+        for item in dataclasses.fields(cls):
+            if not item.init:
+                continue
+            value = f"kwargs[{item.name!r}]"
+            if item.default is not dataclasses.MISSING:
+                namespace[f"default_{item.name}"] = item.default
+                value += f" if {item.name!r} in kwargs else default_{item.name}"
+            elif item.default_factory is not dataclasses.MISSING:
+                namespace[f"factory_{item.name}"] = item.default_factory
+                value += f" if {item.name!r} in kwargs else factory_{item.name}()"
+            else:
+                required.append(f"{item.name!r} in kwargs")
+            arguments.append(f"{item.name}={value}")
+
+        source = (
+            "def from_dict(kwargs):\n"
+            f"    if {' and '.join(required) or 'True'}:\n"
+            f"        return cls({', '.join(arguments)})\n"
+            "    return cls(**{k: v for k, v in kwargs.items() if k in names})\n"
+        )
+        exec(source, namespace)  # pylint: disable=exec-used
+        return namespace["from_dict"]
 
     @classmethod
     def from_dict(cls, *_, **kwargs):
-        # noinspection PyArgumentList
-        return cls(**{k: v for k, v in kwargs.items() if k in cls.field_names()})
+        return cls._from_dict_function()(kwargs)
 
 
 class Singleton(type):
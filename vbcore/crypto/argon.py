@@ -4,7 +4,7 @@ from functools import cached_property
 import argon2
 from argon2.exceptions import Argon2Error, InvalidHash
 
-from vbcore.crypto.base import HashableType, Hasher, HashOptions
+from vbcore.crypto.base import HashableType, HashOptions, KDFHasher
 from vbcore.crypto.exceptions import VBInvalidHashError
 
 
@@ -17,7 +17,7 @@ class Argon2Options(HashOptions):
     salt_len: int = field(default=argon2.DEFAULT_RANDOM_SALT_LENGTH)
 
 
-class Argon2(Hasher[Argon2Options]):
+class Argon2(KDFHasher[Argon2Options]):
     @cached_property
     def hasher(self) -> argon2.PasswordHasher:
         return argon2.PasswordHasher(**self.options.to_dict())
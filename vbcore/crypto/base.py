@@ -1,15 +1,23 @@
 import abc
+import asyncio
+import os
+import threading
 import typing as t
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 from vbcore.base import BaseDTO
 from vbcore.factory import Item
+from vbcore.lambdas import chunk_iterator
 from vbcore.types import BytesType
 
 T = t.TypeVar("T", bound="HashOptions")
 
 HashableType = t.Union[str, BytesType]
 
+DEFAULT_HASH_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_POOL_CHUNK_SIZE = 16
+
 
 @dataclass(frozen=True)
 class HashOptions(BaseDTO):
@@ -17,6 +25,47 @@ class HashOptions(BaseDTO):
 
 
 class Hasher(Item[T], t.Generic[T]):
+    """
+    The async methods run the hashing in an executor shared by all the hashers,
+    by default a thread pool of DEFAULT_HASH_WORKERS: argon2 and bcrypt release
+    the GIL, so the event loop is not stalled and the workers run in parallel.
+    A process pool can be set with set_executor, the hasher must be picklable
+    """
+
+    _executor: t.ClassVar[t.Optional[Executor]] = None
+    _executor_lock: t.ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> Executor:
+        if Hasher._executor is None:
+            with Hasher._executor_lock:
+                if Hasher._executor is None:
+                    Hasher._executor = ThreadPoolExecutor(
+                        DEFAULT_HASH_WORKERS, thread_name_prefix="hasher"
+                    )
+        return Hasher._executor
+
+    @classmethod
+    def set_executor(cls, executor: t.Optional[Executor]) -> None:
+        """the previous executor is not shut down, None restores the default one"""
+        Hasher._executor = executor
+
+    async def hash_async(self, data: HashableType, executor: t.Optional[Executor] = None) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self.get_executor(), self.hash, data)
+
+    async def verify_async(
+        self,
+        given_hash: str,
+        data: HashableType,
+        raise_exc: bool = False,
+        executor: t.Optional[Executor] = None,
+    ) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor or self.get_executor(), self.verify, given_hash, data, raise_exc
+        )
+
     @abc.abstractmethod
     def hash(self, data: HashableType) -> str:
         """
@@ -31,8 +80,66 @@ class Hasher(Item[T], t.Generic[T]):
         @param raise_exc:
         """
 
+    def hash_many(self, items: t.Iterable[HashableType]) -> t.Iterator[str]:
+        return map(self.hash, items)
+
+    def verify_many(self, pairs: t.Iterable[t.Tuple[str, HashableType]]) -> t.Iterator[bool]:
+        """pairs of (given_hash, data), the result is False for the invalid hashes"""
+        return (self.verify(given_hash, data) for given_hash, data in pairs)
+
     def to_bytes(self, data: str) -> bytes:
         return data.encode(encoding=self.options.encoding)
 
     def to_string(self, data: bytes) -> str:
         return data.decode(encoding=self.options.encoding)
+
+
+class KDFHasher(Hasher[T], t.Generic[T]):  # pylint: disable=abstract-method
+    """
+    Key derivation functions are slow by design, so the bulk methods fan out
+    to a pool of processes. Items are sent in batches, so a long iterable is not
+    consumed all at once, and memoryviews are copied because they can not be pickled
+    """
+
+    # pylint: disable=arguments-differ
+    def hash_many(
+        self,
+        items: t.Iterable[HashableType],
+        workers: t.Optional[int] = None,
+        chunk_size: int = DEFAULT_POOL_CHUNK_SIZE,
+    ) -> t.Iterator[str]:
+        return self.run_on_pool(self.hash, map(self.picklable, items), workers, chunk_size)
+
+    def verify_many(
+        self,
+        pairs: t.Iterable[t.Tuple[str, HashableType]],
+        workers: t.Optional[int] = None,
+        chunk_size: int = DEFAULT_POOL_CHUNK_SIZE,
+    ) -> t.Iterator[bool]:
+        items = ((given_hash, self.picklable(data)) for given_hash, data in pairs)
+        return self.run_on_pool(self.verify_pair, items, workers, chunk_size)
+
+    def verify_pair(self, pair: t.Tuple[str, HashableType]) -> bool:
+        return self.verify(*pair)
+
+    @classmethod
+    def picklable(cls, data: HashableType) -> HashableType:
+        return data.tobytes() if isinstance(data, memoryview) else data
+
+    @classmethod
+    def run_on_pool(
+        cls,
+        func: t.Callable[[t.Any], t.Any],
+        items: t.Iterable[t.Any],
+        workers: t.Optional[int],
+        chunk_size: int,
+    ) -> t.Generator[t.Any, None, None]:
+        workers = workers or os.cpu_count() or 1
+        batch_size = workers * chunk_size * 4
+        with ProcessPoolExecutor(workers) as pool:
+            for batch in chunk_iterator(items, batch_size):
+                yield from pool.map(func, batch, chunksize=chunk_size)
+
+
+# the threads of the executor do not survive a fork
+os.register_at_fork(after_in_child=lambda: Hasher.set_executor(None))
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 
 import bcrypt
 
-from vbcore.crypto.base import HashableType, Hasher, HashOptions
+from vbcore.crypto.base import HashableType, HashOptions, KDFHasher
 from vbcore.crypto.exceptions import VBInvalidHashError
 
 
@@ -11,7 +11,7 @@ class BcryptOptions(HashOptions):
     rounds: int = field(default=12)
 
 
-class Bcrypt(Hasher[BcryptOptions]):
+class Bcrypt(KDFHasher[BcryptOptions]):
     def salt(self) -> bytes:
         return bcrypt.gensalt(rounds=self.options.rounds)
 
@@ -1,4 +1,5 @@
 import enum
+from functools import lru_cache
 
 from vbcore.base import BaseDTO
 from vbcore.crypto import hashes
@@ -38,3 +39,12 @@ class HasherEnum(
 
 class CryptoFactory(ItemFactory[HasherEnum, Hasher]):
     items = HasherEnum
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def shared(cls, name: str) -> Hasher:
+        """
+        one instance with the default options per process and hasher type,
+        the hashers are stateless so they can be shared between threads
+        """
+        return cls.instance(name)
@@ -4,14 +4,29 @@ import typing as t
 
 from vbcore.crypto.base import HashableType, Hasher, HashOptions
 from vbcore.crypto.exceptions import VBInvalidHashError
+from vbcore.files import FileNameType
+
+DEFAULT_FILE_CHUNK_SIZE = 1024 * 1024
 
 
 class BuiltinHash(Hasher[HashOptions]):
+    """
+    The hashlib constructor is resolved once per class, instead of looking up
+    the algorithm by name on every call; bytes-like data, e.g. memoryview,
+    is hashed without copies
+    """
+
     ALGO: t.ClassVar[str]
+    constructor: t.ClassVar[t.Callable[..., t.Any]]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, "ALGO"):
+            cls.constructor = getattr(hashlib, cls.ALGO)
 
     def hash(self, data: HashableType) -> str:
         data = self.to_bytes(data) if isinstance(data, str) else data
-        return hashlib.new(self.ALGO, data=data).hexdigest()
+        return self.constructor(data).hexdigest()
 
     def verify(self, given_hash: str, data: HashableType, raise_exc: bool = False) -> bool:
         if hmac.compare_digest(given_hash, self.hash(data)):
@@ -22,6 +37,33 @@ class BuiltinHash(Hasher[HashOptions]):
 
         return False
 
+    def hash_many(self, items: t.Iterable[HashableType]) -> t.Iterator[str]:
+        constructor, encoding = self.constructor, self.options.encoding
+        for data in items:
+            if isinstance(data, str):
+                data = data.encode(encoding)
+            yield constructor(data).hexdigest()
+
+    def verify_many(self, pairs: t.Iterable[t.Tuple[str, HashableType]]) -> t.Iterator[bool]:
+        constructor, encoding = self.constructor, self.options.encoding
+        for given_hash, data in pairs:
+            if isinstance(data, str):
+                data = data.encode(encoding)
+            yield hmac.compare_digest(given_hash, constructor(data).hexdigest())
+
+    def hash_file(self, filename: FileNameType, chunk_size: int = DEFAULT_FILE_CHUNK_SIZE) -> str:
+        """the file is read in a buffer allocated once, so memory is bounded by chunk_size"""
+        digest = self.constructor()
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        with open(filename, "rb", buffering=0) as file:
+            while size := file.readinto(buffer):
+                digest.update(view[:size])
+        return digest.hexdigest()
+
+    def verify_file(self, given_hash: str, filename: FileNameType) -> bool:
+        return hmac.compare_digest(given_hash, self.hash_file(filename))
+
 
 class MD5(BuiltinHash):
     ALGO = "md5"
@@ -1,14 +1,87 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Type, Union
+from functools import cached_property
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import jwt
 
+from vbcore import json
+from vbcore.batch import DaemonThread
+from vbcore.datastruct.cache import LRUCache
+from vbcore.files import FileHandler, FileNameType
+from vbcore.loggers import VBLoggerMixin
 from vbcore.types import OptInt, OptStr
 
-from .exceptions import VBMissingKey
-from .keys import ECCKey, RSAKey, SecretKey
+from .exceptions import VBCryptoError, VBMissingKey
+from .keys import ECCKey, Key, RSAKey, SecretKey
 
 AudienceType = Optional[Union[List[str], str]]
+PreparedKey = Any  # bytes for HMAC, otherwise a key object of cryptography
+
+EC_ALGORITHMS = {"P-256": "ES256", "P-384": "ES384", "P-521": "ES512"}
+JWK_ALGORITHMS = {"RSA": "RS256", "oct": "HS256"}
+DEFAULT_RELOAD_INTERVAL = 300
+
+
+class UnknownKeyIdError(jwt.InvalidTokenError):
+    pass
+
+
+class TokenCache:
+    """
+    Bounded and thread safe LRU of the verified payloads, the key is the sha256
+    of the token so the tokens are not kept in memory. An entry is evicted when
+    the token expires, so a cached token is never accepted after its exp claim
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self._lock = threading.Lock()
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+
+    @classmethod
+    def token_key(cls, token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.token_key(token)
+        with self._lock:
+            try:
+                payload, expire_at = self._entries[key]
+            except KeyError:
+                return None
+            if expire_at is not None and time.time() >= expire_at:
+                del self._entries[key]
+                return None
+        return payload.copy()
+
+    def set(self, token: str, payload: dict) -> None:
+        expire_at = payload.get("exp")
+        entry: Tuple[dict, Optional[float]] = (payload.copy(), expire_at)
+        with self._lock:
+            self._entries[self.token_key(token)] = entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class JwtHandler:
@@ -20,12 +93,18 @@ class JwtHandler:
         decode_key: OptStr = None,
         issuer: OptStr = None,
         audience: AudienceType = None,
+        token_cache_size: int = 0,
     ) -> None:
+        """
+        token_cache_size > 0 enables the cache of the verified tokens, see TokenCache;
+        it is used only by decode with the default options
+        """
         self.issuer = issuer
         self.audience = audience
         self.algorithm = algorithm
         self._encode_key = encode_key
         self._decode_key = decode_key
+        self.token_cache = TokenCache(token_cache_size) if token_cache_size > 0 else None
 
     @property
     def encode_key(self) -> str:
@@ -39,6 +118,16 @@ class JwtHandler:
             raise VBMissingKey("decode_key")
         return self._decode_key
 
+    @cached_property
+    def signing_key(self) -> PreparedKey:
+        """the encode key parsed once, PyJWT accepts the key objects as they are"""
+        return jwt.get_algorithm_by_name(self.algorithm).prepare_key(self.encode_key)
+
+    @cached_property
+    def verifying_key(self) -> PreparedKey:
+        """the decode key parsed once, see signing_key"""
+        return jwt.get_algorithm_by_name(self.algorithm).prepare_key(self.decode_key)
+
     @classmethod
     def decode_error(cls, error: jwt.PyJWTError) -> str:
         decoder: Dict[Type[jwt.PyJWTError], str] = {
@@ -51,11 +140,15 @@ class JwtHandler:
             jwt.InvalidKeyError: "Invalid key format",
             jwt.MissingRequiredClaimError: "Invalid token claim",
             jwt.InvalidSignatureError: "Token signature validation failed",
+            UnknownKeyIdError: "Invalid token key id",
             jwt.InvalidTokenError: "Invalid token format",
         }
         return decoder.get(error.__class__, "Token validation error")
 
     def encode(self, data: dict, *, expire_after: OptInt = None) -> str:
+        return self.sign(self.prepare_payload(data, expire_after))
+
+    def prepare_payload(self, data: dict, expire_after: OptInt = None) -> dict:
         payload = data.copy()
         payload["typ"] = "JWT"
         payload["iat"] = datetime.now(tz=timezone.utc)
@@ -66,18 +159,33 @@ class JwtHandler:
             payload["iss"] = self.issuer
         if self.audience:
             payload["aud"] = self.audience
+        return payload
 
-        return jwt.encode(payload, self.encode_key, algorithm=self.algorithm)
+    def sign(self, payload: dict) -> str:
+        return jwt.encode(payload, self.signing_key, algorithm=self.algorithm)
 
     def decode(self, token: str, **kwargs: Any) -> dict:
+        if self.token_cache is None or kwargs:
+            return self.verify(token, **kwargs)
+
+        payload = self.token_cache.get(token)
+        if payload is None:
+            payload = self.verify(token)
+            self.token_cache.set(token, payload)
+        return payload
+
+    def verify(self, token: str, **kwargs: Any) -> dict:
+        return self.verify_with(self.verifying_key, self.algorithm, token, **kwargs)
+
+    def verify_with(self, key: PreparedKey, algorithm: str, token: str, **kwargs: Any) -> dict:
         kwargs["verify_iat"] = True
         kwargs["verify_iss"] = bool(self.issuer)
         kwargs["verify_aud"] = bool(self.audience)
 
         return jwt.decode(
             token,
-            self.decode_key,
-            algorithms=[self.algorithm],
+            key,
+            algorithms=[algorithm],
             audience=self.audience,
             issuer=self.issuer,
             options=kwargs,
@@ -85,33 +193,294 @@ class JwtHandler:
 
 
 class JwtHMAC(JwtHandler):
-    def __init__(self, secret_key: SecretKey, *, issuer: OptStr = None, audience: AudienceType):
+    def __init__(
+        self,
+        secret_key: SecretKey,
+        *,
+        issuer: OptStr = None,
+        audience: AudienceType,
+        token_cache_size: int = 0,
+    ):
         super().__init__(
             algorithm="HS256",
             encode_key=secret_key.value,
             decode_key=secret_key.value,
             issuer=issuer,
             audience=audience,
+            token_cache_size=token_cache_size,
         )
 
 
 class JwtRSA(JwtHandler):
-    def __init__(self, key: RSAKey, *, issuer: OptStr = None, audience: AudienceType = None):
+    def __init__(
+        self,
+        key: RSAKey,
+        *,
+        issuer: OptStr = None,
+        audience: AudienceType = None,
+        token_cache_size: int = 0,
+    ):
         super().__init__(
             algorithm="RS256",
             encode_key=key.private_key,
             decode_key=key.public_key,
             issuer=issuer,
             audience=audience,
+            token_cache_size=token_cache_size,
         )
 
 
 class JwtECDSA(JwtHandler):
-    def __init__(self, key: ECCKey, *, issuer: OptStr = None, audience: AudienceType = None):
+    def __init__(
+        self,
+        key: ECCKey,
+        *,
+        issuer: OptStr = None,
+        audience: AudienceType = None,
+        token_cache_size: int = 0,
+    ):
         super().__init__(
             algorithm="ES256",
             encode_key=key.private_key,
             decode_key=key.public_key,
             issuer=issuer,
             audience=audience,
+            token_cache_size=token_cache_size,
+        )
+
+
+def ec_algorithm(curve: str) -> str:
+    """curves are named like P-256, NIST P-256 or p256 by the different libraries"""
+    name = curve.upper().replace("NIST", "").strip()
+    if not name.startswith("P-"):
+        name = name.replace("P", "P-", 1)
+    try:
+        return EC_ALGORITHMS[name]
+    except KeyError:
+        raise VBCryptoError(f"unsupported curve: {curve}") from None
+
+
+@dataclass(frozen=True)
+class JwtKey:
+    """a key of a key set, the keys are prepared for PyJWT, see JwtHandler.signing_key"""
+
+    kid: str
+    algorithm: str
+    verifying_key: PreparedKey
+    signing_key: PreparedKey = None
+
+    @classmethod
+    def prepare(cls, algorithm: str, key: Union[str, bytes]) -> PreparedKey:
+        return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
+
+    @classmethod
+    def from_key(cls, kid: str, key: Union[Key, SecretKey], algorithm: OptStr = None) -> "JwtKey":
+        """public keys can only verify the tokens, e.g. loaded from a public pem"""
+        if isinstance(key, SecretKey):
+            algorithm = algorithm or "HS256"
+            secret = cls.prepare(algorithm, key.value)
+            return cls(kid=kid, algorithm=algorithm, verifying_key=secret, signing_key=secret)
+
+        if not algorithm:
+            algorithm = ec_algorithm(key.key.curve) if isinstance(key, ECCKey) else "RS256"
+        signing_key = cls.prepare(algorithm, key.private_key) if key.key.has_private() else None
+        verifying_key = cls.prepare(algorithm, key.public_key)
+        return cls(
+            kid=kid, algorithm=algorithm, verifying_key=verifying_key, signing_key=signing_key
         )
+
+    @classmethod
+    def from_jwk(cls, jwk: Dict[str, Any]) -> "JwtKey":
+        """the algorithm is read from alg or guessed from kty and crv like PyJWT does"""
+        if not jwk.get("kid"):
+            raise VBMissingKey("kid")
+        algorithm = jwk.get("alg")
+        if not algorithm:
+            kty = jwk.get("kty", "")
+            if kty == "EC":
+                algorithm = ec_algorithm(jwk.get("crv", "P-256"))
+            elif kty in JWK_ALGORITHMS:
+                algorithm = JWK_ALGORITHMS[kty]
+            else:
+                raise VBCryptoError(f"unsupported key type: {kty}")
+
+        kid, key = jwk["kid"], jwt.PyJWK(jwk, algorithm=algorithm).key
+        if hasattr(key, "private_bytes"):  # private key of cryptography
+            return cls(
+                kid=kid, algorithm=algorithm, verifying_key=key.public_key(), signing_key=key
+            )
+        signing_key = key if isinstance(key, bytes) else None
+        return cls(kid=kid, algorithm=algorithm, verifying_key=key, signing_key=signing_key)
+
+    def same_verifier(self, other: "JwtKey") -> bool:
+        """key objects of cryptography have no equality, so they are compared as jwk"""
+        if self.verifying_key is other.verifying_key:
+            return self.algorithm == other.algorithm
+        if self.algorithm != other.algorithm:
+            return False
+        algorithm = jwt.get_algorithm_by_name(self.algorithm)
+        return algorithm.to_jwk(self.verifying_key, as_dict=True) == algorithm.to_jwk(
+            other.verifying_key, as_dict=True
+        )
+
+
+def keys_from_files(
+    files: Mapping[str, Union[Path, str]],
+    key_class: Type[Key] = RSAKey,
+    algorithm: OptStr = None,
+) -> List[JwtKey]:
+    """files is a mapping of kid and pem file, private or public"""
+    return [
+        JwtKey.from_key(kid, key_class.from_file(filename), algorithm)
+        for kid, filename in files.items()
+    ]
+
+
+def keys_from_jwks(document: Union[str, bytes, Dict[str, Any]]) -> List[JwtKey]:
+    data = json.loads(document) if isinstance(document, (str, bytes)) else document
+    return [JwtKey.from_jwk(jwk) for jwk in data.get("keys", [])]
+
+
+def keys_from_jwks_file(filename: FileNameType) -> List[JwtKey]:
+    with FileHandler(filename).open() as file:
+        return keys_from_jwks(file.read())
+
+
+class KeyRing(NamedTuple):
+    keys: Dict[str, JwtKey]
+    active: Optional[JwtKey]
+
+
+class JwtKeySet(JwtHandler, VBLoggerMixin):
+    """
+    JWT handler with many keys, e.g. to rotate them without rejecting the tokens
+    signed with the old ones. The tokens are signed with the active key and its kid
+    is added to the header, the tokens are verified with the key of their kid
+    and with the algorithm of that key; tokens without kid are verified with the
+    active key, like the ones of the handlers with a single key.
+
+    The keys are read by the loader, see keys_from_files and keys_from_jwks_file,
+    and they can be reloaded by a background thread: the new keys are swapped
+    in a single assignment, so decode never waits for a reload.
+
+    >>> keyset = JwtKeySet(partial(keys_from_jwks_file, "jwks.json"))  # doctest: +SKIP
+    >>> keyset.start_reloader(interval=60)  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[JwtKey]],
+        *,
+        active_kid: OptStr = None,
+        issuer: OptStr = None,
+        audience: AudienceType = None,
+        token_cache_size: int = 0,
+    ) -> None:
+        """
+        active_kid is the key used to sign, by default the first one that can sign;
+        a key set with only public keys can only decode
+        """
+        self.loader = loader
+        self.active_kid = active_kid
+        self._ring = self.load_ring()
+        self._stop_reload = threading.Event()
+        self._reloader: Optional[threading.Thread] = None
+        super().__init__(
+            algorithm=self._ring.active.algorithm if self._ring.active else "",
+            issuer=issuer,
+            audience=audience,
+            token_cache_size=token_cache_size,
+        )
+
+    @property
+    def keys(self) -> Dict[str, JwtKey]:
+        return self._ring.keys
+
+    @property
+    def active_key(self) -> JwtKey:
+        active = self._ring.active
+        if active is None:
+            raise VBMissingKey("signing key")
+        return active
+
+    def load_ring(self) -> KeyRing:
+        keys = {key.kid: key for key in self.loader()}
+        if self.active_kid is not None:
+            active = keys.get(self.active_kid)
+            if active is None or active.signing_key is None:
+                raise VBMissingKey(f"signing key {self.active_kid}")
+            return KeyRing(keys, active)
+
+        signers = (key for key in keys.values() if key.signing_key is not None)
+        return KeyRing(keys, next(signers, None))
+
+    def reload(self) -> bool:
+        """
+        on error the current keys are kept, the cache is cleared if any key was removed
+        or if the verifying key of a kept kid changed, cached tokens could not verify anymore
+        """
+        try:
+            ring = self.load_ring()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.log.exception(exc)
+            return False
+
+        changed = any(
+            kid not in ring.keys or not ring.keys[kid].same_verifier(key)
+            for kid, key in self._ring.keys.items()
+        )
+        self._ring = ring
+        if ring.active is not None:
+            self.algorithm = ring.active.algorithm
+        if changed and self.token_cache is not None:
+            self.token_cache.clear()
+        self.log.info("jwt key set reloaded: %s", ", ".join(ring.keys))
+        return True
+
+    def start_reloader(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> threading.Thread:
+        if self._reloader is not None and self._reloader.is_alive():
+            return self._reloader
+
+        def run() -> None:
+            while not self._stop_reload.wait(interval):
+                self.reload()
+
+        self._stop_reload.clear()
+        self._reloader = DaemonThread(run, name="jwt-keyset-reload")
+        self._reloader.start()
+        return self._reloader
+
+    def stop_reloader(self, timeout: Optional[float] = None) -> None:
+        self._stop_reload.set()
+        if self._reloader is not None:
+            self._reloader.join(timeout)
+            self._reloader = None
+
+    def to_jwks(self) -> Dict[str, Any]:
+        """the public keys as JWKS document for the verifiers, HMAC secrets are skipped"""
+        keys = []
+        for key in self.keys.values():
+            if isinstance(key.verifying_key, bytes):
+                continue
+            algorithm = jwt.get_algorithm_by_name(key.algorithm)
+            jwk = algorithm.to_jwk(key.verifying_key, as_dict=True)
+            keys.append({**jwk, "kid": key.kid, "alg": key.algorithm, "use": "sig"})
+        return {"keys": keys}
+
+    def find_key(self, token: str) -> JwtKey:
+        ring = self._ring
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = ring.active if kid is None else ring.keys.get(kid)
+        if key is None:
+            raise UnknownKeyIdError(f"unknown key id: {kid}")
+        return key
+
+    def sign(self, payload: dict) -> str:
+        active = self.active_key
+        return jwt.encode(
+            payload, active.signing_key, algorithm=active.algorithm, headers={"kid": active.kid}
+        )
+
+    def verify(self, token: str, **kwargs: Any) -> dict:
+        key = self.find_key(token)
+        return self.verify_with(key.verifying_key, key.algorithm, token, **kwargs)
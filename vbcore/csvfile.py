@@ -1,14 +1,51 @@
+import array
 import csv
+import heapq
+import io
+import itertools
+import os
+import pickle
+import sys
+import tempfile
 import typing as t
-from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from contextlib import closing, contextmanager, ExitStack
 from dataclasses import dataclass, field
+from queue import Queue
 
+from vbcore.batch import Thread
 from vbcore.exceptions import VBEmptyFileError
-from vbcore.files import FileHandler, FileNameType, OptStr
+from vbcore.files import Compression, FileHandler, FileNameType, OptStr
 from vbcore.types import OptInt, StrList
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import NDArray
+
 RecordType = t.Union[dict, t.Iterable[dict]]
 WriterCoroutineType = t.Generator[None, RecordType, None]
+ByteRange = t.Tuple[int, int]
+ColumnType = t.Union[t.List[str], "array.array[t.Any]", "NDArray[t.Any]"]
+ColumnsBatch = t.Dict[str, ColumnType]
+QuotingType = t.Literal[0, 1, 2, 3]  # csv.QUOTE_MINIMAL, QUOTE_ALL, QUOTE_NONNUMERIC, QUOTE_NONE
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_SORT_MEMORY = 256 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_WRITE_BATCH = 1000
+DEFAULT_WRITE_BUFFER = 1024 * 1024
+FLOAT_TYPECODES = frozenset("fd")
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -18,13 +55,42 @@ class CSVParams:
     delimiter: str = "|"
     dialect: str = "unix"
     encoding_errors: str = "replace"
-    quoting: int = csv.QUOTE_NONE
+    quoting: QuotingType = csv.QUOTE_NONE
     escape_char: str = "\\"
     allow_extra_fields: bool = True
+    compression: str = Compression.AUTO
     supported_encodings: t.List[str] = field(default_factory=lambda: ["ascii", "ISO-8859-1"])
 
 
-class CSVHandler(FileHandler):
+@dataclass(frozen=True, kw_only=True)
+class SortParams:
+    """
+    memory_budget is the estimated size in bytes of each sorted run kept in memory,
+    when workers > 0 runs are sorted in a process pool, so up to workers + 1 runs
+    can be in memory at the same time
+    """
+
+    memory_budget: int = DEFAULT_SORT_MEMORY
+    temp_dir: OptStr = None
+    workers: int = 0
+    reverse: bool = False
+    casts: t.Dict[str, t.Callable[[str], t.Any]] = field(default_factory=dict)
+
+
+class SortKey:
+    def __init__(
+        self,
+        columns: StrList,
+        casts: t.Optional[t.Dict[str, t.Callable[[str], t.Any]]] = None,
+    ):
+        _casts = casts or {}
+        self.getters = tuple((c, _casts.get(c)) for c in columns)
+
+    def __call__(self, record: dict) -> tuple:
+        return tuple(cast(record[c]) if cast else record[c] for c, cast in self.getters)
+
+
+class CSVHandler(FileHandler):  # pylint: disable=too-many-public-methods
     def __init__(
         self,
         filename: t.Optional[FileNameType] = None,
@@ -33,7 +99,12 @@ class CSVHandler(FileHandler):
     ):
         self.fields = fields or []
         self.params = params or CSVParams()
-        super().__init__(filename, self.params.encoding, self.params.supported_encodings)
+        super().__init__(
+            filename,
+            self.params.encoding,
+            self.params.supported_encodings,
+            self.params.compression,
+        )
 
     def open(self, filename: t.Optional[FileNameType] = None, **kwargs) -> t.IO:
         return super().open(
@@ -45,7 +116,7 @@ class CSVHandler(FileHandler):
         )
 
     def raise_for_empty(self, filename: OptStr = None, lines: OptInt = None):
-        lines = lines or self.num_lines(filename or self.filename)
+        lines = lines or self.num_lines(filename or self.filename, max_lines=2)
         if lines <= 0:
             raise VBEmptyFileError(
                 filename,
@@ -63,7 +134,22 @@ class CSVHandler(FileHandler):
                 quoting=self.params.quoting,
                 escapechar=self.params.escape_char,
             )
-            self.fields = list(reader.fieldnames)
+            self.fields = list(reader.fieldnames or [])
+            yield reader
+
+    @contextmanager
+    def tuple_reader(
+        self, filename: t.Optional[FileNameType] = None
+    ) -> t.Generator[t.Iterator[t.List[str]], None, None]:
+        """same as reader but records are lists of values and header is already consumed"""
+        with self.open(filename) as file:
+            reader = csv.reader(
+                file,
+                delimiter=self.params.delimiter,
+                quoting=self.params.quoting,
+                escapechar=self.params.escape_char,
+            )
+            self.fields = next(reader, [])
             yield reader
 
     @contextmanager
@@ -74,14 +160,20 @@ class CSVHandler(FileHandler):
         **kwargs,
     ) -> t.Generator[csv.DictWriter, None, None]:
         with self.open(filename, mode="w", **kwargs) as file:
-            yield csv.DictWriter(
-                file,
-                fields or self.fields,
-                delimiter=self.params.delimiter,
-                dialect=self.params.dialect,
-                quoting=self.params.quoting,
-                escapechar=self.params.escape_char,
-            )
+            yield self.dict_writer(file, fields)
+
+    def dict_writer(
+        self, file: t.IO, fields: t.Optional[StrList] = None, **kwargs
+    ) -> csv.DictWriter:
+        return csv.DictWriter(
+            file,
+            fields or self.fields,
+            delimiter=self.params.delimiter,
+            dialect=self.params.dialect,
+            quoting=self.params.quoting,
+            escapechar=self.params.escape_char,
+            **kwargs,
+        )
 
     # noinspection PyMethodMayBeStatic
     def after_read_hook(self, record: dict) -> t.Any:
@@ -90,11 +182,145 @@ class CSVHandler(FileHandler):
     def pre_write_hook(self, record: dict) -> t.Any:
         return {k: v for k, v in record.items() if k in self.fields}
 
+    def parse_bytes(self, data: bytes) -> csv.DictReader:
+        """parses raw records without header, header fields must be already known"""
+        text = data.decode(self.params.encoding, errors=self.params.encoding_errors)
+        return csv.DictReader(
+            io.StringIO(text, newline=self.params.new_line),
+            fieldnames=self.fields,
+            delimiter=self.params.delimiter,
+            quoting=self.params.quoting,
+            escapechar=self.params.escape_char,
+        )
+
     def readlines(self, filename: t.Optional[FileNameType] = None) -> t.Generator[dict, None, None]:
         with self.reader(filename) as reader:
             for record in reader:
                 yield self.after_read_hook(record)
 
+    def readtuples(
+        self, filename: t.Optional[FileNameType] = None
+    ) -> t.Generator[t.Tuple[str, ...], None, None]:
+        """yields records as tuples ordered as self.fields, after_read_hook is not called"""
+        with self.tuple_reader(filename) as reader:
+            yield from map(tuple, reader)
+
+    @classmethod
+    def to_column(
+        cls, values: t.Sequence[str], typecode: OptStr = None, use_numpy: bool = True
+    ) -> ColumnType:
+        if typecode is None:
+            return list(values)
+
+        cast = float if typecode in FLOAT_TYPECODES else int
+        column = array.array(typecode, map(cast, values))
+        if use_numpy and numpy is not None:
+            return numpy.frombuffer(column, dtype=typecode)
+        return column
+
+    def read_columns(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dtypes: t.Optional[t.Dict[str, str]] = None,
+        filename: t.Optional[FileNameType] = None,
+        use_numpy: bool = True,
+    ) -> t.Generator[ColumnsBatch, None, None]:
+        """
+        Yields batches of at most batch_size records as column name -> values,
+        dtypes maps column names to array typecodes, typed columns are
+        array.array or numpy arrays (when available), the others are lists of strings.
+        NOTE: every record must have exactly the header fields
+        """
+        _dtypes = dtypes or {}
+        with self.tuple_reader(filename) as reader:
+            while True:
+                batch = list(itertools.islice(reader, batch_size))
+                if not batch:
+                    return
+
+                columns = zip(*batch, strict=True)
+                yield {
+                    name: self.to_column(values, _dtypes.get(name), use_numpy)
+                    for name, values in zip(self.fields, columns, strict=True)
+                }
+
+    def chunk_ranges(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> t.List[ByteRange]:
+        """
+        Splits the file body (header excluded) into byte ranges of about chunk_size bytes,
+        every range ends on a line boundary so that it can be parsed on its own.
+        NOTE: records with embedded new lines are not supported
+        """
+        ranges: t.List[ByteRange] = []
+        with self.open_binary(filename) as file:
+            file.readline()
+            start = file.tell()
+            end_of_file = file.seek(0, os.SEEK_END)
+            while start < end_of_file:
+                file.seek(min(start + chunk_size, end_of_file))
+                file.readline()
+                end = file.tell()
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+    def read_range(self, filename: t.Optional[FileNameType], start: int, end: int) -> t.List[t.Any]:
+        """parses the records in the given byte range, header fields must be already known"""
+        with self.open_binary(filename) as file:
+            file.seek(start)
+            data = file.read(end - start)
+
+        return [self.after_read_hook(record) for record in self.parse_bytes(data)]
+
+    def readlines_parallel(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        workers: OptInt = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        ordered: bool = True,
+    ) -> t.Generator[t.Any, None, None]:
+        """
+        Same as readlines but ranges of the file are parsed in a process pool,
+        after_read_hook is executed by the workers, so the handler must be picklable.
+        At most workers * 2 ranges are in flight, the next one is submitted as soon
+        as a parsed range is consumed, so a slow consumer does not pile up records.
+        Compressed files can not be split, so they are read sequentially
+        """
+        _filename = filename or self.filename
+        if self.resolve_compression(_filename) is not None:
+            yield from self.readlines(_filename)
+            return
+
+        with self.reader(_filename):
+            pass  # only to detect header fields
+
+        ranges = iter(self.chunk_ranges(_filename, chunk_size))
+        max_pending = (workers or os.cpu_count() or 1) * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+
+            def submit(count: int) -> t.Iterator[Future]:
+                for byte_range in itertools.islice(ranges, count):
+                    yield executor.submit(self.read_range, _filename, *byte_range)
+
+            pending = deque(submit(max_pending))
+            try:
+                while pending:
+                    if ordered:
+                        done = [pending.popleft()]
+                    else:
+                        completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        done = [f for f in pending if f in completed]
+                        pending = deque(f for f in pending if f not in completed)
+                    pending.extend(submit(len(done)))
+                    for future in done:
+                        yield from future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
     def coroutine_writer(
         self, filename: t.Optional[FileNameType] = None, **kwargs
     ) -> WriterCoroutineType:
@@ -121,15 +347,240 @@ class CSVHandler(FileHandler):
         with self.open_writer(filename, **kwargs) as writer:
             writer.send(records)
 
+    def batch_writer(self, filename: t.Optional[FileNameType] = None, **kwargs) -> "CSVBatchWriter":
+        return CSVBatchWriter(self, filename, **kwargs)
+
+    @classmethod
+    def record_size(cls, record: dict) -> int:
+        return sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record.values())
+
+    def iter_runs(
+        self, records: t.Iterable[dict], memory_budget: int
+    ) -> t.Generator[t.List[dict], None, None]:
+        run: t.List[dict] = []
+        run_size = 0
+        for record in records:
+            run.append(record)
+            run_size += self.record_size(record)
+            if run_size >= memory_budget:
+                yield run
+                run, run_size = [], 0
+        if run:
+            yield run
+
+    @classmethod
+    def sort_run(cls, records: t.List[dict], filename: str, key: SortKey, reverse: bool = False):
+        """
+        the run is pickled in chunks, so the records are read back as they are,
+        e.g. the None values and the extra values of ragged rows
+        """
+        records.sort(key=key, reverse=reverse)
+        with open(filename, "wb", buffering=DEFAULT_WRITE_BUFFER) as file:
+            for start in range(0, len(records), DEFAULT_WRITE_BATCH):
+                pickle.dump(
+                    records[start : start + DEFAULT_WRITE_BATCH], file, pickle.HIGHEST_PROTOCOL
+                )
+
+    @classmethod
+    def read_run(cls, filename: str) -> t.Generator[dict, None, None]:
+        with open(filename, "rb", buffering=DEFAULT_WRITE_BUFFER) as file:
+            while True:
+                try:
+                    yield from pickle.load(file)
+                except EOFError:
+                    return
+
+    def spill_sorted_runs(  # pylint: disable=too-many-locals
+        self,
+        filename: t.Optional[FileNameType],
+        key: SortKey,
+        params: SortParams,
+        temp_dir: str,
+    ) -> t.Sequence[t.Union[str, t.List[dict]]]:
+        """
+        Returns the sorted runs, if all records fit the memory budget the only run
+        is kept in memory, otherwise every run is spilled to a file in temp_dir.
+        Only a record is read ahead to know if there is a second run, so the first
+        run is spilled before the next one is read
+        """
+        run_files: t.List[str] = []
+        pending: t.Set[Future] = set()
+
+        with ExitStack() as stack:
+            records = iter(stack.enter_context(self.reader(filename)))
+            runs = self.iter_runs(records, params.memory_budget)
+            first = next(runs, [])
+            runs.close()
+            peek = next(records, None)
+            if peek is None:
+                first.sort(key=key, reverse=params.reverse)
+                return [first]
+
+            executor: t.Optional[Executor] = None
+            if params.workers > 0:
+                executor = stack.enter_context(ProcessPoolExecutor(params.workers))
+
+            def spill(run: t.List[dict]) -> None:
+                run_file = os.path.join(temp_dir, f"run-{len(run_files)}.pickle")
+                run_files.append(run_file)
+                if executor is None:
+                    self.sort_run(run, run_file, key, params.reverse)
+                    return
+
+                if len(pending) >= params.workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        future.result()
+                pending.add(executor.submit(self.sort_run, run, run_file, key, params.reverse))
+
+            spill(first)
+            del first
+            for run in self.iter_runs(itertools.chain([peek], records), params.memory_budget):
+                spill(run)
+
+            for future in pending:
+                future.result()
+
+        return run_files
+
     def sort(
         self,
         columns: StrList,
         filename: t.Optional[FileNameType] = None,
         output_file: t.Optional[FileNameType] = None,
+        sort_params: t.Optional[SortParams] = None,
         **kwargs,
     ):
-        with self.reader(filename) as reader:
-            sortedlist = sorted(reader, key=lambda r: tuple(r[c] for c in columns))
+        """
+        External merge sort: records are sorted in runs bounded by the memory budget,
+        runs are spilled to temporary files and then merged, the sort is stable
+        """
+        params = sort_params or SortParams()
+        key = SortKey(columns, params.casts)
+
+        with tempfile.TemporaryDirectory(dir=params.temp_dir) as temp_dir:
+            runs = self.spill_sorted_runs(filename, key, params, temp_dir)
+            with ExitStack() as stack:
+                iterables = [
+                    (
+                        stack.enter_context(closing(self.read_run(run)))
+                        if isinstance(run, str)
+                        else run
+                    )
+                    for run in runs
+                ]
+                merged = heapq.merge(*iterables, key=key, reverse=params.reverse)
+                with self.open_writer(output_file, **kwargs) as writer:
+                    writer.send(self.pre_write_hook(r) for r in merged)
+
+
+class CSVBatchWriter:
+    """
+    Writes records in batches with writerows through a large write buffer.
+    The field projection is done once by the DictWriter (extra fields are ignored),
+    so pre_write_hook is called only if it is overridden by the handler.
+    If background is True the file I/O is done by a separate thread,
+    so producers are blocked only when queue_size batches are pending.
+
+    >>> with CSVHandler(fields=["a"]).batch_writer("data.csv.gz", compression="gzip") as w:
+    ...     w.write({"a": 1, "b": 2})  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        handler: CSVHandler,
+        filename: t.Optional[FileNameType] = None,
+        batch_size: int = DEFAULT_WRITE_BATCH,
+        buffer_size: int = DEFAULT_WRITE_BUFFER,
+        background: bool = False,
+        queue_size: int = 8,
+        compression: OptStr = None,
+        **kwargs,
+    ):
+        self.handler = handler
+        self.filename = filename
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.background = background
+        self.compression = compression
+        self.open_kwargs = kwargs
+
+        self._batch: t.List[dict] = []
+        self._queue: Queue = Queue(queue_size)
+        self._file: t.Optional[t.IO] = None
+        self._writer: t.Optional[csv.DictWriter] = None
+        self._thread: t.Optional[Thread] = None
+        self._error: t.Optional[BaseException] = None
+        self._hook: t.Optional[t.Callable[[dict], t.Any]] = None
+        if type(handler).pre_write_hook is not CSVHandler.pre_write_hook:
+            self._hook = handler.pre_write_hook
+
+    def __enter__(self) -> "CSVBatchWriter":
+        return self.open()
+
+    def __exit__(self, *_):
+        self.close()
+
+    def open(self) -> "CSVBatchWriter":
+        self._file = self.handler.open(
+            self.filename,
+            mode="w",
+            buffering=self.buffer_size,
+            compression=self.compression,
+            **self.open_kwargs,
+        )
+        self._writer = self.handler.dict_writer(self._file, extrasaction="ignore")
+        self._writer.writeheader()
+        if self.background:
+            self._thread = Thread(self.consumer, daemon=True, name="csv-batch-writer")
+            self._thread.start()
+        return self
+
+    def consumer(self):
+        while (rows := self._queue.get()) is not None:
+            if self._error is None:
+                self.write_rows(rows)
+
+    def write_rows(self, rows: t.List[dict]):
+        try:
+            self._writer.writerows(rows)  # type: ignore[union-attr]
+        except Exception as exc:  # pylint: disable=broad-except
+            self._error = exc
+
+    def raise_for_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, records: RecordType):
+        _records = [records] if isinstance(records, dict) else records
+        iterator = iter(_records if self._hook is None else map(self._hook, _records))
+        while chunk := list(itertools.islice(iterator, self.batch_size - len(self._batch))):
+            self._batch.extend(chunk)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        self.raise_for_error()
+        if not self._batch:
+            return
+
+        rows, self._batch = self._batch, []
+        if self._thread is not None:
+            self._queue.put(rows)
+        else:
+            self.write_rows(rows)
+            self.raise_for_error()
 
-        with self.open_writer(output_file, **kwargs) as writer:
-            writer.send(self.pre_write_hook(r) for r in sortedlist)
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.raise_for_error()
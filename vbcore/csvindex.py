@@ -0,0 +1,253 @@
+import array
+import csv
+import mmap
+import os
+import struct
+import typing as t
+from dataclasses import dataclass
+
+from vbcore.csvfile import CSVHandler
+from vbcore.exceptions import VBEmptyFileError, VBException
+from vbcore.types import OptStr
+
+INDEX_MAGIC = b"VBCSVIDX"
+INDEX_HEADER = struct.Struct("<8sQQQQ")
+
+LineType = t.Tuple[int, bytes]
+
+
+class VBInvalidIndexError(VBException):
+    def __init__(self, filename: str, message: OptStr = None, **kwargs):
+        self.filename = filename
+        super().__init__(message or f"invalid index file: {filename}", **kwargs)
+
+
+@dataclass(frozen=True)
+class IndexHeader:
+    mtime_ns: int
+    size: int
+    step: int
+    rows: int = 0
+
+    @classmethod
+    def from_file(cls, filename: str, step: int, rows: int = 0) -> "IndexHeader":
+        stat = os.stat(filename)
+        return cls(mtime_ns=stat.st_mtime_ns, size=stat.st_size, step=step, rows=rows)
+
+    @classmethod
+    def unpack(cls, filename: str, data: t.Union[bytes, mmap.mmap]) -> "IndexHeader":
+        try:
+            magic, *values = INDEX_HEADER.unpack(data[: INDEX_HEADER.size])
+        except struct.error as exc:
+            raise VBInvalidIndexError(filename, orig=exc) from exc
+        if magic != INDEX_MAGIC:
+            raise VBInvalidIndexError(filename)
+        return cls(*values)
+
+    def pack(self) -> bytes:
+        return INDEX_HEADER.pack(INDEX_MAGIC, self.mtime_ns, self.size, self.step, self.rows)
+
+    def matches(self, other: "IndexHeader") -> bool:
+        return (self.mtime_ns, self.size, self.step) == (other.mtime_ns, other.size, other.step)
+
+
+class CSVIndex:
+    """
+    Random access to the records of a csv file through a sidecar index file
+    that stores the byte offset of every step-th record as array('Q').
+    The index is rebuilt when the csv file mtime or size changes.
+    NOTE: records with embedded new lines are not supported
+
+    >>> with CSVIndex(CSVHandler("data.csv")) as index:  # doctest: +SKIP
+    ...     index[1000]
+    ...     index.lookup("code", "code-1")
+    """
+
+    def __init__(
+        self,
+        handler: CSVHandler,
+        filename: OptStr = None,
+        step: int = 1,
+        index_file: OptStr = None,
+    ):
+        self.handler = handler
+        self.filename = str(filename or handler.filename)
+        self.index_file = index_file or f"{self.filename}.idx"
+        self.step = step
+        self.header: t.Optional[IndexHeader] = None
+        self._data: t.Optional[mmap.mmap] = None
+        self._index: t.Optional[mmap.mmap] = None
+        self._offsets: t.Optional[memoryview] = None
+        self._keys: t.Dict[str, t.Dict[str, t.List[int]]] = {}
+
+    def __enter__(self) -> "CSVIndex":
+        return self.open()
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.header.rows if self.header else 0
+
+    def __getitem__(self, row: int) -> t.Any:
+        return self.read_at(self.offset(row))
+
+    @property
+    def data(self) -> mmap.mmap:
+        if self._data is None:
+            raise VBException("index is not opened")
+        return self._data
+
+    @property
+    def data_offset(self) -> int:
+        return self.data.find(b"\n") + 1
+
+    def read_header(self) -> t.Optional[IndexHeader]:
+        try:
+            with open(self.index_file, "rb") as file:
+                return IndexHeader.unpack(self.index_file, file.read(INDEX_HEADER.size))
+        except (OSError, VBInvalidIndexError):
+            return None
+
+    def is_valid(self) -> bool:
+        header = self.read_header()
+        if header is None:
+            return False
+        return header.matches(IndexHeader.from_file(self.filename, self.step))
+
+    def build(self):
+        offsets = array.array("Q")
+        rows = 0
+        with self.handler.open_binary(self.filename) as file:
+            position = len(file.readline())
+            for line in file:
+                # blank lines are skipped like the csv reader does
+                if line.strip(b"\r\n"):
+                    if rows % self.step == 0:
+                        offsets.append(position)
+                    rows += 1
+                position += len(line)
+
+        header = IndexHeader.from_file(self.filename, self.step, rows)
+        temp_file = f"{self.index_file}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(header.pack())
+            offsets.tofile(file)
+        os.replace(temp_file, self.index_file)
+
+    def open(self) -> "CSVIndex":
+        if self.handler.resolve_compression(self.filename) is not None:
+            raise VBException(f"random access is not supported on compressed file: {self.filename}")
+        if os.path.getsize(self.filename) == 0:
+            raise VBEmptyFileError(self.filename)
+        if not self.is_valid():
+            self.build()
+
+        with self.handler.reader(self.filename):
+            pass  # only to detect header fields
+
+        try:
+            with open(self.index_file, "rb") as file:
+                self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with self.handler.open_binary(self.filename) as file:
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self.header = IndexHeader.unpack(self.index_file, self._index)
+            self._offsets = memoryview(self._index)[INDEX_HEADER.size :].cast("Q")
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        if self._offsets is not None:
+            self._offsets.release()
+        for mapped in (self._index, self._data):
+            if mapped is not None:
+                mapped.close()
+        self._offsets, self._index, self._data, self.header = None, None, None, None
+        self._keys.clear()
+
+    def refresh(self) -> bool:
+        """reopens the index if the csv file is changed, returns True if reloaded"""
+        if self.is_valid():
+            return False
+        self.close()
+        self.open()
+        return True
+
+    def line_end(self, offset: int) -> int:
+        end = self.data.find(b"\n", offset)
+        return len(self.data) if end < 0 else end + 1
+
+    def skip_blank_lines(self, offset: int) -> int:
+        size = len(self.data)
+        while offset < size and not self.data[offset : self.line_end(offset)].strip(b"\r\n"):
+            offset = self.line_end(offset)
+        return offset
+
+    def next_line(self, offset: int) -> int:
+        """the offset of the record after the one at offset, blank lines are not records"""
+        return self.skip_blank_lines(self.line_end(offset))
+
+    def offset(self, row: int) -> int:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self) or self._offsets is None:
+            raise IndexError(f"row {row} out of range")
+
+        offset = self._offsets[row // self.step]
+        for _ in range(row % self.step):
+            offset = self.next_line(offset)
+        return offset
+
+    def read_at(self, offset: int) -> t.Any:
+        data = self.data[offset : self.line_end(offset)]
+        return self.handler.after_read_hook(next(self.handler.parse_bytes(data)))
+
+    def rows(self, start: int = 0, stop: t.Optional[int] = None) -> t.Generator[t.Any, None, None]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+
+        offset = self.offset(start)
+        for _ in range(start, stop):
+            end = self.next_line(offset)
+            yield self.read_at(offset)
+            offset = end
+
+    def iter_lines(self) -> t.Generator[LineType, None, None]:
+        offset, size = self.skip_blank_lines(self.data_offset), len(self.data)
+        while offset < size:
+            yield offset, self.data[offset : self.line_end(offset)]
+            offset = self.next_line(offset)
+
+    def build_key_index(self, column: str) -> t.Dict[str, t.List[int]]:
+        offsets: t.List[int] = []
+        position = self.handler.fields.index(column)
+        params = self.handler.params
+
+        def decoded_lines() -> t.Generator[str, None, None]:
+            for offset, line in self.iter_lines():
+                offsets.append(offset)
+                yield line.decode(params.encoding, errors=params.encoding_errors)
+
+        keys: t.Dict[str, t.List[int]] = {}
+        reader = csv.reader(
+            decoded_lines(),
+            delimiter=params.delimiter,
+            quoting=params.quoting,
+            escapechar=params.escape_char,
+        )
+        for row, values in enumerate(reader):
+            keys.setdefault(values[position], []).append(offsets[row])
+
+        self._keys[column] = keys
+        return keys
+
+    def lookup(self, column: str, value: str) -> t.List[t.Any]:
+        """returns the records where column is equals to value, the key index is built on demand"""
+        keys = self._keys.get(column)
+        if keys is None:
+            keys = self.build_key_index(column)
+        return [self.read_at(offset) for offset in keys.get(value, ())]
@@ -0,0 +1,250 @@
+from typing import (
+    Any,
+    AsyncGenerator,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+)
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncResult
+
+from vbcore.db.pagination import KeyColumns, keyset_query, make_page, Page
+from vbcore.db.repo import (
+    C,
+    D,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_YIELD_PER,
+    MutationMixin,
+    QueryMixin,
+)
+from vbcore.db.types import (
+    ExecParams,
+    SqlColumns,
+    SqlWhereClause,
+    SqlWhereClauses,
+    TableType,
+)
+from vbcore.db.upsert import UpsertBuilder
+from vbcore.lambdas import chunk_iterator
+
+
+class AsyncBaseRepo:
+    def __init__(self, connection: AsyncConnection):
+        self.connection = connection
+
+    async def execute(
+        self, statement: sa.Executable, parameters: Optional[ExecParams] = None
+    ) -> sa.CursorResult:
+        return await self.connection.execute(statement, parameters=parameters)
+
+    async def stream(
+        self, statement: sa.Executable, parameters: Optional[ExecParams] = None
+    ) -> AsyncResult:
+        """server side cursor, rows are fetched while iterating"""
+        return await self.connection.stream(statement, parameters=parameters)
+
+
+class AsyncQuerierRepo(AsyncBaseRepo, QueryMixin[D]):
+    def __init__(self, connection: AsyncConnection, dto_class: Type[D]):
+        super().__init__(connection)
+        self.dto_class = dto_class
+
+    def fetch(
+        self,
+        table: TableType,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        **kwargs,
+    ) -> AsyncGenerator[D, None]:
+        query, params = self.prepare_fetch(table, columns, clauses, **kwargs)
+        return self.query(query, params=params)
+
+    async def fetch_one(
+        self,
+        table: TableType,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        **kwargs,
+    ) -> D:
+        query, params = self.prepare_fetch(table, columns, clauses, **kwargs)
+        result = await self.execute(query, params)
+        return self.prepare_query_dto(result.one())
+
+    def fetch_batches(
+        self,
+        table: TableType,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        batch_size: int = DEFAULT_YIELD_PER,
+        **kwargs,
+    ) -> AsyncGenerator[List[D], None]:
+        query = self.query_builder(table, columns, clauses, **kwargs)
+        return self.query_batches(query, batch_size)
+
+    async def fetch_page(
+        self,
+        table: TableType,
+        keys: KeyColumns,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        reverse: bool = False,
+        **kwargs,
+    ) -> Page[D]:
+        query = self.query_builder(table, columns, clauses, **kwargs)
+        result = await self.execute(keyset_query(query, keys, cursor, page_size, reverse))
+        factory = self.dto_factory(tuple(result.keys()))
+        return make_page(result.all(), factory, len(keys), page_size)
+
+    async def query(
+        self,
+        query: sa.Select,
+        yield_per: Optional[int] = None,
+        params: Optional[ExecParams] = None,
+    ) -> AsyncGenerator[D, None]:
+        """if yield_per is given the rows are streamed, otherwise they are buffered"""
+        if not yield_per:
+            result = await self.execute(query, params)
+            for record in map(self.dto_factory(tuple(result.keys())), result):
+                yield record
+            return
+
+        stream = await self.stream(self.streaming(query, yield_per), params)
+        try:
+            factory = self.dto_factory(tuple(stream.keys()))
+            async for row in stream:
+                yield factory(row)
+        finally:
+            await stream.close()
+
+    async def query_batches(
+        self, query: sa.Select, batch_size: int = DEFAULT_YIELD_PER
+    ) -> AsyncGenerator[List[D], None]:
+        stream = await self.stream(self.streaming(query, batch_size))
+        try:
+            factory = self.dto_factory(tuple(stream.keys()))
+            async for partition in stream.partitions():
+                yield [factory(record) for record in partition]
+        finally:
+            await stream.close()
+
+
+class AsyncMutatorRepo(AsyncBaseRepo, MutationMixin, Generic[C]):
+    def __init__(self, connection: AsyncConnection, table: TableType):
+        super().__init__(connection)
+        self.table = table
+
+    async def insert(self, data: C) -> NamedTuple:
+        cursor = await self.execute(self.insert_statement(), data.to_dict())
+        return cursor.inserted_primary_key
+
+    async def insert_many(self, values: Iterable[C], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """values can be a generator, they are inserted in chunks of batch_size"""
+        count = 0
+        stm = self.insert_statement()
+        for chunk in chunk_iterator(values, batch_size):
+            await self.execute(stm, [value.to_dict() for value in chunk])
+            count += len(chunk)
+        return count
+
+    async def upsert_many(
+        self,
+        values: Iterable[C],
+        index_elements: Sequence[str] = (),
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """dialect native upsert, see UpsertBuilder"""
+        count = 0
+        builder = UpsertBuilder(self.table, index_elements, update_columns)
+        for chunk in chunk_iterator(values, batch_size):
+            records = [value.to_dict() for value in chunk]
+            stm = builder.build(self.connection.dialect, records[0].keys())
+            await self.execute(stm, records)
+            count += len(records)
+        return count
+
+    async def insert_from_select(self, columns: Sequence[str], query: sa.Selectable) -> None:
+        stm = sa.insert(self.table).from_select(columns, query)
+        await self.execute(stm)
+
+    async def update(self, *clauses: SqlWhereClause, **values) -> int:
+        stm = sa.update(self.table).where(*clauses).values(values)
+        cursor = await self.execute(stm)
+        return cursor.rowcount
+
+    async def update_by(self, filters: Mapping[str, Any], **values) -> int:
+        stm, params = self.prepare_update(filters, values)
+        cursor = await self.execute(stm, params)
+        return cursor.rowcount
+
+    async def delete(self, *clauses: SqlWhereClause) -> int:
+        stm = sa.delete(self.table).where(*clauses)
+        cursor = await self.execute(stm)
+        return cursor.rowcount
+
+    async def delete_by(self, **filters) -> int:
+        stm, params = self.prepare_delete(filters)
+        cursor = await self.execute(stm, params)
+        return cursor.rowcount
+
+
+class AsyncCrudRepo(Generic[C, D]):
+    def __init__(self, connection: AsyncConnection, dto_class: Type[D], table: TableType):
+        self.querier = AsyncQuerierRepo[D](connection, dto_class)
+        self.mutator = AsyncMutatorRepo[C](connection, table)
+
+    async def get(self, columns: SqlColumns = (), clauses: SqlWhereClauses = (), **kwargs) -> D:
+        return await self.querier.fetch_one(self.mutator.table, columns, clauses, **kwargs)
+
+    def get_all(
+        self, columns: SqlColumns = (), clauses: SqlWhereClauses = (), **kwargs
+    ) -> AsyncGenerator[D, None]:
+        return self.querier.fetch(self.mutator.table, columns, clauses, **kwargs)
+
+    def get_batches(
+        self,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        batch_size: int = DEFAULT_YIELD_PER,
+        **kwargs,
+    ) -> AsyncGenerator[List[D], None]:
+        return self.querier.fetch_batches(
+            self.mutator.table, columns, clauses, batch_size=batch_size, **kwargs
+        )
+
+    async def get_page(
+        self,
+        keys: KeyColumns,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        **kwargs,
+    ) -> Page[D]:
+        return await self.querier.fetch_page(
+            self.mutator.table, keys, columns, clauses, cursor, page_size, **kwargs
+        )
+
+    async def create(self, data: C) -> NamedTuple:
+        return await self.mutator.insert(data)
+
+    async def update(self, *clauses: SqlWhereClause, **values) -> int:
+        return await self.mutator.update(*clauses, **values)
+
+    async def update_by(self, filters: Mapping[str, Any], **values) -> int:
+        return await self.mutator.update_by(filters, **values)
+
+    async def delete(self, *clauses: SqlWhereClause) -> int:
+        return await self.mutator.delete(*clauses)
+
+    async def delete_by(self, **filters) -> int:
+        return await self.mutator.delete_by(**filters)
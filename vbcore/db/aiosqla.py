@@ -0,0 +1,129 @@
+import typing as t
+from contextlib import asynccontextmanager
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+
+from ..loggers import VBLoggerMixin
+from ..types import OptDict, OptInt
+from .events import ErrorsHandler
+from .sqla import SQLAConnector
+from .views import DDLViewCompiler
+
+if t.TYPE_CHECKING:
+    from .base import LoadersType
+
+
+class AsyncSQLAConnector(VBLoggerMixin):
+    """
+    asyncio version of SQLAConnector, it shares the same metadata,
+    str_conn must use an async driver, e.g. 'sqlite+aiosqlite://' or 'postgresql+asyncpg://'
+    """
+
+    metadata = SQLAConnector.metadata
+    views_metadata = SQLAConnector.views_metadata
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        str_conn: str,
+        session_options: OptDict = None,
+        echo: bool = False,
+        connect_args: OptDict = None,
+        execution_options: OptDict = None,
+        pool_pre_ping: bool = False,
+        pool_size: OptInt = None,
+        autoflush: bool = True,
+        expire_on_commit: bool = False,
+        custom_handlers: bool = True,
+        **kwargs,
+    ):
+        """
+        expire_on_commit defaults to False because expired attributes
+        can not be lazy loaded outside the greenlet context
+        """
+        self._session_options = session_options or {}
+        self._session_options.setdefault("class_", AsyncSession)
+        self._session_options.setdefault("autoflush", autoflush)
+        self._session_options.setdefault("expire_on_commit", expire_on_commit)
+        self._factory: t.Optional[async_sessionmaker] = None
+
+        if pool_size is not None:
+            kwargs["pool_size"] = pool_size
+
+        self.engine: AsyncEngine = create_async_engine(
+            url=str_conn,
+            echo=echo,
+            connect_args=connect_args or {},
+            execution_options=execution_options,
+            pool_pre_ping=pool_pre_ping,
+            **kwargs,
+        )
+
+        if custom_handlers:
+            self.register_custom_handlers()
+
+    def register_custom_handlers(self):
+        """events are not supported by the async engine, so they are registered on the sync one"""
+        ErrorsHandler.register(self.engine.sync_engine)
+        DDLViewCompiler().register()
+
+    def _create_all(self, connection: sa.Connection, loaders: "LoadersType") -> None:
+        if not loaders:
+            self.metadata.create_all(connection)
+            return
+
+        listeners = SQLAConnector.register_loaders(Session(bind=connection), loaders)
+        try:
+            self.metadata.create_all(connection)
+        finally:
+            SQLAConnector.unregister_loaders(listeners)
+
+    async def create_all(self, loaders: "LoadersType" = ()) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(self._create_all, loaders)
+
+    async def drop_all(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(self.metadata.drop_all)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+    def get_session(self, **options) -> AsyncSession:
+        if options:
+            return async_sessionmaker(self.engine, **options)()
+        if self._factory is None:
+            self._factory = async_sessionmaker(self.engine, **self._session_options)
+        return self._factory()
+
+    @asynccontextmanager
+    async def connect(self) -> t.AsyncGenerator[AsyncConnection, None]:
+        """core connection to be used with the async repos"""
+        async with self.engine.connect() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def connection(self, **options) -> t.AsyncGenerator[AsyncSession, None]:
+        session = self.get_session(**options)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    @asynccontextmanager
+    async def transaction(self, **options) -> t.AsyncGenerator[AsyncSession, None]:
+        async with self.connection(**options) as conn:
+            try:
+                yield conn
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
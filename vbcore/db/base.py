@@ -1,5 +1,6 @@
 import typing as t
 from dataclasses import make_dataclass
+from enum import auto
 from functools import partial
 from typing import ClassVar, Type, Union
 
@@ -9,12 +10,16 @@ from sqlalchemy.orm import as_declarative, mapped_column, Session
 
 from vbcore.base import BaseDTO
 from vbcore.db.sqla import SQLAConnector
+from vbcore.enums import LStrEnum
+from vbcore.lambdas import chunk_iterator
 from vbcore.loggers import Log
 from vbcore.misc import get_uuid
 from vbcore.types import StrDict, StrTuple
 
 LoadersType = t.Tuple[t.Type["LoaderModel"], ...]
 
+DEFAULT_LOAD_BATCH_SIZE = 1000
+
 
 class StrSize:
     small: ClassVar[int] = 128
@@ -107,15 +112,39 @@ class ViewModel(BaseModel):
     """
 
 
+class LoadStrategy(LStrEnum):
+    ORM = auto()
+    CORE = auto()
+
+
 class LoaderModel(Model):
+    """
+    The values are loaded after the table creation, by default through the ORM.
+    With the CORE strategy they are inserted in chunks of load_batch_size with
+    executemany, the dialect may use insertmanyvalues; it skips the unit of work
+    so ORM events and python side attributes of the model are not applied,
+    only the column defaults
+    """
+
     __abstract__ = True
 
     values: t.Sequence[StrDict] = ()
+    load_strategy: ClassVar[str] = LoadStrategy.ORM
+    load_batch_size: ClassVar[int] = DEFAULT_LOAD_BATCH_SIZE
+
+    @classmethod
+    def bulk_insert_values(cls, session: Session) -> None:
+        statement = sa.insert(cls.__table__)
+        for chunk in chunk_iterator(cls.values, cls.load_batch_size):
+            session.execute(statement, chunk)
 
     @classmethod
     def load_values(cls, session: Session, *_, **__) -> None:
         try:
-            session.add_all(cls(**d) for d in cls.values)
+            if cls.load_strategy == LoadStrategy.CORE:
+                cls.bulk_insert_values(session)
+            else:
+                session.add_all(cls(**d) for d in cls.values)
             session.commit()
         except SQLAlchemyError as exc:
             Log.get(cls.__module__).exception(exc)
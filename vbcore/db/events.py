@@ -17,6 +17,7 @@
 #    under the License.
 
 import collections
+import functools
 import re
 import sys
 import typing as t
@@ -43,12 +44,21 @@ from vbcore.db.exceptions import (
 from vbcore.db.listener import Listener
 
 ROLLBACK_CAUSE_KEY = "vbcore.db.sp_rollback_cause"
+MATCH_CACHE_SIZE = 1024
+
+# the error codes mentioned by a filter, e.g. the mysql ones like 1062 or 2006
+ERROR_CODE = re.compile(r"(?<!\d)\d{4,5}(?!\d)")
 
 ExcType = t.Union[t.Type[DBAPIError], t.Type[Exception]]
 FilterType = t.Callable[["ExceptionData"], None]
+MatcherType = t.Callable[[str], t.Optional[re.Match]]
+ErrorCodes = t.FrozenSet[int]
+ErrorCode = t.Optional[t.Union[int, str]]
+FilterEntry = t.Tuple[FilterType, MatcherType, ErrorCodes]
+DispatchEntry = t.Tuple[int, FilterType, MatcherType, ErrorCodes]
 
-__REGISTRY: t.Dict[str, t.Dict[ExcType, t.List[t.Tuple[FilterType, re.Pattern]]]] = (
-    collections.defaultdict(lambda: collections.defaultdict(list))
+__REGISTRY: t.Dict[str, t.Dict[ExcType, t.List[FilterEntry]]] = collections.defaultdict(
+    lambda: collections.defaultdict(list)
 )
 
 
@@ -66,6 +76,79 @@ def try_match(match: re.Match, key: str):
         return None
 
 
+def _message(exc: t.Optional[BaseException]) -> str:
+    """not every exception is wrapped by sqlalchemy, so exc may be None"""
+    return str(exc.args[0]) if exc is not None and exc.args else ""
+
+
+def _error_code(exc: t.Optional[BaseException]) -> ErrorCode:
+    """
+    the error code of the driver: pgcode for psycopg, sqlite_errorcode for sqlite3
+    and the first argument for the mysql drivers, None if it is unknown
+    """
+    if exc is None:
+        return None
+    for attr in ("pgcode", "sqlite_errorcode"):
+        code = getattr(exc, attr, None)
+        if code is not None:
+            return code
+    if exc.args and isinstance(exc.args[0], int):
+        return exc.args[0]
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _dispatch_entries(dialect: str, exc_types: t.Tuple[type, ...]) -> t.Tuple[DispatchEntry, ...]:
+    """
+    Flattens the filters in the order they are attempted: the dialect ones before
+    the generic ones, then for every exception its method resolution order, so that
+    filters indicating a more specific exception class are attempted first.
+    Every entry carries the position of the exception it applies to.
+    """
+    dialects = (dialect, "*") if dialect != "*" else ("*",)
+    return tuple(
+        (position, fn, matcher, codes)
+        for name in dialects
+        if (per_dialect := __REGISTRY.get(name)) is not None
+        for position, exc_type in enumerate(exc_types)
+        for super_ in exc_type.__mro__
+        for fn, matcher, codes in per_dialect.get(super_) or ()
+    )
+
+
+@functools.lru_cache(maxsize=MATCH_CACHE_SIZE)
+def _candidates(dialect: str, exc_types: t.Tuple[type, ...], code: ErrorCode) -> t.Tuple[int, ...]:
+    """
+    The entries that can match an error, the filters mentioning error codes
+    are attempted only for those codes; the messages embed values, so they are
+    not part of the key and the regexes are applied only to the candidates
+    """
+    return tuple(
+        index
+        for index, (*_, codes) in enumerate(_dispatch_entries(dialect, exc_types))
+        if not codes or code is None or code in codes
+    )
+
+
+def match_cache_info() -> functools._CacheInfo:
+    """statistics of the cache of the candidate filters"""
+    return _candidates.cache_info()  # pylint: disable=no-value-for-parameter
+
+
+def clear_match_cache() -> None:
+    """the cached dispatch must be invalidated whenever filters are registered"""
+    _dispatch_entries.cache_clear()
+    _candidates.cache_clear()
+
+
+def compile_matcher(regex: str) -> MatcherType:
+    return re.compile(regex, re.DOTALL).match
+
+
+def error_codes(regex: str) -> ErrorCodes:
+    return frozenset(int(code) for code in ERROR_CODE.findall(regex))
+
+
 def filters(dbname: str, exception_type: ExcType, *regexes: str) -> t.Callable:
     """
     Mark a function as receiving a filtered exception.
@@ -78,8 +161,9 @@ def filters(dbname: str, exception_type: ExcType, *regexes: str) -> t.Callable:
 
     def _receive(fn: FilterType) -> FilterType:
         __REGISTRY[dbname][exception_type].extend(
-            (fn, re.compile(reg, re.DOTALL)) for reg in regexes
+            (fn, compile_matcher(reg), error_codes(reg)) for reg in regexes
         )
+        clear_match_cache()
         return fn
 
     return _receive
@@ -435,24 +519,12 @@ def _raise_for_all_others(data: ExceptionData):
     raise DBError(data.exc)
 
 
-def _dialect_registries(engine):
-    if engine.dialect.name in __REGISTRY:
-        yield __REGISTRY[engine.dialect.name]
-    if "*" in __REGISTRY:
-        yield __REGISTRY["*"]
-    yield
-
-
 def _exception_handler(
     callback: FilterType,
     context: ExceptionContext,
     exc: Exception,
-    regexp: re.Pattern,
+    match: re.Match,
 ):
-    match = regexp.match(exc.args[0])
-    if not match:
-        return None
-
     try:
         callback(ExceptionData(exc=exc, match=match, context=context))
         return None
@@ -477,21 +549,6 @@ def _exception_handler(
         return dbe
 
 
-def _per_dialect_handler(context: ExceptionContext, per_dialect: dict):
-    """
-    Method resolution order is used so that filter rules indicating a
-    more specific exception class are attempted first.
-    """
-    for exc in (context.sqlalchemy_exception, context.original_exception):
-        for super_ in exc.__class__.__mro__:
-            for fn, regexp in per_dialect.get(super_) or ():
-                _exception = t.cast(Exception, exc)
-                handled = _exception_handler(fn, context, _exception, regexp)
-                if handled:
-                    return handled
-    return None
-
-
 class ErrorsHandler:
     @classmethod
     def handler(cls, context: ExceptionContext):
@@ -499,12 +556,22 @@ class ErrorsHandler:
         Iterate through available filters and invoke those which match.
         The first one which returns exception wins.
         The order in which the filters are attempted is sorted
-        by specificity-dialect name or "*" (for all)
+        by specificity-dialect name or "*" (for all), see _dispatch_entries
         """
-        for per_dialect in _dialect_registries(context.engine):
-            handled = _per_dialect_handler(context, per_dialect)
-            if handled:
-                return handled
+        exceptions = (context.sqlalchemy_exception, context.original_exception)
+        exc_types: t.Tuple[type, ...] = tuple(type(e) for e in exceptions)
+        dialect = context.engine.dialect.name
+        entries = _dispatch_entries(dialect, exc_types)
+        code = _error_code(context.original_exception)
+        messages = tuple(_message(e) for e in exceptions)
+        for index in _candidates(dialect, exc_types, code):
+            position, callback, matcher, _ = entries[index]
+            match = matcher(messages[position])
+            if match:
+                _exception = t.cast(Exception, exceptions[position])
+                handled = _exception_handler(callback, context, _exception, match)
+                if handled:
+                    return handled
         return None
 
     @classmethod
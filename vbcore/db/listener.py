@@ -3,11 +3,15 @@ from typing import Callable
 from sqlalchemy import event
 
 
-class Listener:
+class Listener:  # pylint: disable=too-many-public-methods
     @classmethod
     def register_after_create(cls, target, callback, *args, **kwargs) -> None:
         event.listen(target, "after_create", callback, *args, **kwargs)
 
+    @classmethod
+    def unregister_after_create(cls, target, callback) -> None:
+        event.remove(target, "after_create", callback)
+
     @classmethod
     def register_before_drop(cls, target, callback, *args, **kwargs) -> None:
         event.listen(target, "before_drop", callback, *args, **kwargs)
@@ -87,3 +91,87 @@ class Listener:
             return fn
 
         return wrapper
+
+    @classmethod
+    def register_at_checkout(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "checkout", callback, *args, **kwargs)
+
+    @classmethod
+    def register_at_connect(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "connect", callback, *args, **kwargs)
+
+    @classmethod
+    def register_at_invalidate(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "invalidate", callback, *args, **kwargs)
+
+    @classmethod
+    def register_at_close(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "close", callback, *args, **kwargs)
+
+    @classmethod
+    def register_at_engine_disposed(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "engine_disposed", callback, *args, **kwargs)
+
+    @classmethod
+    def register_before_cursor_execute(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "before_cursor_execute", callback, *args, **kwargs)
+
+    @classmethod
+    def register_after_cursor_execute(cls, engine, callback, *args, **kwargs) -> None:
+        event.listen(engine, "after_cursor_execute", callback, *args, **kwargs)
+
+    @classmethod
+    def listens_for_checkout(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_at_checkout(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_connect(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_at_connect(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_invalidate(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_at_invalidate(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_close(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_at_close(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_engine_disposed(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_at_engine_disposed(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_before_cursor_execute(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_before_cursor_execute(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
+
+    @classmethod
+    def listens_for_after_cursor_execute(cls, engine, *args, **kwargs) -> Callable:
+        def wrapper(fn):
+            cls.register_after_cursor_execute(engine, fn, *args, **kwargs)
+            return fn
+
+        return wrapper
@@ -0,0 +1,217 @@
+import bisect
+import functools
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy import exc as sqla_exc
+
+from vbcore.loggers import VBLoggerMixin
+from vbcore.types import OptStr
+
+from .listener import Listener
+
+CONNECTED_AT_KEY = "vbcore.db.connected_at"
+QUERY_START_KEY = "vbcore.db.query_start"
+
+DEFAULT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+DEFAULT_LIFETIME_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 86400.0)
+
+
+class Histogram:
+    """
+    Counts the observed values into buckets with the given upper bounds,
+    the last bucket collects the values greater than the last bound
+    """
+
+    def __init__(self, bounds: t.Sequence[float]):
+        self.bounds = tuple(sorted(bounds))
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        labels = [*(str(b) for b in self.bounds), "+inf"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+@dataclass(frozen=True, kw_only=True)
+class PoolStats:
+    size: t.Optional[int]
+    checked_out: int
+    overflow: t.Optional[int]
+    connects: int
+    checkouts: int
+    invalidations: int
+    timeouts: int
+    wait: t.Dict[str, t.Any]
+    lifetime: t.Dict[str, t.Any]
+
+
+class PoolMetrics(VBLoggerMixin):
+    """
+    Collects the pool metrics through the pool events:
+        - size, checked out connections and overflow (if supported by the pool)
+        - counters of connections, checkouts, invalidations and checkout timeouts
+        - histogram of the time spent waiting for a connection
+        - histogram of the connection lifetimes, observed when they are closed or invalidated
+    """
+
+    def __init__(
+        self,
+        wait_buckets: t.Sequence[float] = DEFAULT_WAIT_BUCKETS,
+        lifetime_buckets: t.Sequence[float] = DEFAULT_LIFETIME_BUCKETS,
+    ):
+        self.engine: t.Optional[sa.Engine] = None
+        self.wait = Histogram(wait_buckets)
+        self.lifetime = Histogram(lifetime_buckets)
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def register(self, engine: sa.Engine) -> None:
+        self.engine = engine
+        self.instrument(engine.pool)
+        Listener.register_at_connect(engine, self.on_connect)
+        Listener.register_at_checkout(engine, self.on_checkout)
+        Listener.register_at_checkin(engine, self.on_checkin)
+        Listener.register_at_invalidate(engine, self.on_invalidate)
+        Listener.register_at_close(engine, self.on_close)
+        # dispose replaces the pool, the new one must be instrumented too
+        Listener.register_at_engine_disposed(engine, lambda e: self.instrument(e.pool))
+
+    def instrument(self, pool: sa.Pool) -> None:
+        """there is no event before a checkout, so pool.connect is wrapped to time the wait"""
+        connect = pool.connect
+
+        @functools.wraps(connect)
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            except sqla_exc.TimeoutError:
+                self.increment("timeouts")
+                raise
+            finally:
+                self.wait.observe(time.perf_counter() - start)
+
+        setattr(pool, "connect", timed_connect)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def on_connect(self, _, record) -> None:
+        record.info[CONNECTED_AT_KEY] = time.monotonic()
+        self.increment("connects")
+
+    def on_checkout(self, *_) -> None:
+        self.increment("checkouts")
+
+    def on_checkin(self, *_) -> None:
+        self.increment("checkins")
+
+    def on_invalidate(self, _, record, __) -> None:
+        self.increment("invalidations")
+        self.observe_lifetime(record)
+
+    def on_close(self, _, record) -> None:
+        self.observe_lifetime(record)
+
+    def observe_lifetime(self, record) -> None:
+        connected_at = record.info.pop(CONNECTED_AT_KEY, None)
+        if connected_at is not None:
+            self.lifetime.observe(time.monotonic() - connected_at)
+
+    def stats(self) -> PoolStats:
+        pool = self.engine.pool if self.engine is not None else None
+        size = getattr(pool, "size", None)
+        overflow = getattr(pool, "overflow", None)
+        checked_out = getattr(pool, "checkedout", None)
+        return PoolStats(
+            size=size() if size else None,
+            checked_out=checked_out() if checked_out else self.checkouts - self.checkins,
+            overflow=overflow() if overflow else None,
+            connects=self.connects,
+            checkouts=self.checkouts,
+            invalidations=self.invalidations,
+            timeouts=self.timeouts,
+            wait=self.wait.as_dict(),
+            lifetime=self.lifetime.as_dict(),
+        )
+
+
+class SlowQueryLogger(VBLoggerMixin):
+    """logs the statements whose execution time exceeds threshold seconds"""
+
+    def __init__(self, threshold: float, max_length: int = 1000, logger: OptStr = None):
+        self.threshold = threshold
+        self.max_length = max_length
+        self.logger_name = logger
+        self.time = Histogram([threshold])
+
+    @property
+    def slow_queries(self) -> int:
+        return self.time.buckets[-1]
+
+    def register(self, engine: sa.Engine) -> None:
+        Listener.register_before_cursor_execute(engine, self.before_execute)
+        Listener.register_after_cursor_execute(engine, self.after_execute)
+        Listener.register_handle_error(engine, self.on_error, insert=True)
+
+    @classmethod
+    def before_execute(cls, conn, _, __, ___, context, ____) -> None:
+        conn.info.setdefault(QUERY_START_KEY, []).append((context, time.perf_counter()))
+
+    @classmethod
+    def on_error(cls, context) -> None:
+        """
+        a failed statement never reaches after_execute, so its start time is dropped here,
+        only if it is on top, because errors may be raised after the execution too
+        """
+        conn = context.connection
+        starts = conn.info.get(QUERY_START_KEY) if conn is not None else None
+        if starts and starts[-1][0] is context.execution_context:
+            starts.pop()
+
+    def after_execute(self, conn, _, statement, parameters, __, executemany) -> None:
+        starts = conn.info.get(QUERY_START_KEY)
+        if not starts:
+            return
+
+        _, start = starts.pop()
+        elapsed = time.perf_counter() - start
+        self.time.observe(elapsed)
+        if elapsed > self.threshold:
+            self.logger(self.logger_name).warning(
+                "slow query (%.3fs%s): %s - parameters: %.200s",
+                elapsed,
+                ", executemany" if executemany else "",
+                statement[: self.max_length],
+                parameters,
+            )
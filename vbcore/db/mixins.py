@@ -1,5 +1,4 @@
 from datetime import datetime
-from functools import cached_property
 from typing import Optional, TYPE_CHECKING
 
 import sqlalchemy as sa
@@ -50,9 +49,9 @@ class UserMixin(UuidMixin, DateMixin):
 
     email: Mapped[str] = mapped_column(StrCol.medium, unique=True, nullable=False)
 
-    @cached_property
+    @property
     def hasher_instance(self) -> Hasher:
-        return CryptoFactory.instance(self._hasher_type)
+        return CryptoFactory.shared(self._hasher_type)
 
     @hybrid_property
     def password(self):
@@ -65,6 +64,9 @@ class UserMixin(UuidMixin, DateMixin):
     def check_password(self, password):
         return self.hasher_instance.verify(self._password, password)
 
+    async def check_password_async(self, password) -> bool:
+        return await self.hasher_instance.verify_async(self._password, password)
+
 
 class ExtraMixin:
     _json_class = json
@@ -1,11 +1,26 @@
-import io
 import os
 import tarfile
+import tempfile
+import time
 import typing as t
+from concurrent.futures import (
+    Executor,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import closing, contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from itertools import groupby
-from subprocess import CompletedProcess, PIPE, run as run_subprocess  # nosec
+from itertools import groupby, islice
+from subprocess import (  # nosec
+    CalledProcessError,
+    CompletedProcess,
+    PIPE,
+    Popen,
+    run as run_subprocess,
+)
 
 from vbcore.date_helper import DateTimeFmt
 from vbcore.loggers import VBLoggerMixin
@@ -14,6 +29,9 @@ from vbcore.types import CoupleStr, OptInt, OptStr, StrList, StrTuple
 
 CmdLine = StrList
 
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+
 
 @dataclass(frozen=True)
 class MySQLDump:
@@ -22,6 +40,35 @@ class MySQLDump:
     dump: bytes
 
 
+@dataclass(frozen=True)
+class TableDumpStats:
+    database: str
+    table: str
+    size: int
+    elapsed: float
+    filename: OptStr = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.database}.{self.table}"
+
+
+@contextmanager
+def atomic_file(filename: str) -> t.Generator[str, None, None]:
+    """
+    yields a temporary name in the same folder, that is renamed to filename on success
+    and removed on error, so a failed dump does not leave a truncated file
+    """
+    part = f"{filename}{PART_SUFFIX}"
+    try:
+        yield part
+    except BaseException:
+        if os.path.exists(part):
+            os.unlink(part)
+        raise
+    os.replace(part, filename)
+
+
 class MySQLDumper:
     def __init__(
         self,
@@ -30,7 +77,11 @@ class MySQLDumper:
         hostname: OptStr = None,
         port: OptInt = None,
         ignore_databases: t.Optional[StrList] = None,
+        mysql_bin: str = "mysql",
+        mysqldump_bin: str = "mysqldump",
     ):
+        self.mysql_bin = mysql_bin
+        self.mysqldump_bin = mysqldump_bin
         self.username = username
         self.password = password
         self.port = port or 3306
@@ -57,7 +108,7 @@ class MySQLDumper:
         database: OptStr = None,
     ) -> CmdLine:
         return [
-            "mysql",
+            self.mysql_bin,
             *self.base_options,
             f"--database={database}" if database else "",
             "--skip-column-names",
@@ -78,7 +129,7 @@ class MySQLDumper:
         else:
             dump_args = ("--all-databases",)
 
-        return ["mysqldump", *self.base_options, *args, *dump_args]
+        return [self.mysqldump_bin, *self.base_options, *args, *dump_args]
 
     @classmethod
     def execute_binary(cls, cmdline: CmdLine, **kwargs) -> CompletedProcess:
@@ -106,23 +157,70 @@ class MySQLDumper:
                 yield database, table
 
     def dump_table(self, database: str, table: str) -> MySQLDump:
+        """the whole dump is kept in memory, prefer stream_table for big tables"""
         cmdline = self.mysqldump_cmdline(database=database, table=table)
         result = self.execute_binary(cmdline)
         return MySQLDump(database=database, table=table, dump=result.stdout)
 
+    @classmethod
+    def execute_stream(
+        cls, cmdline: CmdLine, output: t.BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        copies the stdout of the command into output chunk by chunk, returns the bytes;
+        stderr is spooled to a file, a pipe could fill up and block the command
+        """
+        size = 0
+        with tempfile.TemporaryFile() as errors:
+            with Popen(cmdline, stdout=PIPE, stderr=errors) as process:  # nosec
+                assert process.stdout is not None  # nosec
+                while chunk := process.stdout.read(chunk_size):
+                    output.write(chunk)
+                    size += len(chunk)
+            if process.returncode:
+                errors.seek(0)
+                raise CalledProcessError(process.returncode, cmdline, stderr=errors.read())
+        return size
+
+    def stream_table(
+        self,
+        database: str,
+        table: str,
+        output: t.BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> TableDumpStats:
+        start = time.monotonic()
+        cmdline = self.mysqldump_cmdline(database=database, table=table)
+        size = self.execute_stream(cmdline, output, chunk_size)
+        return TableDumpStats(database, table, size, time.monotonic() - start)
+
 
 class MysqlBackup(VBLoggerMixin):
+    """
+    Dumps are streamed from mysqldump to the files without keeping them in memory,
+    tables are dumped by a pool of workers; the archive members need their size
+    before the content, so the dumps are spooled to temporary files and
+    then added to the archive by a single thread, as soon as they are ready
+    """
+
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         dumper: MySQLDumper,
         folder: str = ".",
         add_datetime: bool = True,
         datetime_format: OptStr = None,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        tmp_folder: OptStr = None,
     ):
         self.dumper = dumper
         self.folder = folder
         self.add_datetime = add_datetime
         self.datetime_format = datetime_format
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.tmp_folder = tmp_folder
 
     def prepare_filename(self, *args: str, ext: str) -> str:
         current_datetime = None
@@ -132,20 +230,109 @@ class MysqlBackup(VBLoggerMixin):
         filename = "_".join(filter(None, (*args, current_datetime)))
         return os.path.join(self.folder, f"{filename}.{ext}")
 
-    def backup_single_files(self, file_prefix: OptStr = None, db_prefix: OptStr = None):
-        for database, table in self.dumper.all_tables(db_prefix):
-            self.log.info("dumping table: %s.%s ......", database, table)
-            dump = self.dumper.dump_table(database, table)
-            filename = self.prepare_filename(file_prefix, f"{database}.{table}", ext="sql")
-            with open(filename, mode="wb") as file:
-                file.write(dump.dump)
+    def log_stats(self, stats: TableDumpStats) -> None:
+        self.log.info(
+            "table: %s successfully dumped at: %s (%d bytes in %.3f seconds)",
+            stats.name,
+            stats.filename,
+            stats.size,
+            stats.elapsed,
+        )
+
+    def dump_to_file(self, database: str, table: str, filename: str) -> TableDumpStats:
+        self.log.info("dumping table: %s.%s ......", database, table)
+        with atomic_file(filename) as part, open(part, mode="wb") as file:
+            stats = self.dumper.stream_table(database, table, file, self.chunk_size)
+        return TableDumpStats(database, table, stats.size, stats.elapsed, filename)
+
+    def dump_to_temp(self, database: str, table: str) -> t.Tuple[TableDumpStats, t.BinaryIO]:
+        """the caller must close the returned file, that is deleted then"""
+        self.log.info("dumping table: %s.%s ......", database, table)
+        file = tempfile.TemporaryFile(dir=self.tmp_folder)  # pylint: disable=consider-using-with
+        try:
+            stats = self.dumper.stream_table(database, table, file, self.chunk_size)
+        except BaseException:
+            file.close()
+            raise
+        file.seek(0)
+        return stats, file
+
+    def submit_bounded(
+        self,
+        executor: Executor,
+        func: t.Callable[..., t.Any],
+        items: t.Iterable[t.Tuple[t.Any, ...]],
+        discard: t.Optional[t.Callable[[t.Any], None]] = None,
+    ) -> t.Generator[Future, None, None]:
+        """
+        yields the futures as they complete with at most workers of them in flight,
+        so the finished dumps do not pile up waiting for the consumer. When the
+        consumer stops, e.g. on error, the pending futures are cancelled and
+        discard is called with the results already produced
+        """
+        items = iter(items)
+        pending: t.Set[Future] = set()
+        done: t.Set[Future] = set()
+        try:
+            while True:
+                for args in islice(items, self.workers - len(pending)):
+                    pending.add(executor.submit(func, *args))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                while done:
+                    yield done.pop()
+        finally:
+            self.discard_futures(pending | done, discard)
+
+    @classmethod
+    def discard_futures(
+        cls, futures: t.Set[Future], discard: t.Optional[t.Callable[[t.Any], None]] = None
+    ) -> None:
+        for future in futures:
+            future.cancel()
+        for future in futures:
+            if future.cancelled() or future.exception() is not None:
+                continue
+            if discard is not None:
+                discard(future.result())
+
+    @classmethod
+    def close_dump(cls, result: t.Tuple[TableDumpStats, t.BinaryIO]) -> None:
+        result[1].close()
 
-            self.log.info(
-                "table: %s.%s successfully dumped at: %s",
+    def backup_single_files(
+        self, file_prefix: OptStr = None, db_prefix: OptStr = None
+    ) -> t.List[TableDumpStats]:
+        report = []
+        items = (
+            (
                 database,
                 table,
-                filename,
+                self.prepare_filename(file_prefix, f"{database}.{table}", ext="sql"),
             )
+            for database, table in self.dumper.all_tables(db_prefix)
+        )
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="mysql-backup") as executor:
+            with closing(self.submit_bounded(executor, self.dump_to_file, items)) as futures:
+                for future in futures:
+                    report.append(future.result())
+                    self.log_stats(report[-1])
+        return report
+
+    def add_to_archive(
+        self,
+        archive: tarfile.TarFile,
+        future: "Future[t.Tuple[TableDumpStats, t.BinaryIO]]",
+        filename: str,
+    ) -> TableDumpStats:
+        """filename is the final name of the archive, it is written with a temporary name"""
+        stats, dump = future.result()
+        with dump:
+            tarinfo = tarfile.TarInfo(f"{stats.name}.sql")
+            tarinfo.size = stats.size
+            archive.addfile(tarinfo, fileobj=dump)
+        return TableDumpStats(stats.database, stats.table, stats.size, stats.elapsed, filename)
 
     def backup_as_archive(
         self,
@@ -153,20 +340,31 @@ class MysqlBackup(VBLoggerMixin):
         db_prefix: OptStr = None,
         mode: OptStr = None,
         ext: OptStr = None,
-    ):
+    ) -> t.List[TableDumpStats]:
         _mode = mode or "w:gz"
         _ext = ext or "tar.gz"
+        report = []
         cursor = self.dumper.all_tables(db_prefix)
-        for database, tables in groupby(cursor, key=lambda x: x[0]):
-            filename = self.prepare_filename(file_prefix, database, ext=_ext)
-            with tarfile.open(filename, mode=_mode) as file:
-                for _, table in tables:
-                    self.log.info("dumping table: %s.%s ......", database, table)
-                    dump = self.dumper.dump_table(database, table)
-                    tarinfo = tarfile.TarInfo(f"{dump.database}.{dump.table}.sql")
-                    tarinfo.size = len(dump.dump)
-                    file.addfile(tarinfo, fileobj=io.BytesIO(dump.dump))
-            self.log.info("database: %s successfully dumped at: %s", database, filename)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="mysql-backup") as executor:
+            for database, tables in groupby(cursor, key=lambda x: x[0]):
+                filename = self.prepare_filename(file_prefix, database, ext=_ext)
+                futures = self.submit_bounded(executor, self.dump_to_temp, tables, self.close_dump)
+                with closing(futures):
+                    report.extend(self.archive_dumps(filename, _mode, futures))
+                self.log.info("database: %s successfully dumped at: %s", database, filename)
+        return report
+
+    def archive_dumps(
+        self, filename: str, mode: str, futures: t.Iterable[Future]
+    ) -> t.List[TableDumpStats]:
+        """the dumps are added in order of completion"""
+        report = []
+        with atomic_file(filename) as part:
+            with tarfile.open(part, mode=mode) as file:  # type: ignore[call-overload]
+                for future in futures:
+                    report.append(self.add_to_archive(file, future, filename))
+                    self.log_stats(report[-1])
+        return report
 
 
 def cli_wrapper(
@@ -179,6 +377,7 @@ def cli_wrapper(
     as_archive: bool = True,
     file_prefix: OptStr = None,
     db_prefix: OptStr = None,
+    workers: int = 1,
 ):
     url = Url.from_raw(db_url)
     _db_prefix = db_prefix or url.path.strip("/")
@@ -194,6 +393,7 @@ def cli_wrapper(
         folder=folder,
         add_datetime=add_datetime,
         datetime_format=datetime_format,
+        workers=workers,
     )
 
     if as_archive is True:
@@ -0,0 +1,82 @@
+import base64
+import typing as t
+from dataclasses import dataclass, field
+
+import sqlalchemy as sa
+from sqlalchemy.orm import InstrumentedAttribute
+
+from vbcore import json
+from vbcore.db.exceptions import DBError
+
+T = t.TypeVar("T")
+
+CURSOR_PREFIX = "cursor_"
+KeyColumns = t.Sequence[t.Union[sa.ColumnElement[t.Any], InstrumentedAttribute[t.Any]]]
+
+
+class InvalidCursorError(DBError):
+    default_message = "invalid pagination cursor"
+
+
+@dataclass(frozen=True)
+class Page(t.Generic[T]):
+    items: t.List[T] = field(default_factory=list)
+    next_cursor: t.Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(values: t.Sequence[t.Any]) -> str:
+    """the key values of the last row, they should be json scalars"""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> t.List[t.Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError(exc) from exc
+    if not isinstance(values, list):
+        raise InvalidCursorError(message=f"invalid pagination cursor: {cursor}")
+    return values
+
+
+def keyset_query(
+    query: sa.Select,
+    keys: KeyColumns,
+    cursor: t.Optional[str] = None,
+    page_size: int = 100,
+    reverse: bool = False,
+) -> sa.Select:
+    """
+    Seek pagination: rows after the cursor in keys order, so the cost of a page
+    does not depend on its depth like OFFSET does. The last key must be unique.
+    The keys are selected with a label, so the cursor can be read from the rows;
+    one more row is fetched to know if there is a next page
+    """
+    labels = [key.label(f"{CURSOR_PREFIX}{index}") for index, key in enumerate(keys)]
+    query = query.add_columns(*labels)
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise InvalidCursorError(message=f"cursor does not match keys: {cursor}")
+        row, bounds = sa.tuple_(*keys), sa.tuple_(*values)
+        query = query.where(row < bounds if reverse else row > bounds)
+
+    order = [key.desc() if reverse else key.asc() for key in keys]
+    return query.order_by(*order).limit(page_size + 1)
+
+
+def make_page(
+    rows: t.Sequence[sa.Row],
+    factory: t.Callable[[sa.Row], T],
+    keys_count: int,
+    page_size: int,
+) -> Page[T]:
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][-keys_count:])
+    return Page(items=[factory(row) for row in rows], next_cursor=next_cursor)
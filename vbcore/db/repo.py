@@ -1,10 +1,35 @@
-from typing import Generator, Generic, NamedTuple, Optional, Sequence, Type, TypeVar
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Generator,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 import sqlalchemy as sa
 from sqlalchemy.sql.compiler import SQLCompiler
 from sqlalchemy.sql.elements import DQLDMLClauseElement
 
 from vbcore.base import BaseDTO
+from vbcore.db.pagination import KeyColumns, keyset_query, make_page, Page
+from vbcore.db.statements import (
+    bind_filters,
+    can_bind_filters,
+    can_bind_values,
+    columns_cache_key,
+    filter_params,
+    STATEMENT_CACHE,
+    StatementCache,
+)
 from vbcore.db.types import (
     ExecParams,
     SqlColumns,
@@ -12,10 +37,16 @@ from vbcore.db.types import (
     SqlWhereClauses,
     TableType,
 )
+from vbcore.db.upsert import UpsertBuilder
+from vbcore.lambdas import chunk_iterator
 
 C = TypeVar("C", bound=BaseDTO)
 D = TypeVar("D", bound=BaseDTO)
 
+DEFAULT_YIELD_PER = 1000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+
 
 class BaseRepo:
     def __init__(self, connection: sa.Connection):
@@ -33,14 +64,31 @@ class BaseRepo:
         return self.connection.execute(statement, parameters=parameters)
 
 
-class QuerierRepo(BaseRepo, Generic[D]):
-    def __init__(self, connection: sa.Connection, dto_class: Type[D]):
-        super().__init__(connection)
-        self.dto_class = dto_class
+class QueryMixin(Generic[D]):
+    """query building and DTO mapping shared by the sync and async querier repos"""
+
+    dto_class: Type[D]
+    statements: ClassVar[StatementCache] = STATEMENT_CACHE
 
     def prepare_query_dto(self, record: sa.Row) -> D:
         # noinspection PyProtectedMember
-        return self.dto_class.from_dict(**record._asdict())
+        return self.dto_factory(record._fields)(record)
+
+    def dto_factory(self, keys: Sequence[str]) -> Callable[[sa.Row], D]:
+        """builds the DTO factory for the result columns, mapping is computed only once"""
+        dto_class = self.dto_class
+        field_names = dto_class.field_names()
+        mapping = tuple((index, key) for index, key in enumerate(keys) if key in field_names)
+
+        def factory(record: sa.Row) -> D:
+            return dto_class(**{key: record[index] for index, key in mapping})
+
+        return factory
+
+    @classmethod
+    def streaming(cls, query: sa.Select, yield_per: int = DEFAULT_YIELD_PER) -> sa.Select:
+        """server side cursor, rows are fetched in batches of yield_per"""
+        return query.execution_options(stream_results=True, yield_per=yield_per)
 
     @classmethod
     def query_builder(
@@ -56,6 +104,79 @@ class QuerierRepo(BaseRepo, Generic[D]):
         stm = stm.filter_by(**kwargs)
         return stm
 
+    def cached_query(
+        self, table: TableType, columns: SqlColumns = (), keys: Sequence[str] = ()
+    ) -> sa.Select:
+        """
+        the query filtered by keys equality with bind parameters, see filter_params,
+        it is not cached if the columns are sql expressions, see columns_cache_key
+        """
+        columns_key = columns_cache_key(columns)
+        if columns_key is None:
+            return self.query_builder(table, columns, bind_filters(table, keys))
+        return self.statements.get(
+            ("select", table, columns_key, tuple(keys)),
+            lambda: self.query_builder(table, columns, bind_filters(table, keys)),
+        )
+
+    def prepare_fetch(
+        self,
+        table: TableType,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        **kwargs,
+    ) -> Tuple[sa.Select, Optional[ExecParams]]:
+        """
+        without clauses the query is taken from the statements cache,
+        clauses hold their own values so the query must be built every time,
+        the same for filters that can not be bound, see can_bind_filters
+        """
+        if clauses or not can_bind_filters(table, kwargs):
+            return self.query_builder(table, columns, clauses, **kwargs), None
+        return self.cached_query(table, columns, tuple(kwargs)), filter_params(kwargs)
+
+
+class MutationMixin:
+    """statements of the mutator repos, cached and executed with bind parameters"""
+
+    table: TableType
+    statements: ClassVar[StatementCache] = STATEMENT_CACHE
+
+    def insert_statement(self) -> sa.Insert:
+        return self.statements.get(("insert", self.table), lambda: sa.insert(self.table))
+
+    def update_statement(self, keys: Sequence[str]) -> sa.Update:
+        """SET clause is given by the keys of the parameters at execution time"""
+        return self.statements.get(
+            ("update", self.table, tuple(keys)),
+            lambda: sa.update(self.table).where(*bind_filters(self.table, keys)),
+        )
+
+    def delete_statement(self, keys: Sequence[str]) -> sa.Delete:
+        return self.statements.get(
+            ("delete", self.table, tuple(keys)),
+            lambda: sa.delete(self.table).where(*bind_filters(self.table, keys)),
+        )
+
+    def prepare_update(
+        self, filters: Mapping[str, Any], values: Mapping[str, Any]
+    ) -> Tuple[sa.Update, Optional[ExecParams]]:
+        """the cached statement is used only with bindable filters and values"""
+        if can_bind_filters(self.table, filters) and can_bind_values(self.table, values):
+            return self.update_statement(tuple(filters)), {**values, **filter_params(filters)}
+        return sa.update(self.table).filter_by(**filters).values(values), None
+
+    def prepare_delete(self, filters: Mapping[str, Any]) -> Tuple[sa.Delete, Optional[ExecParams]]:
+        if can_bind_filters(self.table, filters):
+            return self.delete_statement(tuple(filters)), filter_params(filters)
+        return sa.delete(self.table).filter_by(**filters), None
+
+
+class QuerierRepo(BaseRepo, QueryMixin[D]):
+    def __init__(self, connection: sa.Connection, dto_class: Type[D]):
+        super().__init__(connection)
+        self.dto_class = dto_class
+
     def fetch(
         self,
         table: TableType,
@@ -63,7 +184,8 @@ class QuerierRepo(BaseRepo, Generic[D]):
         clauses: SqlWhereClauses = (),
         **kwargs,
     ) -> Generator[D, None, None]:
-        return self.query(self.query_builder(table, columns, clauses, **kwargs))
+        query, params = self.prepare_fetch(table, columns, clauses, **kwargs)
+        return self.query(query, params=params)
 
     def fetch_one(
         self,
@@ -72,44 +194,116 @@ class QuerierRepo(BaseRepo, Generic[D]):
         clauses: SqlWhereClauses = (),
         **kwargs,
     ) -> D:
+        query, params = self.prepare_fetch(table, columns, clauses, **kwargs)
+        return self.prepare_query_dto(self.execute(query, params).one())
+
+    def fetch_batches(
+        self,
+        table: TableType,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        batch_size: int = DEFAULT_YIELD_PER,
+        **kwargs,
+    ) -> Generator[List[D], None, None]:
         query = self.query_builder(table, columns, clauses, **kwargs)
-        return self.prepare_query_dto(self.execute(query).one())
+        return self.query_batches(query, batch_size)
 
-    def query(self, query: sa.Select) -> Generator[D, None, None]:
-        for record in self.execute(query):
-            yield self.prepare_query_dto(record)
+    def fetch_page(
+        self,
+        table: TableType,
+        keys: KeyColumns,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        reverse: bool = False,
+        **kwargs,
+    ) -> Page[D]:
+        """keyset pagination on keys, the last one must be unique, see keyset_query"""
+        query = self.query_builder(table, columns, clauses, **kwargs)
+        result = self.execute(keyset_query(query, keys, cursor, page_size, reverse))
+        factory = self.dto_factory(tuple(result.keys()))
+        return make_page(result.all(), factory, len(keys), page_size)
+
+    def query(
+        self,
+        query: sa.Select,
+        yield_per: Optional[int] = None,
+        params: Optional[ExecParams] = None,
+    ) -> Generator[D, None, None]:
+        result = self.execute(self.streaming(query, yield_per) if yield_per else query, params)
+        yield from map(self.dto_factory(tuple(result.keys())), result)
+
+    def query_batches(
+        self, query: sa.Select, batch_size: int = DEFAULT_YIELD_PER
+    ) -> Generator[List[D], None, None]:
+        result = self.execute(self.streaming(query, batch_size))
+        factory = self.dto_factory(tuple(result.keys()))
+        for partition in result.partitions():
+            yield [factory(record) for record in partition]
 
 
-class MutatorRepo(BaseRepo, Generic[C]):
+class MutatorRepo(BaseRepo, MutationMixin, Generic[C]):
     def __init__(self, connection: sa.Connection, table: TableType):
         super().__init__(connection)
         self.table = table
 
     def insert(self, data: C) -> NamedTuple:
-        stm = sa.insert(self.table).values(**data.to_dict())
-        cursor = self.execute(stm)
+        cursor = self.execute(self.insert_statement(), data.to_dict())
         return cursor.inserted_primary_key
 
-    def insert_many(self, values: Sequence[C]) -> None:
-        self.execute(
-            sa.insert(self.table),
-            [value.to_dict() for value in values],
-        )
+    def insert_many(self, values: Iterable[C], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """values can be a generator, they are inserted in chunks of batch_size"""
+        count = 0
+        stm = self.insert_statement()
+        for chunk in chunk_iterator(values, batch_size):
+            self.execute(stm, [value.to_dict() for value in chunk])
+            count += len(chunk)
+        return count
+
+    def upsert_many(
+        self,
+        values: Iterable[C],
+        index_elements: Sequence[str] = (),
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """dialect native upsert, see UpsertBuilder"""
+        count = 0
+        builder = UpsertBuilder(self.table, index_elements, update_columns)
+        for chunk in chunk_iterator(values, batch_size):
+            records = [value.to_dict() for value in chunk]
+            stm = builder.build(self.connection.dialect, records[0].keys())
+            self.execute(stm, records)
+            count += len(records)
+        return count
 
     def insert_from_select(self, columns: Sequence[str], query: sa.Selectable) -> None:
         stm = sa.insert(self.table).from_select(columns, query)
         self.execute(stm)
 
     def update(self, *clauses: SqlWhereClause, **values) -> int:
-        stm = sa.update(self.table).where(*clauses).values(values)  # type: ignore
+        stm = sa.update(self.table).where(*clauses).values(values)
         cursor = self.execute(stm)
         return cursor.rowcount
 
+    def update_by(self, filters: Mapping[str, Any], **values) -> int:
+        """like update but filtered by columns equality, the statement is cached"""
+        stm, params = self.prepare_update(filters, values)
+        cursor = self.execute(stm, params)
+        return cursor.rowcount
+
     def delete(self, *clauses: SqlWhereClause) -> int:
         stm = sa.delete(self.table).where(*clauses)
         cursor = self.execute(stm)
         return cursor.rowcount
 
+    def delete_by(self, **filters) -> int:
+        """like delete but filtered by columns equality, the statement is cached"""
+        stm, params = self.prepare_delete(filters)
+        cursor = self.execute(stm, params)
+        return cursor.rowcount
+
 
 class CrudRepo(Generic[C, D]):
     def __init__(self, connection: sa.Connection, dto_class: Type[D], table: TableType):
@@ -124,11 +318,41 @@ class CrudRepo(Generic[C, D]):
     ) -> Generator[D, None, None]:
         return self.querier.fetch(self.mutator.table, columns, clauses, **kwargs)
 
+    def get_batches(
+        self,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        batch_size: int = DEFAULT_YIELD_PER,
+        **kwargs,
+    ) -> Generator[List[D], None, None]:
+        return self.querier.fetch_batches(
+            self.mutator.table, columns, clauses, batch_size=batch_size, **kwargs
+        )
+
+    def get_page(
+        self,
+        keys: KeyColumns,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        **kwargs,
+    ) -> Page[D]:
+        return self.querier.fetch_page(
+            self.mutator.table, keys, columns, clauses, cursor, page_size, **kwargs
+        )
+
     def create(self, data: C) -> NamedTuple:
         return self.mutator.insert(data)
 
     def update(self, *clauses: SqlWhereClause, **values) -> int:
         return self.mutator.update(*clauses, **values)
 
+    def update_by(self, filters: Mapping[str, Any], **values) -> int:
+        return self.mutator.update_by(filters, **values)
+
     def delete(self, *clauses: SqlWhereClause) -> int:
         return self.mutator.delete(*clauses)
+
+    def delete_by(self, **filters) -> int:
+        return self.mutator.delete_by(**filters)
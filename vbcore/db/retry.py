@@ -0,0 +1,187 @@
+import random
+import time
+import typing as t
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from enum import auto
+
+from vbcore.base import Decorator
+from vbcore.enums import LStrEnum
+from vbcore.loggers import VBLoggerMixin
+from vbcore.types import OptStr
+
+from .exceptions import DBConnectionError, DBDeadlock
+from .types import SessionType
+
+TransactionFactory = t.Callable[[], t.ContextManager[SessionType]]
+RetryHook = t.Callable[["RetryEvent"], None]
+
+
+class RetryOutcome(LStrEnum):
+    SUCCESS = auto()
+    RETRY = auto()
+    FAILURE = auto()
+
+
+@dataclass(frozen=True, kw_only=True)
+class RetryParams:
+    max_attempts: int = 5
+    initial_delay: float = 0.05
+    max_delay: float = 2.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    max_elapsed: t.Optional[float] = 30.0
+    retry_on: t.Tuple[t.Type[Exception], ...] = field(default=(DBDeadlock, DBConnectionError))
+
+
+@dataclass(frozen=True, kw_only=True)
+class RetryEvent:
+    outcome: RetryOutcome
+    attempt: int
+    elapsed: float
+    delay: float = 0.0
+    reason: OptStr = None
+    exception: t.Optional[BaseException] = None
+
+
+class RetryAttempt(AbstractContextManager):
+    def __init__(self, retry: "TransactionRetry", attempt: int, started: float):
+        self.retry = retry
+        self.attempt = attempt
+        self.started = started
+        self.succeeded = False
+        self.delay = 0.0
+        self._context: t.Optional[t.ContextManager[SessionType]] = None
+
+    def __enter__(self) -> SessionType:
+        self._context = self.retry.factory()
+        return self._context.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        assert self._context is not None
+        try:
+            self._context.__exit__(exc_type, exc_value, traceback)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # commit or rollback may fail too
+            if not self.handle_error(exc):
+                raise
+            return True
+
+        if exc_value is None:
+            self.succeeded = True
+            self.retry.notify(RetryOutcome.SUCCESS, self.attempt, self.started)
+            return False
+        return self.handle_error(exc_value)
+
+    def handle_error(self, exc: BaseException) -> bool:
+        """returns True if exc is suppressed and the transaction must be retried"""
+        delay = self.retry.next_delay(exc, self.attempt, self.started)
+        if delay is None:
+            self.retry.notify(RetryOutcome.FAILURE, self.attempt, self.started, exc=exc)
+            return False
+
+        self.delay = delay
+        self.retry.notify(RetryOutcome.RETRY, self.attempt, self.started, delay, exc)
+        return True
+
+
+class TransactionRetry(Decorator, VBLoggerMixin):
+    """
+    Retries a transaction on the errors classified as transient by ErrorsHandler
+    (deadlocks and lost connections by default) with exponential backoff and full jitter,
+    until max_attempts or max_elapsed seconds are reached.
+    Every attempt is reported to the hook, the default one logs retries and failures.
+
+    As decorator the session is passed as first argument:
+
+    >>> @TransactionRetry(connector.transaction)  # doctest: +SKIP
+    ... def save(session, record):
+    ...     session.add(record)
+
+    As context manager the body is run once per attempt:
+
+    >>> for attempt in TransactionRetry(connector.transaction):  # doctest: +SKIP
+    ...     with attempt as session:
+    ...         session.add(record)
+    """
+
+    def __init__(
+        self,
+        factory: TransactionFactory,
+        params: t.Optional[RetryParams] = None,
+        hook: t.Optional[RetryHook] = None,
+        sleep: t.Callable[[float], None] = time.sleep,
+        clock: t.Callable[[], float] = time.monotonic,
+    ):
+        self.factory = factory
+        self.params = params or RetryParams()
+        self.hook = hook or self.log_event
+        self.sleep = sleep
+        self.clock = clock
+
+    def __iter__(self) -> t.Generator[RetryAttempt, None, None]:
+        started = self.clock()
+        for attempt in range(1, self.params.max_attempts + 1):
+            context = RetryAttempt(self, attempt, started)
+            yield context
+            if context.succeeded:
+                return
+            self.sleep(context.delay)
+
+    def perform(self, function: t.Callable, *args, **kwargs) -> t.Any:
+        result = None
+        for attempt in self:
+            with attempt as session:
+                result = function(session, *args, **kwargs)
+        return result
+
+    def backoff(self, attempt: int) -> float:
+        delay = self.params.initial_delay * self.params.multiplier ** (attempt - 1)
+        delay = min(delay, self.params.max_delay)
+        return random.uniform(0, delay) if self.params.jitter else delay
+
+    def next_delay(self, exc: BaseException, attempt: int, started: float) -> t.Optional[float]:
+        """returns the time to wait before the next attempt or None if exc must be raised"""
+        if not isinstance(exc, self.params.retry_on) or attempt >= self.params.max_attempts:
+            return None
+
+        delay = self.backoff(attempt)
+        max_elapsed = self.params.max_elapsed
+        if max_elapsed is not None and self.clock() - started + delay > max_elapsed:
+            return None
+        return delay
+
+    def notify(
+        self,
+        outcome: RetryOutcome,
+        attempt: int,
+        started: float,
+        delay: float = 0.0,
+        exc: t.Optional[BaseException] = None,
+    ) -> None:
+        self.hook(
+            RetryEvent(
+                outcome=outcome,
+                attempt=attempt,
+                elapsed=self.clock() - started,
+                delay=delay,
+                reason=exc.__class__.__name__ if exc is not None else None,
+                exception=exc,
+            )
+        )
+
+    def log_event(self, event: RetryEvent) -> None:
+        if event.outcome == RetryOutcome.RETRY:
+            self.log.warning(
+                "transaction failed with %s at attempt %d, retrying in %.3fs",
+                event.reason,
+                event.attempt,
+                event.delay,
+            )
+        elif event.outcome == RetryOutcome.FAILURE and event.attempt > 1:
+            self.log.error(
+                "transaction failed with %s after %d attempts in %.3fs",
+                event.reason,
+                event.attempt,
+                event.elapsed,
+            )
@@ -0,0 +1,214 @@
+import copy
+import itertools
+import threading
+import time
+import typing as t
+import zlib
+from contextlib import contextmanager
+from enum import auto
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from vbcore.enums import LStrEnum
+
+from .events import Listener
+from .sqla import SQLAConnector
+
+
+class RoutingStrategy(LStrEnum):
+    ROUND_ROBIN = auto()
+    LEAST_CONNECTIONS = auto()
+
+
+class ReplicaSet:
+    """
+    Chooses the engine for the next read among the replicas,
+    the checked out connections are counted through the pool events
+    """
+
+    def __init__(
+        self,
+        engines: t.Sequence[sa.Engine],
+        strategy: str = RoutingStrategy.ROUND_ROBIN,
+    ):
+        self.engines = tuple(engines)
+        self.strategy = RoutingStrategy(strategy)
+        self.checked_out = [0] * len(self.engines)
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+
+        for index, engine in enumerate(self.engines):
+            Listener.register_at_checkout(engine, self._counter(index, 1))
+            Listener.register_at_checkin(engine, self._counter(index, -1))
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def _counter(self, index: int, step: int) -> t.Callable:
+        def _count(*_):
+            with self._lock:
+                self.checked_out[index] += step
+
+        return _count
+
+    def choose(self) -> sa.Engine:
+        with self._lock:
+            if self.strategy == RoutingStrategy.LEAST_CONNECTIONS:
+                index = min(range(len(self.engines)), key=self.checked_out.__getitem__)
+            else:
+                index = next(self._cycle)
+        return self.engines[index]
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads to the replicas and everything else to the primary:
+    flushes, DML, locking selects and textual statements.
+    After a write the reads go to the primary until the end of the transaction,
+    and then for sticky_window seconds, to read your own writes despite replication lag
+    """
+
+    def __init__(self, *args, connector: "RoutingConnector", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connector = connector
+        self.last_write: t.Optional[float] = None
+        self.writing = False
+
+    @classmethod
+    def is_read(cls, clause: t.Any) -> bool:
+        # noinspection PyProtectedMember
+        return bool(getattr(clause, "is_select", False)) and (
+            getattr(clause, "_for_update_arg", None) is None
+        )
+
+    def is_sticky(self) -> bool:
+        if self.writing:
+            return True
+        if self.last_write is None:
+            return False
+        return time.monotonic() - self.last_write < self.connector.sticky_window
+
+    def get_bind(self, mapper=None, *, clause=None, **__):  # pylint: disable=unused-argument
+        if self._flushing or not self.is_read(clause):
+            self.writing = True
+            self.last_write = time.monotonic()
+            return self.connector.engine
+        if self.is_sticky():
+            return self.connector.engine
+        return self.connector.reader_engine()
+
+    def commit(self) -> None:
+        super().commit()
+        self.writing = False
+
+    def rollback(self) -> None:
+        super().rollback()
+        self.writing = False
+
+    def close(self) -> None:
+        super().close()
+        self.writing = False
+
+
+class RoutingConnector(SQLAConnector):
+    """
+    Connector with a primary database and N read replicas,
+    replicas take the same options of the primary, see RoutingSession for ORM sessions.
+    The repos take the connection explicitly:
+
+    >>> with connector.connect(readonly=True) as conn:  # doctest: +SKIP
+    ...     records = list(QuerierRepo(conn, UserDTO).fetch(User))
+    """
+
+    def __init__(
+        self,
+        str_conn: str,
+        replicas: t.Sequence[str] = (),
+        strategy: str = RoutingStrategy.ROUND_ROBIN,
+        sticky_window: float = 0.0,
+        **kwargs,
+    ):
+        session_options = kwargs.pop("session_options", None) or {}
+        session_class = kwargs.pop("session_class", RoutingSession)
+        primary_options = copy.deepcopy(session_options)
+        primary_options.setdefault("connector", self)
+        super().__init__(
+            str_conn, session_options=primary_options, session_class=session_class, **kwargs
+        )
+        self.sticky_window = sticky_window
+
+        # the routing options are of the primary, replica sessions are plain sessions
+        replica_options = {
+            k: v for k, v in session_options.items() if k not in ("class_", "connector")
+        }
+        self.replica_connectors = tuple(
+            SQLAConnector(url, session_options=copy.deepcopy(replica_options), **kwargs)
+            for url in replicas
+        )
+        self.replicas = ReplicaSet([c.engine for c in self.replica_connectors], strategy)
+
+    def reader_engine(self) -> sa.Engine:
+        return self.replicas.choose() if self.replicas else self.engine
+
+    def get_session(self, **options):
+        if options:
+            options.setdefault("class_", RoutingSession)
+            options.setdefault("connector", self)
+        return super().get_session(**options)
+
+    @contextmanager
+    def connect(self, readonly: bool = False) -> t.Generator[sa.Connection, None, None]:
+        """core connection to a replica if readonly otherwise to the primary"""
+        engine = self.reader_engine() if readonly else self.engine
+        with engine.connect() as conn:
+            yield conn
+
+
+class ShardedConnector:
+    """
+    Spreads the data across several databases by a stable hash of the shard key,
+    every shard is a connector, so it can be a RoutingConnector too
+    """
+
+    def __init__(self, shards: t.Sequence[SQLAConnector]):
+        self.shards = tuple(shards)
+
+    @classmethod
+    def from_urls(cls, urls: t.Sequence[str], **kwargs) -> "ShardedConnector":
+        return cls([SQLAConnector(url, **kwargs) for url in urls])
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def __iter__(self) -> t.Iterator[SQLAConnector]:
+        return iter(self.shards)
+
+    @classmethod
+    def hash_key(cls, key: t.Any) -> int:
+        """builtin hash is salted per process, crc32 is stable across processes"""
+        return zlib.crc32(str(key).encode())
+
+    def shard_index(self, key: t.Any) -> int:
+        return self.hash_key(key) % len(self.shards)
+
+    def shard(self, key: t.Any) -> SQLAConnector:
+        return self.shards[self.shard_index(key)]
+
+    def create_all(self) -> None:
+        for shard in self.shards:
+            shard.create_all()
+
+    def drop_all(self) -> None:
+        for shard in self.shards:
+            shard.drop_all()
+
+    @contextmanager
+    def connection(self, key: t.Any, **options):
+        with self.shard(key).connection(**options) as session:
+            yield session
+
+    @contextmanager
+    def transaction(self, key: t.Any, **options):
+        with self.shard(key).transaction(**options) as session:
+            yield session
@@ -0,0 +1,178 @@
+import queue
+import threading
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy as sa
+
+from vbcore.batch import PCTask
+from vbcore.db.repo import D, DEFAULT_YIELD_PER, QuerierRepo
+from vbcore.db.statements import resolve_table
+from vbcore.db.types import SqlColumns, SqlWhereClauses, TableType
+
+DEFAULT_SCAN_WORKERS = 4
+PUT_TIMEOUT = 0.1
+
+
+class KeyRange(t.NamedTuple):
+    start: int
+    stop: int  # exclusive
+
+    def clauses(self, key: sa.ColumnElement) -> t.Tuple[sa.ColumnElement[bool], ...]:
+        return key >= self.start, key < self.stop
+
+
+class _Done(t.NamedTuple):
+    partition: KeyRange
+
+
+class RangeScanner(t.Generic[D]):
+    """
+    Reads a table split by ranges of an integer key, by default the primary key,
+    every partition is read on its own connection by a pool of threads.
+    The partitions can be consumed as a generator of batches:
+
+    >>> for batch in RangeScanner(engine, UserDTO, User).scan():  # doctest: +SKIP
+    ...     process(batch)
+
+    or given to a ProducerConsumerBatchExecutor through RangeScanTask
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        engine: sa.Engine,
+        dto_class: t.Type[D],
+        table: TableType,
+        key: t.Optional[str] = None,
+        columns: SqlColumns = (),
+        clauses: SqlWhereClauses = (),
+        workers: int = DEFAULT_SCAN_WORKERS,
+        batch_size: int = DEFAULT_YIELD_PER,
+        queue_size: int = 0,
+    ):
+        """queue_size bounds the batches read ahead of the consumer, 0 means workers * 2"""
+        self.engine = engine
+        self.dto_class = dto_class
+        self.table = table
+        self.key = self.resolve_key(table, key)
+        self.columns = columns
+        self.clauses = clauses
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size or workers * 2
+
+    @classmethod
+    def resolve_key(cls, table: TableType, key: t.Optional[str] = None) -> sa.Column:
+        sa_table = resolve_table(table)
+        if key is not None:
+            return sa_table.c[key]
+
+        primary_key = tuple(sa_table.primary_key.columns)
+        if len(primary_key) != 1:
+            raise ValueError(f"table {sa_table.name} has not a single column primary key")
+        return primary_key[0]
+
+    def key_bounds(self) -> t.Optional[KeyRange]:
+        """the range that covers all the keys, None if the table is empty"""
+        query = sa.select(sa.func.min(self.key), sa.func.max(self.key)).where(*self.clauses)
+        with self.engine.connect() as conn:
+            lower, upper = conn.execute(query).one()
+        if lower is None:
+            return None
+        return KeyRange(lower, upper + 1)
+
+    def partitions(self, count: t.Optional[int] = None) -> t.List[KeyRange]:
+        """
+        splits the key range in count partitions of the same width,
+        so they are balanced only if the keys are evenly distributed
+        """
+        bounds = self.key_bounds()
+        if bounds is None:
+            return []
+
+        count = max(1, min(count or self.workers, bounds.stop - bounds.start))
+        step, rest = divmod(bounds.stop - bounds.start, count)
+        ranges, start = [], bounds.start
+        for index in range(count):
+            stop = start + step + (1 if index < rest else 0)
+            ranges.append(KeyRange(start, stop))
+            start = stop
+        return ranges
+
+    def partition_query(self, partition: KeyRange) -> sa.Select:
+        clauses = (*self.clauses, *partition.clauses(self.key))
+        return QuerierRepo.query_builder(self.table, self.columns, clauses)
+
+    def read_partition(self, partition: KeyRange) -> t.Generator[t.List[D], None, None]:
+        with self.engine.connect() as conn:
+            repo = QuerierRepo[D](conn, self.dto_class)
+            yield from repo.query_batches(self.partition_query(partition), self.batch_size)
+
+    def fetch_partition(self, partition: KeyRange) -> t.List[D]:
+        return [record for batch in self.read_partition(partition) for record in batch]
+
+    def scan(
+        self, partitions: t.Optional[t.Sequence[KeyRange]] = None
+    ) -> t.Generator[t.List[D], None, None]:
+        """
+        batches are yielded as soon as any partition produces them, so the order
+        is not preserved; the first error of a worker is raised by the generator
+        """
+        partitions = self.partitions() if partitions is None else partitions
+        channel = _ScanChannel(self.queue_size)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="range-scan") as executor:
+            for partition in partitions:
+                executor.submit(channel.feed, partition, self.read_partition)
+            try:
+                yield from channel.drain(len(partitions))
+            finally:
+                channel.stopped.set()
+
+
+class _ScanChannel:
+    """bounded queue between the partition readers and the consumer of the scan"""
+
+    def __init__(self, size: int):
+        self.batches: queue.Queue = queue.Queue(size)
+        self.stopped = threading.Event()
+
+    def put(self, item: t.Any) -> bool:
+        """waits for room until the consumer stops the scan, it returns False then"""
+        while not self.stopped.is_set():
+            try:
+                self.batches.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feed(self, partition: KeyRange, reader: t.Callable[[KeyRange], t.Iterable]) -> None:
+        try:
+            for batch in reader(partition):
+                if not self.put(batch):
+                    return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.put(exc)
+        self.put(_Done(partition))
+
+    def drain(self, pending: int) -> t.Generator[t.Any, None, None]:
+        while pending:
+            item = self.batches.get()
+            if isinstance(item, _Done):
+                pending -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+
+class RangeScanTask(PCTask):
+    """producer task that reads a partition, it is performed with a KeyRange"""
+
+    def __init__(self, scanner: RangeScanner, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scanner = scanner
+
+    def perform(self, item: KeyRange) -> t.List:
+        return self.scanner.fetch_partition(item)
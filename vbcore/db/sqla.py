@@ -6,21 +6,26 @@ import sqlalchemy as sa
 from sqlalchemy.orm import scoped_session, Session, sessionmaker
 
 from ..loggers import VBLoggerMixin
-from ..types import OptDict
+from ..types import OptDict, OptFloat, OptInt
 from .events import ErrorsHandler, Listener
+from .metrics import PoolMetrics, SlowQueryLogger
+from .retry import RetryHook, RetryParams, TransactionRetry
+from .statements import CompiledCache, DEFAULT_COMPILED_CACHE_SIZE
 from .types import SessionType
 from .views import DDLViewCompiler
 
 if t.TYPE_CHECKING:
     from .base import LoadersType
 
+LoaderListeners = t.List[t.Tuple[sa.Table, t.Callable]]
+
 
 class SQLAConnector(VBLoggerMixin):
     metadata = sa.MetaData()
     views_metadata = sa.MetaData()
     session_class = scoped_session
 
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments,too-many-locals
     def __init__(
         self,
         str_conn: str,
@@ -35,8 +40,20 @@ class SQLAConnector(VBLoggerMixin):
         autocommit: bool = False,
         expire_on_commit: bool = True,
         custom_handlers: bool = True,
+        max_overflow: OptInt = None,
+        pool_recycle: OptInt = None,
+        pool_timeout: OptFloat = None,
+        pool_use_lifo: bool = False,
+        pool_metrics: bool = False,
+        slow_query_threshold: OptFloat = None,
+        cache_stats: bool = False,
         **kwargs,
     ):
+        """
+        max_overflow, pool_timeout and pool_use_lifo are passed only if set,
+        because they are supported only by QueuePool;
+        if cache_stats the hits of the compiled cache are counted, see compiled_cache
+        """
         self._session_options = session_options or {}
         self._session_options.setdefault("class_", session_class)
         self._session_options.setdefault("autoflush", autoflush)
@@ -46,6 +63,20 @@ class SQLAConnector(VBLoggerMixin):
 
         self._fix_loggers(echo)
 
+        pool_options = {
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "pool_timeout": pool_timeout,
+            "pool_use_lifo": pool_use_lifo or None,
+        }
+        kwargs.update({k: v for k, v in pool_options.items() if v is not None})
+
+        self.compiled_cache: t.Optional[CompiledCache] = None
+        if cache_stats:
+            cache_size = kwargs.get("query_cache_size", DEFAULT_COMPILED_CACHE_SIZE)
+            self.compiled_cache = CompiledCache(cache_size)
+            execution_options = {**(execution_options or {}), "compiled_cache": self.compiled_cache}
+
         self.engine = sa.create_engine(
             url=str_conn,
             echo=echo,
@@ -59,6 +90,16 @@ class SQLAConnector(VBLoggerMixin):
         if custom_handlers:
             self.register_custom_handlers()
 
+        self.pool_metrics: t.Optional[PoolMetrics] = None
+        if pool_metrics:
+            self.pool_metrics = PoolMetrics()
+            self.pool_metrics.register(self.engine)
+
+        self.slow_query_logger: t.Optional[SlowQueryLogger] = None
+        if slow_query_threshold is not None:
+            self.slow_query_logger = SlowQueryLogger(slow_query_threshold)
+            self.slow_query_logger.register(self.engine)
+
     def register_custom_handlers(self):
         ErrorsHandler.register(self.engine)
         DDLViewCompiler().register()
@@ -70,16 +111,34 @@ class SQLAConnector(VBLoggerMixin):
             self.logger("sqlalchemy.engine.Engine").handlers.clear()
 
     @classmethod
-    def register_loaders(cls, session: SessionType, loaders: "LoadersType") -> None:
+    def register_loaders(cls, session: SessionType, loaders: "LoadersType") -> LoaderListeners:
+        listeners: LoaderListeners = []
         for loader in loaders:
             callback = partial(loader.load_values, session)
             Listener.register_after_create(loader.__table__, callback)
+            listeners.append((loader.__table__, callback))
+        return listeners
+
+    @classmethod
+    def unregister_loaders(cls, listeners: LoaderListeners) -> None:
+        """
+        the listeners hold the session, so they must not outlive the create_all,
+        otherwise they are fired when the table is created on another database
+        """
+        for table, callback in listeners:
+            Listener.unregister_after_create(table, callback)
 
     def create_all(self, loaders: "LoadersType" = ()) -> None:
-        if loaders:
-            with self.connection() as session:
-                self.register_loaders(session, loaders)
-        self.metadata.create_all(self.engine)
+        if not loaders:
+            self.metadata.create_all(self.engine)
+            return
+
+        with self.connection() as session:
+            listeners = self.register_loaders(session, loaders)
+            try:
+                self.metadata.create_all(self.engine)
+            finally:
+                self.unregister_loaders(listeners)
 
     def drop_all(self) -> None:
         self.metadata.drop_all(self.engine)
@@ -108,3 +167,15 @@ class SQLAConnector(VBLoggerMixin):
             except Exception:
                 conn.rollback()
                 raise
+
+    def retrying(
+        self,
+        params: t.Optional[RetryParams] = None,
+        hook: t.Optional[RetryHook] = None,
+        **options,
+    ) -> TransactionRetry:
+        """
+        Returns a transaction that is retried on deadlocks and lost connections,
+        it can be used as decorator or iterated as context manager, see TransactionRetry
+        """
+        return TransactionRetry(partial(self.transaction, **options), params=params, hook=hook)
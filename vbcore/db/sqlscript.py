@@ -0,0 +1,271 @@
+import re
+import time
+import typing as t
+from dataclasses import dataclass
+from enum import auto
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from vbcore.enums import LStrEnum
+from vbcore.loggers import VBLoggerMixin
+
+DEFAULT_DELIMITER = ";"
+DEFAULT_TRANSACTION_SIZE = 1000
+DEFAULT_INSERT_ROWS = 500
+
+QUOTES = ("'", '"', "`", "$$")
+KEEP_COMMENTS = ("/*!", "/*+")  # mysql conditional code and optimizer hints
+
+DELIMITER_COMMAND = re.compile(r"^\s*DELIMITER\s+(\S+)\s*$", re.IGNORECASE)
+INSERT_VALUES = re.compile(
+    r"^(INSERT\s+INTO\s+.+?\s+VALUES)\s*(\(.*\))$", re.IGNORECASE | re.DOTALL
+)
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'", re.DOTALL)
+_ROW = r"\((?:[^()]|\([^()]*\))*\)"
+VALUES_LIST = re.compile(rf"{_ROW}(?:\s*,\s*{_ROW})*")
+
+
+class SplitterState(LStrEnum):
+    CODE = auto()
+    QUOTED = auto()
+    COMMENT = auto()
+
+
+@lru_cache(maxsize=16)
+def code_tokens(delimiter: str, hash_comments: bool) -> t.Pattern:
+    tokens = [*QUOTES, "--", "/*", delimiter]
+    if hash_comments:
+        tokens.append("#")
+    tokens.sort(key=len, reverse=True)
+    return re.compile("|".join(re.escape(token) for token in tokens))
+
+
+@lru_cache(maxsize=8)
+def quote_end(quote: str, backslash_escapes: bool) -> t.Pattern:
+    if backslash_escapes and quote != "$$":
+        return re.compile(rf"\\.|{re.escape(quote)}", re.DOTALL)
+    return re.compile(re.escape(quote))
+
+
+class SqlSplitter:
+    """
+    Splits a sql script into statements reading it line by line,
+    delimiters inside quotes and comments are ignored, comments are removed
+    except the executable ones of mysql (/*! ... */ and /*+ ... */).
+    The mysql client command DELIMITER changes the delimiter, e.g. for procedures.
+    Backslash escapes in quotes and # comments are mysql only, so they are optional
+    """
+
+    def __init__(
+        self,
+        delimiter: str = DEFAULT_DELIMITER,
+        backslash_escapes: bool = False,
+        hash_comments: bool = False,
+    ):
+        self.delimiter = delimiter
+        self.backslash_escapes = backslash_escapes
+        self.hash_comments = hash_comments
+        self.state = SplitterState.CODE
+        self.quote = ""
+        self.keep_comment = False
+        self.buffer: t.List[str] = []
+        self.has_code = False
+
+    def reset(self) -> None:
+        self.state = SplitterState.CODE
+        self.buffer = []
+        self.has_code = False
+
+    def append(self, text: str) -> None:
+        """has_code tells if the pending statement is blank without joining the buffer"""
+        self.buffer.append(text)
+        if not self.has_code and text and not text.isspace():
+            self.has_code = True
+
+    def split(self, lines: t.Iterable[str]) -> t.Generator[str, None, None]:
+        for line in lines:
+            yield from self.feed(line)
+        yield from self.flush()
+
+    def flush(self) -> t.Generator[str, None, None]:
+        """the last statement may not be terminated by the delimiter"""
+        statement = self.take_statement()
+        self.reset()
+        if statement:
+            yield statement
+
+    def take_statement(self) -> str:
+        statement = "".join(self.buffer).strip() if self.has_code else ""
+        self.buffer = []
+        self.has_code = False
+        return statement
+
+    def feed(self, line: str) -> t.Generator[str, None, None]:
+        if self.state == SplitterState.CODE and not self.has_code:
+            match = DELIMITER_COMMAND.match(line)
+            if match:
+                self.delimiter = match.group(1)
+                return
+
+        pos = 0
+        while pos < len(line):
+            if self.state == SplitterState.QUOTED:
+                pos = self.consume_quoted(line, pos)
+            elif self.state == SplitterState.COMMENT:
+                pos = self.consume_comment(line, pos)
+            else:
+                pos, statement = self.consume_code(line, pos)
+                if statement:
+                    yield statement
+
+    def consume_code(self, line: str, pos: int) -> t.Tuple[int, t.Optional[str]]:
+        """returns the position after the first token and the statement it terminates"""
+        match = code_tokens(self.delimiter, self.hash_comments).search(line, pos)
+        if match is None:
+            self.append(line[pos:])
+            return len(line), None
+
+        self.append(line[pos : match.start()])
+        token, pos = match.group(), match.end()
+        if token == self.delimiter:
+            return pos, self.take_statement()
+
+        if token in QUOTES:
+            self.state, self.quote = SplitterState.QUOTED, token
+            self.append(token)
+        elif token == "/*":
+            self.state = SplitterState.COMMENT
+            self.keep_comment = line.startswith(KEEP_COMMENTS, match.start())
+            if self.keep_comment:
+                self.append(token)
+        else:  # line comment, only the newline is kept
+            self.append("\n")
+            return len(line), None
+        return pos, None
+
+    def consume_quoted(self, line: str, pos: int) -> int:
+        pattern = quote_end(self.quote, self.backslash_escapes)
+        while True:
+            match = pattern.search(line, pos)
+            if match is None:
+                self.append(line[pos:])
+                return len(line)
+            self.append(line[pos : match.end()])
+            pos = match.end()
+            if match.group() == self.quote:
+                self.state = SplitterState.CODE
+                return pos
+
+    def consume_comment(self, line: str, pos: int) -> int:
+        end = line.find("*/", pos)
+        if end < 0:
+            if self.keep_comment:
+                self.append(line[pos:])
+            return len(line)
+
+        self.append(line[pos : end + 2] if self.keep_comment else " ")
+        self.state = SplitterState.CODE
+        return end + 2
+
+
+def is_values_list(text: str) -> bool:
+    """
+    only rows are allowed after VALUES, e.g. not ON DUPLICATE KEY or RETURNING;
+    string literals are removed first, rows with deeply nested expressions are rejected
+    """
+    return VALUES_LIST.fullmatch(STRING_LITERAL.sub("''", text)) is not None
+
+
+def merge_inserts(
+    statements: t.Iterable[str], max_rows: int = DEFAULT_INSERT_ROWS
+) -> t.Generator[str, None, None]:
+    """
+    Consecutive INSERT ... VALUES (...) statements with the same head are merged in
+    a multi row insert of up to max_rows statements: the statements of a script carry
+    their values as literals, so this is the textual equivalent of executemany
+    """
+    head: t.Optional[str] = None
+    values: t.List[str] = []
+
+    def merged() -> str:
+        return f"{head} {', '.join(values)}"
+
+    for statement in statements:
+        match = INSERT_VALUES.match(statement)
+        if match and not is_values_list(match.group(2)):
+            match = None
+        if match and match.group(1) == head and len(values) < max_rows:
+            values.append(match.group(2))
+            continue
+
+        if head is not None:
+            yield merged()
+            head, values = None, []
+        if match:
+            head, values = match.group(1), [match.group(2)]
+        else:
+            yield statement
+
+    if head is not None:
+        yield merged()
+
+
+@dataclass(frozen=True)
+class ScriptProgress:
+    statements: int
+    transactions: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        return self.statements / self.elapsed if self.elapsed else 0.0
+
+
+class SqlScriptRunner(VBLoggerMixin):
+    """
+    Executes the statements of a script on a connection, committing every
+    transaction_size statements; after every commit the progress is reported
+    """
+
+    def __init__(
+        self,
+        transaction_size: int = DEFAULT_TRANSACTION_SIZE,
+        insert_rows: int = 0,
+        progress: t.Optional[t.Callable[[ScriptProgress], None]] = None,
+    ):
+        """insert_rows > 0 enables the merge of the inserts, see merge_inserts"""
+        self.transaction_size = transaction_size
+        self.insert_rows = insert_rows
+        self.progress = progress or self.log_progress
+
+    def log_progress(self, progress: ScriptProgress) -> None:
+        self.log.info(
+            "executed %d statements in %d transactions (%.3f seconds)",
+            progress.statements,
+            progress.transactions,
+            progress.elapsed,
+        )
+
+    def run(self, conn: sa.Connection, statements: t.Iterable[str]) -> ScriptProgress:
+        if self.insert_rows > 0:
+            statements = merge_inserts(statements, self.insert_rows)
+
+        start = time.monotonic()
+        count, transactions, pending = 0, 0, 0
+        progress = ScriptProgress(0, 0, 0.0)
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+            count, pending = count + 1, pending + 1
+            if pending >= self.transaction_size:
+                conn.commit()
+                transactions, pending = transactions + 1, 0
+                progress = ScriptProgress(count, transactions, time.monotonic() - start)
+                self.progress(progress)
+
+        if pending or not transactions:
+            conn.commit()
+            transactions += 1
+            progress = ScriptProgress(count, transactions, time.monotonic() - start)
+            self.progress(progress)
+        return progress
@@ -0,0 +1,140 @@
+import threading
+import typing as t
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy.orm import QueryableAttribute
+from sqlalchemy.util import LRUCache
+
+from vbcore.db.types import SqlColumns, TableType
+
+DEFAULT_STATEMENT_CACHE_SIZE = 1000
+DEFAULT_COMPILED_CACHE_SIZE = 500  # the same of sqlalchemy query_cache_size
+FILTER_PREFIX = "filter_"
+
+S = t.TypeVar("S", bound=sa.Executable)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def resolve_table(table: TableType) -> sa.Table:
+    return table if isinstance(table, sa.Table) else table.__table__
+
+
+def filter_param(key: str) -> str:
+    """bind parameter names must not clash with the column names of the SET clause"""
+    return f"{FILTER_PREFIX}{key}"
+
+
+def filter_params(filters: t.Mapping[str, t.Any]) -> t.Dict[str, t.Any]:
+    return {filter_param(key): value for key, value in filters.items()}
+
+
+def can_bind_filters(table: TableType, filters: t.Mapping[str, t.Any]) -> bool:
+    """
+    None needs IS NULL and filter_by resolves the ORM attribute names,
+    so only plain values of real columns can be bound to a cached statement
+    """
+    columns = resolve_table(table).c
+    return all(value is not None and key in columns for key, value in filters.items())
+
+
+def can_bind_values(table: TableType, values: t.Mapping[str, t.Any]) -> bool:
+    """sql expressions, e.g. Thing.count + 1, can not be execution parameters"""
+    columns = resolve_table(table).c
+    return all(
+        key in columns and not isinstance(value, sa.ClauseElement) for key, value in values.items()
+    )
+
+
+def columns_cache_key(columns: SqlColumns) -> t.Optional[t.Tuple[t.Any, ...]]:
+    """
+    labels and functions are new objects at every call, so they would never hit
+    the cache, only mapped attributes, table columns and entities have a stable key
+    """
+    key: t.List[t.Any] = []
+    for column in columns:
+        if isinstance(column, QueryableAttribute):
+            key.append((column.class_, column.key))
+        elif isinstance(column, sa.Column):
+            key.append((column.table, column.key))
+        elif isinstance(column, (sa.Table, type)):
+            key.append(column)
+        else:
+            return None
+    return tuple(key)
+
+
+def bind_filters(table: TableType, keys: t.Iterable[str]) -> t.List[sa.ColumnElement[bool]]:
+    columns = resolve_table(table).c
+    return [columns[key] == sa.bindparam(filter_param(key)) for key in keys]
+
+
+class StatementCache:
+    """
+    Statements are built once per shape, e.g. (kind, table, columns, filter keys),
+    and executed with bind parameters, so building the construct and computing its
+    cache key is paid only once, then sqlalchemy finds the compiled form in its cache
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_STATEMENT_CACHE_SIZE):
+        self._cache: LRUCache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, key: t.Hashable, factory: t.Callable[[], S]) -> S:
+        statement = self._cache.get(key)
+        if statement is not None:
+            self.hits += 1
+            return statement
+
+        with self._lock:
+            self.misses += 1
+            return self._cache.setdefault(key, factory())
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits, self.misses = 0, 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, len(self._cache))
+
+
+class CompiledCache(LRUCache):
+    """
+    sqlalchemy compiled cache that counts hits and misses,
+    it is given to the engine through the compiled_cache execution option
+    """
+
+    def __init__(self, capacity: int = DEFAULT_COMPILED_CACHE_SIZE, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        if value is default:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, len(self))
+
+
+STATEMENT_CACHE = StatementCache()
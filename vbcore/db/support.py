@@ -1,17 +1,27 @@
 import typing as t
 
-from sqlalchemy import create_engine, inspect, tuple_
+from sqlalchemy import create_engine, Engine, inspect, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Query, Session
 from sqlalchemy.orm.exc import NoResultFound as NoResultError
-from sqlalchemy.sql import text as text_sql
 
 from vbcore.db.base import Model
+from vbcore.db.sqlscript import (
+    DEFAULT_DELIMITER,
+    DEFAULT_TRANSACTION_SIZE,
+    ScriptProgress,
+    SqlScriptRunner,
+    SqlSplitter,
+)
+from vbcore.db.upsert import UpsertBuilder
 from vbcore.files import FileHandler
+from vbcore.lambdas import chunk_iterator
 from vbcore.types import StrTuple
 
 SynchronizeSessionArgument = t.Literal[False, "auto", "evaluate", "fetch"]
 
+DEFAULT_BATCH_SIZE = 1000
+
 
 class SQLASupport:
     def __init__(self, model: t.Type[Model], session: Session, commit: bool = True):
@@ -119,6 +129,15 @@ class SQLASupport:
             for pk_item in inspect(self.model).primary_key  # type: ignore
         )
 
+    def record_values(self, record: Model) -> dict:
+        """column values of the record, only the loaded or assigned attributes are taken"""
+        values = inspect(record).dict  # type: ignore
+        return {
+            prop.columns[0].key: values[prop.key]
+            for prop in inspect(self.model).column_attrs  # type: ignore
+            if prop.key in values
+        }
+
     def bulk_upsert(self, records: t.Iterable[Model]) -> None:
         entities = {self.get_primary_key(record): record for record in records}
 
@@ -131,20 +150,60 @@ class SQLASupport:
         if self._commit:
             self.session.commit()
 
+    def native_upsert(
+        self, records: t.Iterable[Model], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        """
+        Uses the dialect native upsert (see UpsertBuilder) executed in chunks.
+        Unlike bulk_upsert the records are not added to the session and only the
+        columns set on them are updated on the existing rows, for the dialects
+        not supported by UpsertBuilder bulk_upsert is used
+        """
+        dialect = self.session.get_bind().dialect
+        if not UpsertBuilder.supports(dialect):
+            self.bulk_upsert(records)
+            return
+
+        builder = UpsertBuilder(self.model)
+        for chunk in chunk_iterator(records, batch_size):
+            entities = {self.get_primary_key(record): record for record in chunk}
+            groups: t.Dict[t.Tuple[str, ...], t.List[dict]] = {}
+            for record in entities.values():
+                values = self.record_values(record)
+                groups.setdefault(tuple(values.keys()), []).append(values)
+            for columns, rows in groups.items():
+                self.session.execute(builder.build(dialect, columns), rows)
+
+        if self._commit:
+            self.session.commit()
+
     @classmethod
-    def exec_from_file(
+    def exec_from_file(  # pylint: disable=too-many-locals
         cls,
-        url: str,
+        url: t.Union[str, Engine],
         filename: str,
         echo: bool = False,
         separator: str = ";\n",
         skip_line_prefixes: StrTuple = ("--",),
-    ) -> None:
-        engine = create_engine(url, echo=echo)
-        with engine.connect() as conn, FileHandler().open(filename) as f:
-            for statement in f.read().split(separator):
-                for prefix in skip_line_prefixes:
-                    if statement.startswith(prefix):
-                        break
-                else:
-                    conn.execute(text_sql(statement))
+        transaction_size: int = DEFAULT_TRANSACTION_SIZE,
+        insert_rows: int = 0,
+        progress: t.Optional[t.Callable[[ScriptProgress], None]] = None,
+        **kwargs,
+    ) -> ScriptProgress:
+        """
+        The file is read line by line and split in statements by SqlSplitter,
+        kwargs are given to it; separator is stripped to get its delimiter and
+        the lines starting with skip_line_prefixes are dropped before splitting.
+        A new engine is created only if url is a string.
+        See SqlScriptRunner for transaction_size, insert_rows and progress
+        """
+        engine = create_engine(url, echo=echo) if isinstance(url, str) else url
+        splitter = SqlSplitter(separator.strip() or DEFAULT_DELIMITER, **kwargs)
+        runner = SqlScriptRunner(transaction_size, insert_rows, progress)
+        try:
+            with engine.connect() as conn, FileHandler().open(filename) as f:
+                lines = (line for line in f if not line.startswith(skip_line_prefixes))
+                return runner.run(conn, splitter.split(lines))
+        finally:
+            if engine is not url:
+                engine.dispose()
@@ -1,4 +1,4 @@
-from typing import Any, List, Mapping, Sequence, Type, TYPE_CHECKING, Union
+from typing import Any, Mapping, Sequence, Type, TYPE_CHECKING, Union
 
 from sqlalchemy import Table
 from sqlalchemy.orm import scoped_session, Session
@@ -15,5 +15,5 @@ TableType = Union[Table, Type[Model]]
 # pytest: disable=unsubscriptable-object
 SqlWhereClause = ColumnExpressionArgument[bool]
 SqlWhereClauses = Sequence[SqlWhereClause]
-ExecParams = Union[List[Mapping[str, Any]], Mapping[str, Any]]
+ExecParams = Union[Sequence[Mapping[str, Any]], Mapping[str, Any]]
 SessionType = Union[scoped_session, Session]
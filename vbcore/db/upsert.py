@@ -0,0 +1,69 @@
+import typing as t
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from vbcore.db.exceptions import DBNotSupportedError
+from vbcore.db.types import TableType
+
+InsertFactory = t.Callable[[sa.Table], t.Any]
+
+
+class UpsertBuilder:
+    """
+    Builds dialect native upsert statements:
+        - INSERT ... ON CONFLICT DO UPDATE for postgresql and sqlite
+        - INSERT ... ON DUPLICATE KEY UPDATE for mysql and mariadb
+
+    index_elements defaults to the primary key (ignored by mysql that uses every
+    unique key), update_columns defaults to every inserted column not in index_elements,
+    if there is nothing to update conflicting rows are skipped
+    """
+
+    dialects: t.ClassVar[t.Dict[str, InsertFactory]] = {
+        "postgresql": postgresql.insert,
+        "sqlite": sqlite.insert,
+        "mysql": mysql.insert,
+        "mariadb": mysql.insert,
+    }
+
+    def __init__(
+        self,
+        table: TableType,
+        index_elements: t.Sequence[str] = (),
+        update_columns: t.Optional[t.Sequence[str]] = None,
+    ):
+        self.table: sa.Table = table if isinstance(table, sa.Table) else table.__table__
+        self.index_elements = tuple(index_elements) or tuple(
+            c.name for c in self.table.primary_key.columns
+        )
+        self.update_columns = update_columns
+
+    @classmethod
+    def supports(cls, dialect: sa.Dialect) -> bool:
+        return dialect.name in cls.dialects
+
+    def columns_to_update(self, columns: t.Iterable[str]) -> t.List[str]:
+        if self.update_columns is not None:
+            return list(self.update_columns)
+        return [c for c in columns if c not in self.index_elements]
+
+    def build(self, dialect: sa.Dialect, columns: t.Iterable[str] = ()) -> sa.Insert:
+        """columns are the inserted ones, used to compute the columns to update"""
+        factory = self.dialects.get(dialect.name)
+        if factory is None:
+            raise DBNotSupportedError(message=f"upsert not supported for dialect: {dialect.name}")
+
+        stm = factory(self.table)
+        to_update = self.columns_to_update(columns)
+        if dialect.name in ("mysql", "mariadb"):
+            if not to_update:
+                return stm.prefix_with("IGNORE")
+            return stm.on_duplicate_key_update({c: stm.inserted[c] for c in to_update})
+
+        if not to_update:
+            return stm.on_conflict_do_nothing(index_elements=self.index_elements)
+        return stm.on_conflict_do_update(
+            index_elements=self.index_elements,
+            set_={c: stm.excluded[c] for c in to_update},
+        )
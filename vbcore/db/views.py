@@ -1,5 +1,6 @@
-from typing import Optional, Type
+from typing import ClassVar, Dict, List, Optional, Type, Union
 
+import sqlalchemy as sa
 from sqlalchemy import MetaData
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.schema import DDLElement
@@ -7,7 +8,9 @@ from sqlalchemy.sql import Select
 from sqlalchemy.sql.compiler import SQLCompiler
 
 from vbcore.db.listener import Listener
-from vbcore.types import OptStr
+from vbcore.types import OptStr, StrTuple
+
+NATIVE_MATERIALIZED_VIEWS = ("postgresql",)
 
 
 # pylint: disable=too-many-ancestors, abstract-method
@@ -52,6 +55,90 @@ class DDLCreateView(DDLView):
         Listener.register_after_create(metadata, self)
 
 
+class DDLDropMaterializedView(DDLDropView):
+    pass
+
+
+class DDLRefreshMaterializedView(DDLView):
+    def __init__(self, name: str, schema: OptStr = None, concurrently: bool = False):
+        super().__init__(name, schema)
+        self.concurrently = concurrently
+
+
+class DDLCreateMaterializedView(DDLCreateView):
+    """
+    Native materialized view on postgresql, on the other dialects it is emulated
+    by a snapshot table created from the select and refreshed by INSERT ... SELECT.
+    unique_key creates a unique index, required by postgresql to refresh concurrently.
+    The views created with a metadata are registered by name,
+    so refresh_materialized_views can be scheduled
+    """
+
+    registry: ClassVar[Dict[str, "DDLCreateMaterializedView"]] = {}
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        name: str,
+        select: Select,
+        schema: OptStr = None,
+        metadata: Optional[MetaData] = None,
+        drop_class: Type[DDLDropView] = DDLDropMaterializedView,
+        with_data: bool = True,
+        unique_key: StrTuple = (),
+    ):
+        self.with_data = with_data
+        self.unique_key = unique_key
+        super().__init__(name, select, schema, metadata, drop_class)
+
+    def register_listeners(self, metadata: MetaData):
+        super().register_listeners(metadata)
+        self.registry[self.view_name] = self
+        if self.unique_key:
+            columns = ", ".join(self.unique_key)
+            index = sa.DDL(f"CREATE UNIQUE INDEX uq_{self.name} ON {self.view_name} ({columns})")
+            Listener.register_after_create(metadata, index)
+
+    def snapshot_table(self) -> sa.TableClause:
+        columns: List[sa.ColumnClause] = [sa.column(c.name) for c in self.select.selected_columns]
+        return sa.table(self.name, *columns, schema=self.schema)
+
+    def refresh(self, connection: sa.Connection, concurrently: bool = False) -> None:
+        """
+        concurrently is supported only by postgresql, the snapshot tables are
+        refreshed in the transaction of the connection, so readers never see them empty
+        """
+        if connection.dialect.name in NATIVE_MATERIALIZED_VIEWS:
+            connection.execute(DDLRefreshMaterializedView(self.name, self.schema, concurrently))
+            return
+
+        table = self.snapshot_table()
+        connection.execute(sa.delete(table))
+        connection.execute(sa.insert(table).from_select(list(table.c.keys()), self.select))
+
+
+def refresh_materialized_views(
+    bind: Union[str, sa.Engine], *names: str, concurrently: bool = False
+) -> None:
+    """
+    refreshes the given views, all the registered ones if no name is given,
+    every view in its own transaction; it can be scheduled as a job, e.g.:
+
+    >>> scheduler.add_job(  # doctest: +SKIP
+    ...     refresh_materialized_views, engine, "report", trigger="interval", minutes=10
+    ... )
+    """
+    engine = sa.create_engine(bind) if isinstance(bind, str) else bind
+    registry = DDLCreateMaterializedView.registry
+    try:
+        for name in names or tuple(registry):
+            with engine.begin() as conn:
+                registry[name].refresh(conn, concurrently)
+    finally:
+        if engine is not bind:
+            engine.dispose()
+
+
 class DDLViewCompiler:
     def __init__(
         self,
@@ -70,6 +157,44 @@ class DDLViewCompiler:
     def drop_view(cls, element: DDLDropView, _: SQLCompiler, **__) -> str:
         return f"DROP VIEW IF EXISTS {element.view_name}"
 
+    @classmethod
+    def create_snapshot(
+        cls, element: DDLCreateMaterializedView, compiler: SQLCompiler, **__
+    ) -> str:
+        query = compiler.sql_compiler.process(element.select, literal_binds=True)
+        if not element.with_data:
+            query = f"SELECT * FROM ({query}) AS snapshot WHERE 1 = 0"
+        return f"CREATE TABLE {element.view_name} AS {query}"
+
+    @classmethod
+    def drop_snapshot(cls, element: DDLDropMaterializedView, _: SQLCompiler, **__) -> str:
+        return f"DROP TABLE IF EXISTS {element.view_name}"
+
+    @classmethod
+    def create_materialized_view(
+        cls, element: DDLCreateMaterializedView, compiler: SQLCompiler, **__
+    ) -> str:
+        query = compiler.sql_compiler.process(element.select, literal_binds=True)
+        with_data = "" if element.with_data else " WITH NO DATA"
+        return f"CREATE MATERIALIZED VIEW {element.view_name} AS {query}{with_data}"
+
+    @classmethod
+    def drop_materialized_view(cls, element: DDLDropMaterializedView, _: SQLCompiler, **__) -> str:
+        return f"DROP MATERIALIZED VIEW IF EXISTS {element.view_name}"
+
+    @classmethod
+    def refresh_materialized_view(
+        cls, element: DDLRefreshMaterializedView, _: SQLCompiler, **__
+    ) -> str:
+        concurrently = " CONCURRENTLY" if element.concurrently else ""
+        return f"REFRESH MATERIALIZED VIEW{concurrently} {element.view_name}"
+
     def register(self) -> None:
         compiles(self.create_class)(self.create_view)
         compiles(self.drop_class)(self.drop_view)
+        compiles(DDLCreateMaterializedView)(self.create_snapshot)
+        compiles(DDLDropMaterializedView)(self.drop_snapshot)
+        for dialect in NATIVE_MATERIALIZED_VIEWS:
+            compiles(DDLCreateMaterializedView, dialect)(self.create_materialized_view)
+            compiles(DDLDropMaterializedView, dialect)(self.drop_materialized_view)
+            compiles(DDLRefreshMaterializedView, dialect)(self.refresh_materialized_view)
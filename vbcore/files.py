@@ -1,19 +1,68 @@
+import bz2
+import gzip
+import io
+import lzma
 import os
+import re
 import tempfile
 import typing as t
 from dataclasses import dataclass
+from enum import auto
 
 from vbcore.datastruct.lazy import LazyImporter
+from vbcore.enums import LStrEnum
 from vbcore.exceptions import VBException
-from vbcore.types import OptStr
+from vbcore.types import OptInt, OptStr
 
 Detector = LazyImporter.do_import(
     "chardet:UniversalDetector",
     message="'chardet' required, install it!",
 )
+ZstdOpen = LazyImporter.do_import(
+    "zstandard:open",
+    message="'zstandard' required, install it!",
+)
 
 FileNameType = t.Union[int, str, bytes, os.PathLike[str], os.PathLike[bytes]]
 
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+
+class Compression(LStrEnum):
+    AUTO = auto()
+    NONE = auto()
+    GZIP = auto()
+    BZ2 = auto()
+    XZ = auto()
+    ZSTD = auto()
+
+
+COMPRESSION_OPENERS: t.Dict[Compression, t.Callable[..., t.IO]] = {
+    Compression.GZIP: gzip.open,
+    Compression.BZ2: bz2.open,
+    Compression.XZ: lzma.open,
+    Compression.ZSTD: ZstdOpen,
+}
+
+# bzip2 magic is printable, so the level and the block (or end of stream) magic are matched too
+COMPRESSION_MAGIC: t.Dict[t.Pattern[bytes], Compression] = {
+    re.compile(re.escape(b"\x1f\x8b")): Compression.GZIP,
+    re.compile(rb"BZh[1-9](?:1AY&SY|\x17rE8P\x90)"): Compression.BZ2,
+    re.compile(re.escape(b"\xfd7zXZ\x00")): Compression.XZ,
+    re.compile(re.escape(b"\x28\xb5\x2f\xfd")): Compression.ZSTD,
+}
+MAGIC_SIZE = 10
+
+COMPRESSION_EXTENSIONS: t.Dict[str, Compression] = {
+    ".gz": Compression.GZIP,
+    ".gzip": Compression.GZIP,
+    ".bz2": Compression.BZ2,
+    ".xz": Compression.XZ,
+    ".zst": Compression.ZSTD,
+    ".zstd": Compression.ZSTD,
+}
+
 
 @dataclass(frozen=True)
 class EncodingData:
@@ -56,21 +105,125 @@ class FileHandler:
         filename: t.Optional[FileNameType] = None,
         encoding: OptStr = None,
         supported_encodings: t.Sequence[str] = (),
+        compression: str = Compression.AUTO,
     ):
         self.filename = filename
         self.encoding = encoding or "utf-8"
         self.supported_encodings = supported_encodings
+        self.compression = compression
 
-    def open(self, filename: t.Optional[FileNameType] = None, **kwargs) -> t.IO:
+    @classmethod
+    def detect_compression(
+        cls, filename: t.Optional[FileNameType], mode: str = "r"
+    ) -> t.Optional[Compression]:
+        """
+        When reading an existing file the compression is detected from magic bytes,
+        otherwise from the file extension
+        """
+        if not isinstance(filename, (str, bytes, os.PathLike)):
+            return None
+
+        if "r" in mode and os.path.isfile(filename):
+            with open(filename, "rb") as file:
+                head = file.read(MAGIC_SIZE)
+            for magic, compression in COMPRESSION_MAGIC.items():
+                if magic.match(head):
+                    return compression
+            return None
+
+        _, extension = os.path.splitext(os.fsdecode(filename))
+        return COMPRESSION_EXTENSIONS.get(extension.lower())
+
+    def resolve_compression(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        mode: str = "r",
+        compression: OptStr = None,
+    ) -> t.Optional[Compression]:
+        _compression = Compression(compression or self.compression)
+        if _compression == Compression.AUTO:
+            return self.detect_compression(filename or self.filename, mode)
+        if _compression == Compression.NONE:
+            return None
+        return _compression
+
+    def open(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        *,
+        compression: OptStr = None,
+        **kwargs,
+    ) -> t.IO:
         encoding = kwargs.pop("encoding", self.encoding)
+        mode = kwargs.get("mode", "r")
+        _compression = self.resolve_compression(filename, mode, compression)
+        if _compression:
+            return self.open_compressed(filename, _compression, encoding=encoding, **kwargs)
         return open(filename or self.filename, encoding=encoding, **kwargs)
 
-    def open_binary(self, filename: t.Optional[FileNameType] = None, **kwargs) -> t.IO:
+    def open_binary(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        *,
+        compression: OptStr = None,
+        **kwargs,
+    ) -> t.IO:
+        _compression = self.resolve_compression(filename, "rb", compression)
+        if _compression:
+            return self.open_compressed(filename, _compression, mode="rb", **kwargs)
         return open(filename or self.filename, mode="rb", **kwargs)
 
-    def num_lines(self, filename: t.Optional[FileNameType] = None) -> int:
-        with self.open(filename) as file:
-            return sum(1 for _ in file)
+    def open_compressed(
+        self,
+        filename: t.Optional[FileNameType],
+        compression: str,
+        mode: str = "r",
+        **kwargs,
+    ) -> t.IO:
+        """
+        opens a compressed stream, text mode is used unless mode is binary;
+        the codecs have no buffering argument, so the binary stream is wrapped
+        in a buffer of the given size, the codec is then called with large blocks
+        """
+        buffering = kwargs.pop("buffering", -1)
+        opener = COMPRESSION_OPENERS[Compression(compression)]
+        if buffering <= 1:
+            _mode = mode if "b" in mode else f"{mode.replace('t', '')}t"
+            return opener(filename or self.filename, _mode, **kwargs)
+
+        text_options = {k: kwargs.pop(k) for k in ("encoding", "errors", "newline") if k in kwargs}
+        _mode = mode.replace("t", "").replace("b", "")
+        stream = t.cast(io.RawIOBase, opener(filename or self.filename, f"{_mode}b", **kwargs))
+        buffer_class = io.BufferedReader if "r" in _mode else io.BufferedWriter
+        buffered = buffer_class(stream, buffering)
+        if "b" in mode:
+            return buffered
+        return io.TextIOWrapper(buffered, **text_options)
+
+    def num_lines(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        max_lines: OptInt = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> int:
+        """
+        Counts the lines reading the file in binary chunks into a reused buffer,
+        if max_lines is given stops as soon as max_lines are found.
+        NOTE: only '\n' and '\r\n' line terminators are supported
+        """
+        lines = 0
+        last_byte = ord("\n")
+        buffer = bytearray(buffer_size)
+        with t.cast(io.BufferedIOBase, self.open_binary(filename)) as file:
+            while size := file.readinto(buffer):
+                lines += buffer.count(b"\n", 0, size)
+                last_byte = buffer[size - 1]
+                if max_lines is not None and lines >= max_lines:
+                    return max_lines
+
+        if last_byte != ord("\n"):
+            lines += 1
+        return lines if max_lines is None else min(lines, max_lines)
 
     @classmethod
     def skip(cls, file: t.IO, lines: int):
@@ -84,11 +237,51 @@ class FileHandler:
         with self.open(filename, **kwargs) as file:
             return file.read()
 
-    def detect_encoding(self, filename: t.Optional[FileNameType] = None) -> EncodingData:
+    @classmethod
+    def iter_samples(
+        cls, file: t.IO[bytes], max_bytes: int, spread: bool = False
+    ) -> t.Generator[bytes, None, None]:
+        """
+        Yields at most max_bytes from the start of the file, or if spread is True
+        split among the start, the middle and the end of the file;
+        middle and end samples begin at the first complete line
+        """
+        if not spread:
+            yield file.read(max_bytes)
+            return
+
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        if size <= max_bytes:
+            yield file.read()
+            return
+
+        chunk = max_bytes // 3
+        for offset in (0, (size - chunk) // 2, size - chunk):
+            if offset > 0:
+                file.seek(offset - 1)
+                file.readline(chunk)
+            yield file.read(chunk)
+
+    def detect_encoding(
+        self,
+        filename: t.Optional[FileNameType] = None,
+        max_bytes: OptInt = DEFAULT_SAMPLE_SIZE,
+        spread: bool = False,
+    ) -> EncodingData:
+        """
+        Detects the file encoding feeding the detector with at most max_bytes
+        (None means the whole file), see iter_samples for spread
+        """
         detector = Detector()
+        # compressed streams can not seek from the end, so only the start is sampled
+        _spread = spread and self.resolve_compression(filename) is None
         with self.open_binary(filename) as file:
-            for line in file:
-                detector.feed(line)
+            samples = (
+                iter(file) if max_bytes is None else self.iter_samples(file, max_bytes, _spread)
+            )
+            for sample in samples:
+                detector.feed(sample)
                 if detector.done:
                     break
             detector.close()
@@ -96,9 +289,12 @@ class FileHandler:
         return EncodingData(**detector.result)
 
     def check_encoding(
-        self, filename: t.Optional[FileNameType] = None, extra_supported: t.Sequence[str] = ()
+        self,
+        filename: t.Optional[FileNameType] = None,
+        extra_supported: t.Sequence[str] = (),
+        **kwargs,
     ):
-        encoding = self.detect_encoding(filename)
+        encoding = self.detect_encoding(filename, **kwargs)
         supported_encodings = [
             self.encoding,
             *self.supported_encodings,
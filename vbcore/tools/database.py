@@ -53,6 +53,7 @@ def dump_ddl(dialect, metadata):
 @CliOpt.string("-d", "--db-prefix")
 @CliOpt.string("--datetime-format")
 @CliOpt.string("--file-prefix")
+@CliOpt.integer("-w", "--workers", default=1, min_val=1, help="tables dumped concurrently")
 def mysql_backup(**kwargs):
     """perform the backup of mysql databases"""
     with Log.execution_time():